@@ -0,0 +1,133 @@
+"""Benchmark the resident memory of the sensor entities of a fleet of devices.
+
+Creates Tempest devices with their runtime data and sensor entities, without
+adding them to Home Assistant, and reports the memory allocated per device and
+per entity, as traced by `tracemalloc`:
+
+    python benchmarks/entity_memory.py [--devices 10 100 500]
+
+Unlike the other benchmarks, this one imports the sensor platform, and with
+it the integration package, so it requires Home Assistant as well as
+`pyweatherflowudp` and does not run offline without it.
+"""
+from __future__ import annotations
+
+import argparse
+import gc
+from importlib.util import find_spec
+import json
+from pathlib import Path
+import sys
+import tracemalloc
+from typing import Any
+from zoneinfo import ZoneInfo
+
+from pyweatherflowudp.device import TempestDevice
+
+if find_spec("homeassistant") is None:
+    sys.exit("This benchmark requires Home Assistant: pip install homeassistant")
+
+sys.path.insert(0, str(Path(__file__).parents[1]))
+
+# pylint: disable=wrong-import-position
+from custom_components.smartweatherudp.capabilities import (  # noqa: E402
+    build_entity_context,
+    get_capabilities,
+)
+from custom_components.smartweatherudp.dispatch import (  # noqa: E402
+    DeviceEventDispatcher,
+)
+from custom_components.smartweatherudp.lightning import (  # noqa: E402
+    LightningStrikeIndex,
+)
+from custom_components.smartweatherudp.models import (  # noqa: E402
+    WeatherFlowDeviceData,
+)
+from custom_components.smartweatherudp.rain import RainAccumulator  # noqa: E402
+from custom_components.smartweatherudp.sensor import _entity_class  # noqa: E402
+from custom_components.smartweatherudp.stats import DeviceStats  # noqa: E402
+from custom_components.smartweatherudp.wind import WindStatistics  # noqa: E402
+
+OBS_ST: dict[str, Any] = {
+    "serial_number": "ST-00000512",
+    "type": "obs_st",
+    "hub_sn": "HB-00013030",
+    "obs": [
+        [1588948614, 0.18, 0.22, 0.27, 144, 6, 1017.57, 22.37, 50.26, 328, 0.03, 3]
+        + [0.000000, 0, 0, 0, 2.410, 1]
+    ],
+    "firmware_revision": 129,
+}
+
+
+def create_devices(count: int) -> list[WeatherFlowDeviceData]:
+    """Return the runtime data of a number of Tempest devices."""
+    devices = []
+    for index in range(count):
+        message = json.loads(json.dumps(OBS_ST))
+        message["serial_number"] = f"ST-{index:08}"
+        device = TempestDevice(message["serial_number"], message)
+        device.parse_message(message)
+        devices.append(
+            WeatherFlowDeviceData(
+                device,
+                DeviceEventDispatcher(None, device),  # type: ignore[arg-type]
+                DeviceStats(),
+                lightning=LightningStrikeIndex(),
+                rain=RainAccumulator(ZoneInfo("UTC")),
+                wind=WindStatistics(),
+            )
+        )
+    return devices
+
+
+def create_entities(devices: list[WeatherFlowDeviceData]) -> list[Any]:
+    """Return the sensor entities of the devices."""
+    entities = []
+    for device_data in devices:
+        context = build_entity_context(device_data, None)
+        entities.extend(
+            _entity_class(capability.description)(context, capability)
+            for capability in get_capabilities(device_data, True)
+        )
+    return entities
+
+
+def traced(fn: Any, *args: Any) -> tuple[Any, int]:
+    """Return the result of a call and the memory it allocated."""
+    gc.collect()
+    before = tracemalloc.get_traced_memory()[0]
+    result = fn(*args)
+    gc.collect()
+    return result, tracemalloc.get_traced_memory()[0] - before
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--devices", type=int, nargs="+", default=[10, 100, 500])
+    args = parser.parse_args()
+
+    # Fill the capability tables and compile the converters before measuring.
+    create_entities(create_devices(1))
+
+    tracemalloc.start()
+    print(
+        f"{'devices':>8}{'entities':>10}{'device KiB':>12}{'entity KiB':>12}"
+        f"{'B/device':>10}{'B/entity':>10}"
+    )
+    for count in args.devices:
+        devices, device_bytes = traced(create_devices, count)
+        entities, entity_bytes = traced(create_entities, devices)
+        print(
+            f"{count:>8}{len(entities):>10}{device_bytes / 1024:>12.1f}"
+            f"{entity_bytes / 1024:>12.1f}"
+            f"{(device_bytes + entity_bytes) / count:>10.0f}"
+            f"{entity_bytes / len(entities):>10.0f}"
+        )
+        del devices, entities
+    tracemalloc.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Benchmark the import time of the integration.
+
+Each module is imported in a fresh interpreter several times and the median
+wall time is reported, with whether the import pulled in pint. Loading the
+integration should not import `pyweatherflowudp`; that cost is only paid in
+the executor once a config entry is set up:
+
+    python benchmarks/import_time.py [--runs 7]
+
+Importing the integration modules requires Home Assistant; they are skipped
+when it is not installed.
+"""
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+import statistics
+import subprocess
+import sys
+
+ROOT = Path(__file__).parents[1]
+
+TARGETS = (
+    # The cost deferred to config entry setup.
+    "pyweatherflowudp.client",
+    # Imported by Home Assistant while loading the integration.
+    "custom_components.smartweatherudp",
+    "custom_components.smartweatherudp.config_flow",
+    # Imported in the executor by `async_setup_entry`.
+    "custom_components.smartweatherudp.runtime",
+)
+
+PROBE = """
+import importlib, sys, time
+start = time.perf_counter()
+importlib.import_module({module!r})
+print(time.perf_counter() - start, "pint" in sys.modules)
+"""
+
+
+def measure(module: str, runs: int) -> tuple[float, bool] | None:
+    """Return the median import time of a module and whether pint was imported."""
+    times = []
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-c", PROBE.format(module=module)],
+            capture_output=True,
+            check=False,
+            cwd=ROOT,
+            text=True,
+        )
+        if result.returncode:
+            return None
+        seconds, pint = result.stdout.split()
+        times.append(float(seconds))
+    return statistics.median(times), pint == "True"
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=7)
+    args = parser.parse_args()
+
+    print(f"{'module':<48}{'median ms':>10}{'pint':>6}")
+    for module in TARGETS:
+        if (result := measure(module, args.runs)) is None:
+            print(f"{module:<48}{'skipped (import failed)':>24}")
+            continue
+        seconds, pint = result
+        print(f"{module:<48}{seconds * 1000:>10.1f}{'yes' if pint else 'no':>6}")
+
+
+if __name__ == "__main__":
+    main()
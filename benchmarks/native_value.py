@@ -0,0 +1,104 @@
+"""Micro-benchmark the per-call cost of computing a sensor value.
+
+Compares the previous per-call pint conversion with the precompiled
+`ValueConverter`. Only requires `pyweatherflowudp`:
+
+    python benchmarks/native_value.py
+"""
+from __future__ import annotations
+
+from enum import Enum
+import json
+from pathlib import Path
+import sys
+import timeit
+
+from pyweatherflowudp.calc import Quantity
+from pyweatherflowudp.device import TempestDevice
+
+sys.path.insert(
+    0, str(Path(__file__).parents[1] / "custom_components" / "smartweatherudp")
+)
+
+from conversion import (  # noqa: E402 pylint: disable=wrong-import-position
+    ValueConverter,
+)
+
+OBS_ST = {
+    "serial_number": "ST-00000512",
+    "type": "obs_st",
+    "hub_sn": "HB-00013030",
+    "obs": [
+        [1588948614, 0.18, 0.22, 0.27, 144, 6, 1017.57, 22.37, 50.26, 328, 0.03, 3]
+        + [0.000000, 0, 0, 0, 2.410, 1]
+    ],
+    "firmware_revision": 129,
+}
+
+# (attr, conversion_fn, decimals)
+CASES = {
+    "air_temperature": ("air_temperature", None, 1),
+    "air_density (imperial)": (
+        "air_density",
+        lambda attr: attr.to("lbs/ft³"),
+        5,
+    ),
+    "station_pressure (imperial)": (
+        "station_pressure",
+        lambda attr: attr.to("inHg"),
+        5,
+    ),
+    "wind_speed (imperial)": ("wind_speed", lambda attr: attr.to("mph"), 2),
+    "precipitation_type": ("precipitation_type", None, None),
+}
+
+
+def legacy_value(device, attr_name, fn, decimals):
+    """Compute a value the way `native_value` did before precompilation."""
+    attr = getattr(device, attr_name)
+    if attr is None:
+        return attr
+    if fn is not None:
+        attr = fn(attr)
+    if isinstance(attr, Quantity):
+        attr = attr.m
+    elif isinstance(attr, Enum):
+        attr = attr.name
+    if decimals is not None:
+        attr = round(attr, decimals)
+    return attr
+
+
+def compiled_value(device, attr_name, converter):
+    """Compute a value using a precompiled converter."""
+    if (attr := getattr(device, attr_name)) is None:
+        return None
+    return converter.convert(attr)
+
+
+def main(number: int = 20000) -> None:
+    """Run the benchmark."""
+    device = TempestDevice("ST-00000512", OBS_ST)
+    device.parse_message(json.loads(json.dumps(OBS_ST)))
+
+    print(f"{'value':<30}{'before µs':>12}{'after µs':>12}{'speedup':>10}")
+    for name, (attr_name, fn, decimals) in CASES.items():
+        converter = ValueConverter(fn, decimals)
+        legacy = legacy_value(device, attr_name, fn, decimals)
+        compiled = compiled_value(device, attr_name, converter)
+        assert legacy == compiled, (name, legacy, compiled)
+
+        before = timeit.timeit(
+            lambda: legacy_value(device, attr_name, fn, decimals), number=number
+        )
+        after = timeit.timeit(
+            lambda: compiled_value(device, attr_name, converter), number=number
+        )
+        print(
+            f"{name:<30}{before / number * 1e6:>12.2f}"
+            f"{after / number * 1e6:>12.2f}{before / after:>9.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
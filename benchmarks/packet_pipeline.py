@@ -0,0 +1,251 @@
+"""Benchmark the cost of a packet from the listener to the sensor values.
+
+Feeds recorded (see `scripts/record_packets.py`) or synthetic datagrams
+through `WeatherFlowListener` message parsing and the device events, then
+batches the events per packet and recomputes the value of each subscribed
+sensor the way the sensor entities do. Counts a state write for every value
+that changed. Only requires `pyweatherflowudp` and runs offline:
+
+    python benchmarks/packet_pipeline.py [recording] [--hours 24]
+"""
+from __future__ import annotations
+
+import argparse
+from collections.abc import Callable, Iterable
+import json
+from pathlib import Path
+import sys
+import time
+import tracemalloc
+from typing import Any
+
+from pyweatherflowudp.client import EVENT_DEVICE_DISCOVERED, WeatherFlowListener
+from pyweatherflowudp.const import EVENT_RAPID_WIND
+from pyweatherflowudp.device import (
+    EVENT_OBSERVATION,
+    EVENT_STATUS_UPDATE,
+    WeatherFlowDevice,
+)
+
+ROOT = Path(__file__).parents[1]
+sys.path.insert(0, str(ROOT / "custom_components" / "smartweatherudp"))
+sys.path.insert(0, str(ROOT / "scripts"))
+
+from conversion import (  # noqa: E402 pylint: disable=wrong-import-position
+    ValueConverter,
+)
+from packetlog import read_packets  # noqa: E402 pylint: disable=wrong-import-position
+
+HUB_SN = "HB-00013030"
+TEMPEST_SN = "ST-00000512"
+
+# The device attributes updated by each event, as subscribed by the sensors.
+SUBSCRIPTIONS = {
+    EVENT_OBSERVATION: (
+        "air_density",
+        "air_temperature",
+        "battery",
+        "dew_point_temperature",
+        "feels_like_temperature",
+        "illuminance",
+        "lightning_strike_average_distance",
+        "lightning_strike_count",
+        "precipitation_type",
+        "rain_accumulation_previous_minute",
+        "rain_rate",
+        "relative_humidity",
+        "solar_radiation",
+        "station_pressure",
+        "uv",
+        "vapor_pressure",
+        "wet_bulb_temperature",
+        "wind_average",
+        "wind_direction",
+        "wind_gust",
+        "wind_lull",
+        "wind_speed",
+    ),
+    EVENT_RAPID_WIND: ("wind_direction", "wind_speed"),
+    EVENT_STATUS_UPDATE: ("rssi", "up_since"),
+}
+
+
+def synthetic_packets(hours: float) -> list[tuple[float, bytes]]:
+    """Return the datagrams of a hub and a Tempest over a number of hours."""
+    start = 1_700_000_000
+    packets: list[tuple[float, dict[str, Any]]] = []
+    for second in range(0, int(hours * 3600), 3):
+        epoch = start + second
+        speed = round(2 + (second % 97) / 25, 2)
+        packets.append(
+            (
+                epoch,
+                {
+                    "serial_number": TEMPEST_SN,
+                    "type": "rapid_wind",
+                    "hub_sn": HUB_SN,
+                    "ob": [epoch, speed, (second // 3 * 7) % 360],
+                },
+            )
+        )
+        if second % 60 == 0:
+            minute = second // 60
+            packets.append(
+                (
+                    epoch,
+                    {
+                        "serial_number": TEMPEST_SN,
+                        "type": "obs_st",
+                        "hub_sn": HUB_SN,
+                        "obs": [
+                            [epoch, 0.18, speed, 4.27, 144, 3]
+                            + [1017.57 + minute % 10 / 100, 22.37 + minute % 30 / 10]
+                            + [50.26, 328, 0.03, 3, 0.0, 0, 0, 0, 2.41, 1]
+                        ],
+                        "firmware_revision": 129,
+                    },
+                )
+            )
+            packets.append(
+                (
+                    epoch,
+                    {
+                        "serial_number": TEMPEST_SN,
+                        "type": "device_status",
+                        "hub_sn": HUB_SN,
+                        "timestamp": epoch,
+                        "uptime": 2189 + second,
+                        "voltage": 2.41,
+                        "firmware_revision": 129,
+                        "rssi": -17,
+                        "hub_rssi": -87,
+                        "sensor_status": 0,
+                        "debug": 0,
+                    },
+                )
+            )
+        if second % 10 == 0:
+            packets.append(
+                (
+                    epoch,
+                    {
+                        "serial_number": HUB_SN,
+                        "type": "hub_status",
+                        "firmware_revision": "171",
+                        "uptime": 1670133 + second,
+                        "rssi": -62,
+                        "timestamp": epoch,
+                        "reset_flags": "BOR,PIN,POR",
+                        "seq": second // 10,
+                        "radio_stats": [2, 1, 0, 3, 2839],
+                        "mqtt_stats": [1, 0],
+                    },
+                )
+            )
+    return [(epoch, json.dumps(data).encode()) for epoch, data in packets]
+
+
+class Pipeline:
+    """Listener, device events and sensor values without Home Assistant."""
+
+    def __init__(self) -> None:
+        """Initialize the pipeline."""
+        self.listener = WeatherFlowListener()
+        # The event mixin keeps listeners on the class; keep pipelines apart.
+        self.listener._listeners = {}  # pylint: disable=protected-access
+        self.listener.on(EVENT_DEVICE_DISCOVERED, self._device_discovered)
+        self.pending: dict[WeatherFlowDevice, set[str]] = {}
+        self.sensors: dict[WeatherFlowDevice, dict[str, list[Callable[[], bool]]]] = {}
+        self.writes = 0
+
+    def _device_discovered(self, device: WeatherFlowDevice) -> None:
+        """Subscribe sensors to the events of a new device."""
+        device._listeners = {}  # pylint: disable=protected-access
+        subscriptions = self.sensors[device] = {}
+        for event, attrs in SUBSCRIPTIONS.items():
+            updates = subscriptions[event] = [
+                self._sensor(device, attr) for attr in attrs if hasattr(device, attr)
+            ]
+            if updates:
+                device.on(
+                    event,
+                    lambda _, event=event, device=device: self.pending.setdefault(
+                        device, set()
+                    ).add(event),
+                )
+
+    @staticmethod
+    def _sensor(device: WeatherFlowDevice, attr: str) -> Callable[[], bool]:
+        """Return an update function returning `True` if the value changed."""
+        converter = ValueConverter(None, 2)
+        last: list[Any] = [None]
+
+        def update() -> bool:
+            if (value := getattr(device, attr)) is not None:
+                value = converter.convert(value)
+            if value == last[0]:
+                return False
+            last[0] = value
+            return True
+
+        return update
+
+    def process(self, payload: bytes) -> None:
+        """Process a datagram and update each subscribed sensor once."""
+        self.listener._process_message(payload)  # pylint: disable=protected-access
+        if not self.pending:
+            return
+        pending, self.pending = self.pending, {}
+        for device, events in pending.items():
+            subscriptions = self.sensors[device]
+            updates = dict.fromkeys(
+                update for event in events for update in subscriptions[event]
+            )
+            self.writes += sum(update() for update in updates)
+
+
+def run(payloads: Iterable[bytes], count: int) -> None:
+    """Run the benchmark and print the results."""
+    pipeline = Pipeline()
+    wall, cpu = time.perf_counter(), time.process_time()
+    for payload in payloads:
+        pipeline.process(payload)
+    wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+
+    pipeline = Pipeline()
+    tracemalloc.start()
+    peak_total = 0
+    for payload in payloads:
+        current = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        pipeline.process(payload)
+        peak_total += tracemalloc.get_traced_memory()[1] - current
+    retained = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    print(f"packets:                 {count}")
+    print(f"packets/sec:             {count / wall:,.0f}")
+    print(f"CPU µs/packet:           {cpu / count * 1e6:.1f}")
+    print(f"state writes/packet:     {pipeline.writes / count:.2f}")
+    print(f"peak bytes/packet:       {peak_total / count:,.0f}")
+    print(f"retained bytes (total):  {retained:,}")
+
+
+def main() -> None:
+    """Parse the arguments and run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("recording", nargs="?", help="recording to benchmark")
+    parser.add_argument(
+        "--hours", type=float, default=24, help="hours of synthetic data"
+    )
+    args = parser.parse_args()
+
+    if args.recording is not None:
+        payloads = [payload for _, payload in read_packets(args.recording)]
+    else:
+        payloads = [payload for _, payload in synthetic_packets(args.hours)]
+    run(payloads, len(payloads))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,88 +1,35 @@
 """ Get data from Smart Weather station via UDP. """
 from __future__ import annotations
 
-import logging
-
-from pyweatherflowudp.client import EVENT_DEVICE_DISCOVERED, WeatherFlowListener
-from pyweatherflowudp.const import DEFAULT_HOST
-from pyweatherflowudp.device import EVENT_LOAD_COMPLETE, WeatherFlowDevice
-from pyweatherflowudp.errors import ListenerError
-
-from homeassistant.components.sensor import DOMAIN as SENSOR_DOMAIN
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import (
-    CONF_HOST,
-    EVENT_HOMEASSISTANT_STARTED,
-    EVENT_HOMEASSISTANT_STOP,
-)
-from homeassistant.core import CoreState, Event, HomeAssistant, callback
-from homeassistant.exceptions import ConfigEntryNotReady
-from homeassistant.helpers.dispatcher import async_dispatcher_send
-
-from .const import DOMAIN
-
-_LOGGER = logging.getLogger(__name__)
+from homeassistant.core import HomeAssistant
 
-PLATFORMS = [SENSOR_DOMAIN]
+from .loader import async_import_module
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up WeatherFlow from a config entry."""
-    hass.data.setdefault(DOMAIN, {})
-
-    client = hass.data[DOMAIN][entry.entry_id] = WeatherFlowListener(
-        host=entry.data.get(CONF_HOST, DEFAULT_HOST)
-    )
-
-    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
-
-    @callback
-    def device_discovered(device: WeatherFlowDevice) -> None:
-        _LOGGER.debug("Found a device: %s", device)
-
-        @callback
-        def add_device() -> None:
-            async_dispatcher_send(
-                hass, f"{DOMAIN}_{entry.entry_id}_add_{SENSOR_DOMAIN}", device
-            )
-
-        entry.async_on_unload(
-            device.on(
-                EVENT_LOAD_COMPLETE,
-                lambda _: add_device()
-                if hass.state == CoreState.running
-                else hass.bus.async_listen_once(
-                    EVENT_HOMEASSISTANT_STARTED, lambda _: add_device()
-                ),
-            )
-        )
-
-    entry.async_on_unload(client.on(EVENT_DEVICE_DISCOVERED, device_discovered))
-
-    try:
-        await client.start_listening()
-    except ListenerError as ex:
-        raise ConfigEntryNotReady from ex
-
-    async def handle_ha_shutdown(event: Event) -> None:
-        """Handle HA shutdown."""
-        await client.stop_listening()
-
-    entry.async_on_unload(
-        hass.bus.async_listen(EVENT_HOMEASSISTANT_STOP, handle_ha_shutdown)
-    )
+    runtime = await async_import_module(hass, "runtime")
+    if not await runtime.async_setup_entry(hass, entry):
+        return False
 
+    entry.async_on_unload(entry.add_update_listener(async_update_entry))
     return True
 
 
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
-    unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
+    runtime = await async_import_module(hass, "runtime")
+    return await runtime.async_unload_entry(hass, entry)
+
 
-    client: WeatherFlowListener = hass.data[DOMAIN][entry.entry_id]
-    await client.stop_listening()
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove the stored devices of a config entry."""
+    runtime = await async_import_module(hass, "runtime")
+    await runtime.async_remove_entry(hass, entry)
 
-    if unload_ok:
-        hass.data[DOMAIN].pop(entry.entry_id)
 
-    return unload_ok
+async def async_update_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Apply changed options of a config entry without reloading it."""
+    runtime = await async_import_module(hass, "runtime")
+    await runtime.async_update_entry(hass, entry)
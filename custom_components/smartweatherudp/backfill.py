@@ -0,0 +1,358 @@
+"""Backfill the statistics of derived sensors from recorded history."""
+from __future__ import annotations
+
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime
+from functools import partial
+import logging
+import math
+
+import numpy as np
+
+from homeassistant.components.recorder import get_instance, history
+from homeassistant.components.recorder.models import StatisticData, StatisticMetaData
+from homeassistant.components.recorder.statistics import (
+    async_add_external_statistics,
+    async_import_statistics,
+)
+from homeassistant.components.sensor import DOMAIN as SENSOR_DOMAIN
+from homeassistant.const import (
+    ATTR_UNIT_OF_MEASUREMENT,
+    PERCENTAGE,
+    UnitOfPressure,
+    UnitOfSpeed,
+    UnitOfTemperature,
+)
+from homeassistant.core import HomeAssistant, State
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import device_registry as dr, entity_registry as er
+from homeassistant.util import dt as dt_util
+from homeassistant.util.unit_conversion import (
+    BaseUnitConverter,
+    PressureConverter,
+    SpeedConverter,
+    TemperatureConverter,
+)
+from homeassistant.util.unit_system import METRIC_SYSTEM
+
+from . import derived
+from .capabilities import (
+    CONCENTRATION_KILOGRAMS_PER_CUBIC_METER,
+    CONCENTRATION_POUNDS_PER_CUBIC_FOOT,
+    build_entity_context,
+    get_capabilities,
+    statistic_metadata,
+)
+from .const import DOMAIN
+from .models import WeatherFlowDeviceData, WeatherFlowEntryData
+
+_LOGGER = logging.getLogger(__name__)
+
+HOUR = 3600
+
+# History is read and computed a week at a time, to bound the memory used.
+CHUNK = 7 * 24 * HOUR
+
+POUNDS_PER_CUBIC_FOOT_PER_KILOGRAM_PER_CUBIC_METER = 0.062427960576144595
+
+# The recorded sensors the derived sensors are computed from, with the unit
+# converter and the unit they are computed in.
+INPUTS: dict[str, tuple[type[BaseUnitConverter] | None, str]] = {
+    "air_temperature": (TemperatureConverter, UnitOfTemperature.CELSIUS),
+    "relative_humidity": (None, PERCENTAGE),
+    "station_pressure": (PressureConverter, UnitOfPressure.MBAR),
+    "wind_speed": (SpeedConverter, UnitOfSpeed.METERS_PER_SECOND),
+}
+
+
+@dataclass(frozen=True)
+class _DerivedSensor:
+    """How a derived sensor is computed from the recorded sensors."""
+
+    function: Callable[..., derived.Array]
+    inputs: tuple[str, ...]
+    converter: type[BaseUnitConverter] | None
+    unit: str
+
+
+DERIVED_SENSORS: dict[str, _DerivedSensor] = {
+    "air_density": _DerivedSensor(
+        derived.air_density,
+        ("air_temperature", "station_pressure"),
+        None,
+        CONCENTRATION_KILOGRAMS_PER_CUBIC_METER,
+    ),
+    "dew_point_temperature": _DerivedSensor(
+        derived.dew_point_temperature,
+        ("air_temperature", "relative_humidity"),
+        TemperatureConverter,
+        UnitOfTemperature.CELSIUS,
+    ),
+    "feels_like_temperature": _DerivedSensor(
+        derived.feels_like_temperature,
+        ("air_temperature", "relative_humidity", "wind_speed"),
+        TemperatureConverter,
+        UnitOfTemperature.CELSIUS,
+    ),
+    "vapor_pressure": _DerivedSensor(
+        derived.vapor_pressure,
+        ("air_temperature", "relative_humidity"),
+        PressureConverter,
+        UnitOfPressure.MBAR,
+    ),
+    "wet_bulb_temperature": _DerivedSensor(
+        derived.wet_bulb_temperature,
+        ("air_temperature", "relative_humidity", "station_pressure"),
+        TemperatureConverter,
+        UnitOfTemperature.CELSIUS,
+    ),
+}
+
+
+async def async_backfill(
+    hass: HomeAssistant,
+    device_id: str,
+    start: datetime,
+    end: datetime | None,
+    keys: list[str],
+) -> None:
+    """Import the hourly statistics of derived sensors of a device.
+
+    The statistics are computed from the recorded states of the sensors they
+    are derived from. They replace the statistics of the derived sensors,
+    imported or compiled by the recorder, for the whole hours in the period.
+    """
+    if "recorder" not in hass.config.components:
+        raise HomeAssistantError(
+            "Statistics can not be backfilled without the recorder"
+        )
+
+    data, device_data = _async_get_device_data(hass, device_id)
+    registry = er.async_get(hass)
+    context = build_entity_context(device_data, None, data.longterm)
+    capabilities = {
+        capability.description.key: capability
+        for capability in get_capabilities(
+            device_data, hass.config.units is METRIC_SYSTEM
+        )
+    }
+
+    def get_entity_id(key: str) -> str:
+        """Return the entity ID of a sensor of the device."""
+        if (
+            entity_id := registry.async_get_entity_id(
+                SENSOR_DOMAIN, DOMAIN, context.unique_id_prefix + key
+            )
+        ) is None:
+            raise HomeAssistantError(f"{device_data.device} has no {key} sensor")
+        return entity_id
+
+    if unsupported := set(keys).difference(capabilities):
+        raise HomeAssistantError(
+            f"{device_data.device} does not support {', '.join(sorted(unsupported))}"
+        )
+
+    inputs = {
+        key: get_entity_id(key)
+        for key in INPUTS
+        if any(key in DERIVED_SENSORS[output].inputs for output in keys)
+    }
+
+    # The statistic of each derived sensor, with the scale and offset converting
+    # the computed values to its unit.
+    outputs: dict[str, tuple[StatisticMetaData, float, float]] = {}
+    for key in keys:
+        sensor = DERIVED_SENSORS[key]
+        if data.longterm is not None:
+            # Imported like the hourly statistics of the live sensor.
+            metadata = statistic_metadata(context, capabilities[key].description)
+        else:
+            entity_entry = registry.async_get(get_entity_id(key))
+            assert entity_entry is not None
+            metadata = StatisticMetaData(
+                has_mean=True,
+                has_sum=False,
+                name=None,
+                source="recorder",
+                statistic_id=entity_entry.entity_id,
+                unit_of_measurement=entity_entry.unit_of_measurement
+                or capabilities[key].description.native_unit_of_measurement,
+            )
+        outputs[key] = (
+            metadata,
+            *_linear_conversion(
+                sensor.converter, sensor.unit, metadata["unit_of_measurement"]
+            ),
+        )
+
+    # Only whole hours that have passed are backfilled.
+    now = dt_util.utcnow().timestamp()
+    start_epoch = start.timestamp() // HOUR * HOUR
+    end_epoch = min(now if end is None else end.timestamp(), now) // HOUR * HOUR
+    if start_epoch >= end_epoch:
+        raise HomeAssistantError("The period to backfill must span a whole hour")
+
+    imported = 0
+    for chunk_start in range(int(start_epoch), int(end_epoch), CHUNK):
+        chunk_end = min(chunk_start + CHUNK, end_epoch)
+        states: dict[str, list[State]] = await get_instance(
+            hass
+        ).async_add_executor_job(
+            partial(
+                history.get_significant_states,
+                hass,
+                dt_util.utc_from_timestamp(chunk_start),
+                dt_util.utc_from_timestamp(chunk_end),
+                list(inputs.values()),
+                include_start_time_state=True,
+                significant_changes_only=False,
+            )
+        )
+        statistics = await hass.async_add_executor_job(
+            _compute_statistics,
+            {key: states.get(entity_id, []) for key, entity_id in inputs.items()},
+            {key: (DERIVED_SENSORS[key], *outputs[key][1:]) for key in keys},
+            chunk_start,
+            chunk_end,
+        )
+        for key, rows in statistics.items():
+            if not rows:
+                continue
+            metadata = outputs[key][0]
+            _LOGGER.debug(
+                "Backfilling %s hours of %s", len(rows), metadata["statistic_id"]
+            )
+            if metadata["source"] == DOMAIN:
+                async_add_external_statistics(hass, metadata, rows)
+            else:
+                async_import_statistics(hass, metadata, rows)
+            imported += len(rows)
+
+    _LOGGER.info(
+        "Backfilled %s hours of statistics of %s", imported, device_data.device
+    )
+
+
+def _async_get_device_data(
+    hass: HomeAssistant, device_id: str
+) -> tuple[WeatherFlowEntryData, WeatherFlowDeviceData]:
+    """Return the runtime data of a device and its config entry."""
+    if (device_entry := dr.async_get(hass).async_get(device_id)) is None:
+        raise HomeAssistantError(f"Unknown device: {device_id}")
+    domain_data = hass.data.get(DOMAIN, {})
+    for domain, serial_number in device_entry.identifiers:
+        if domain != DOMAIN:
+            continue
+        for entry_id in device_entry.config_entries:
+            if (data := domain_data.get(entry_id)) is not None and (
+                device_data := data.devices.get(serial_number)
+            ) is not None:
+                return data, device_data
+    raise HomeAssistantError(f"{device_entry.name} is not a loaded WeatherFlow device")
+
+
+def _linear_conversion(
+    converter: type[BaseUnitConverter] | None, from_unit: str, to_unit: str | None
+) -> tuple[float, float]:
+    """Return the scale and offset converting values between two units."""
+    if to_unit is None or from_unit == to_unit:
+        return 1.0, 0.0
+    if converter is None:
+        if (from_unit, to_unit) == (
+            CONCENTRATION_KILOGRAMS_PER_CUBIC_METER,
+            CONCENTRATION_POUNDS_PER_CUBIC_FOOT,
+        ):
+            return POUNDS_PER_CUBIC_FOOT_PER_KILOGRAM_PER_CUBIC_METER, 0.0
+        raise HomeAssistantError(f"Can not convert {from_unit} to {to_unit}")
+    offset = converter.convert(0.0, from_unit, to_unit)
+    return converter.convert(1.0, from_unit, to_unit) - offset, offset
+
+
+def _to_series(
+    states: list[State], converter: type[BaseUnitConverter] | None, unit: str
+) -> tuple[derived.Array, derived.Array]:
+    """Return the times and values of recorded states, converted to a unit."""
+    times = np.empty(len(states))
+    values = np.empty(len(states))
+    conversions: dict[str, tuple[float, float]] = {}
+    for index, state in enumerate(states):
+        times[index] = state.last_changed.timestamp()
+        try:
+            value = float(state.state)
+        except ValueError:
+            values[index] = math.nan
+            continue
+        state_unit = state.attributes.get(ATTR_UNIT_OF_MEASUREMENT, unit)
+        if (conversion := conversions.get(state_unit)) is None:
+            conversion = conversions[state_unit] = _linear_conversion(
+                converter, state_unit, unit
+            )
+        values[index] = value * conversion[0] + conversion[1]
+    return times, values
+
+
+def _compute_statistics(
+    states: dict[str, list[State]],
+    outputs: dict[str, tuple[_DerivedSensor, float, float]],
+    start: float,
+    end: float,
+) -> dict[str, list[StatisticData]]:
+    """Return the hourly statistics of derived sensors over a period.
+
+    The recorded sensors are sampled at every state change and every hour in
+    the period, holding each state until the next. The derived values are
+    computed at once for all samples, and weighted by how long they held for
+    the means.
+    """
+    series = {
+        key: _to_series(key_states, *INPUTS[key]) for key, key_states in states.items()
+    }
+    hours = np.arange(start, end, HOUR)
+    grid = np.unique(
+        np.concatenate(
+            [hours, *(np.clip(times, start, None) for times, _ in series.values())]
+        )
+    )
+    grid = grid[grid < end]
+    durations = np.diff(grid, append=end)
+    hour_starts = np.searchsorted(grid, hours)
+    hour_of_sample = np.searchsorted(hours, grid, side="right") - 1
+    inputs = {
+        key: _forward_fill(times, values, grid)
+        for key, (times, values) in series.items()
+    }
+
+    statistics: dict[str, list[StatisticData]] = {}
+    for key, (sensor, scale, offset) in outputs.items():
+        values = sensor.function(*(inputs[name] for name in sensor.inputs))
+        values = values * scale + offset
+        valid = np.isfinite(values)
+        weights = np.bincount(
+            hour_of_sample, np.where(valid, durations, 0.0), len(hours)
+        )
+        totals = np.bincount(
+            hour_of_sample, np.where(valid, values * durations, 0.0), len(hours)
+        )
+        minimums = np.fmin.reduceat(values, hour_starts)
+        maximums = np.fmax.reduceat(values, hour_starts)
+        statistics[key] = [
+            StatisticData(
+                start=dt_util.utc_from_timestamp(hours[hour]),
+                mean=float(totals[hour] / weights[hour]),
+                min=float(minimums[hour]),
+                max=float(maximums[hour]),
+            )
+            for hour in np.flatnonzero(weights > 0).tolist()
+        ]
+    return statistics
+
+
+def _forward_fill(
+    times: derived.Array, values: derived.Array, grid: derived.Array
+) -> derived.Array:
+    """Return the value held at each time of the grid, or NaN before the first."""
+    if not len(times):
+        return np.full(len(grid), math.nan)
+    index = np.searchsorted(times, grid, side="right") - 1
+    return np.where(index >= 0, values[np.maximum(index, 0)], math.nan)
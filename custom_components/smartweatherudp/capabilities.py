@@ -0,0 +1,623 @@
+"""Sensor descriptions and capabilities for the smartweatherudp integration.
+
+Shared by the sensor platform and the services reading the sensors of a
+device, such as backfilling their statistics.
+"""
+from __future__ import annotations
+
+from collections.abc import Callable
+from dataclasses import dataclass, field, replace
+import sys
+from typing import Any
+
+from pyweatherflowudp.calc import Quantity
+from pyweatherflowudp.const import EVENT_RAPID_WIND, EVENT_STRIKE
+from pyweatherflowudp.device import (
+    EVENT_OBSERVATION,
+    EVENT_STATUS_UPDATE,
+    WeatherFlowDevice,
+    WeatherFlowSensorDevice,
+)
+
+from homeassistant.components.recorder.models import StatisticMetaData
+from homeassistant.components.sensor import (
+    SensorDeviceClass,
+    SensorEntityDescription,
+    SensorStateClass,
+)
+from homeassistant.const import (
+    DEGREE,
+    LIGHT_LUX,
+    PERCENTAGE,
+    SIGNAL_STRENGTH_DECIBELS_MILLIWATT,
+    UV_INDEX,
+    UnitOfElectricPotential,
+    UnitOfIrradiance,
+    UnitOfLength,
+    UnitOfPrecipitationDepth,
+    UnitOfPressure,
+    UnitOfSpeed,
+    UnitOfTemperature,
+    UnitOfTime,
+    UnitOfVolumetricFlux,
+)
+from homeassistant.helpers.entity import DeviceInfo, EntityCategory
+
+from .const import DOMAIN
+from .conversion import ValueConverter
+from .dispatch import EVENT_STATS_UPDATED
+from .lightning import DEFAULT_WINDOWS as DEFAULT_LIGHTNING_WINDOWS, LightningWindow
+from .longterm import LongTermStatistics
+from .models import WeatherFlowDeviceData, WeatherFlowEntityContext
+from .scheduler import StateWriteScheduler
+from .wind import DEFAULT_WINDOWS as DEFAULT_WIND_WINDOWS, WindWindow
+
+CONCENTRATION_KILOGRAMS_PER_CUBIC_METER = "kg/m³"
+CONCENTRATION_POUNDS_PER_CUBIC_FOOT = "lbs/ft³"
+
+QUANTITY_KILOMETERS_PER_HOUR = "kph"
+
+IMPERIAL_UNIT_MAP = {
+    CONCENTRATION_KILOGRAMS_PER_CUBIC_METER: CONCENTRATION_POUNDS_PER_CUBIC_FOOT,
+    UnitOfLength.KILOMETERS: UnitOfLength.MILES,
+    UnitOfPrecipitationDepth.MILLIMETERS: UnitOfPrecipitationDepth.INCHES,
+    UnitOfVolumetricFlux.MILLIMETERS_PER_HOUR: UnitOfVolumetricFlux.INCHES_PER_HOUR,
+    UnitOfPressure.MBAR: UnitOfPressure.INHG,
+    UnitOfSpeed.KILOMETERS_PER_HOUR: UnitOfSpeed.MILES_PER_HOUR,
+}
+
+
+@dataclass
+class WeatherFlowSensorEntityDescription(SensorEntityDescription):
+    """Describes a WeatherFlow sensor entity description."""
+
+    attr: str | None = None
+    conversion_fn: Callable[[Quantity], Quantity] | None = None
+    deadband: float | None = None
+    decimals: int | None = None
+    event_subscriptions: list[str] = field(default_factory=lambda: [EVENT_OBSERVATION])
+    relative_deadband: float | None = None
+    source_fn: Callable[[WeatherFlowDeviceData], Any] | None = None
+    # The attribute of the device data holding the statistics the sensor reads.
+    statistic: str | None = None
+    value_fn: Callable[[Quantity], Quantity] | None = None
+
+
+@dataclass
+class WeatherFlowTemperatureSensorEntityDescription(WeatherFlowSensorEntityDescription):
+    """Describes a WeatherFlow temperature sensor entity description."""
+
+    def __post_init__(self) -> None:
+        """Post initialisation processing."""
+        self.native_unit_of_measurement = UnitOfTemperature.CELSIUS
+        self.device_class = SensorDeviceClass.TEMPERATURE
+        self.state_class = SensorStateClass.MEASUREMENT
+        self.decimals = 1
+
+
+@dataclass
+class WeatherFlowWindSensorEntityDescription(WeatherFlowSensorEntityDescription):
+    """Describes a WeatherFlow wind sensor entity description."""
+
+    def __post_init__(self) -> None:
+        """Post initialisation processing."""
+        self.icon = "mdi:weather-windy"
+        self.native_unit_of_measurement = UnitOfSpeed.KILOMETERS_PER_HOUR
+        self.state_class = SensorStateClass.MEASUREMENT
+        self.conversion_fn = lambda attr: attr.to(UnitOfSpeed.MILES_PER_HOUR)
+        self.decimals = 2
+        self.value_fn = lambda attr: attr.to(QUANTITY_KILOMETERS_PER_HOUR)
+
+
+@dataclass
+class WeatherFlowRainSensorEntityDescription(WeatherFlowSensorEntityDescription):
+    """Describes a WeatherFlow rain accumulation sensor entity description."""
+
+    def __post_init__(self) -> None:
+        """Post initialisation processing."""
+        self.icon = "mdi:weather-rainy"
+        self.native_unit_of_measurement = UnitOfPrecipitationDepth.MILLIMETERS
+        self.device_class = SensorDeviceClass.PRECIPITATION
+        self.conversion_fn = lambda attr: attr.to(UnitOfPrecipitationDepth.INCHES)
+        self.decimals = 2
+        self.source_fn = lambda data: data.rain
+        self.statistic = "rain"
+
+
+@dataclass
+class WeatherFlowDiagnosticSensorEntityDescription(WeatherFlowSensorEntityDescription):
+    """Describes a WeatherFlow runtime statistics sensor entity description."""
+
+    def __post_init__(self) -> None:
+        """Post initialisation processing."""
+        self.entity_category = EntityCategory.DIAGNOSTIC
+        self.entity_registry_enabled_default = False
+        self.event_subscriptions = [EVENT_STATS_UPDATED]
+        self.source_fn = lambda data: data.stats
+
+
+def _lightning_window(
+    seconds: int,
+) -> Callable[[WeatherFlowDeviceData], LightningWindow | None]:
+    """Return a function that gets a device's lightning strike window."""
+    return (
+        lambda data: None
+        if data.lightning is None
+        else data.lightning.windows.get(seconds)
+    )
+
+
+LIGHTNING_SENSORS: tuple[WeatherFlowSensorEntityDescription, ...] = (
+    WeatherFlowSensorEntityDescription(
+        key="lightning_last_strike",
+        name="Lightning Last Strike",
+        icon="mdi:lightning-bolt",
+        device_class=SensorDeviceClass.TIMESTAMP,
+        attr="last_strike",
+        event_subscriptions=[EVENT_STRIKE],
+        source_fn=lambda data: data.lightning,
+        statistic="lightning",
+    ),
+    *(
+        description
+        for seconds in DEFAULT_LIGHTNING_WINDOWS
+        for description in (
+            WeatherFlowSensorEntityDescription(
+                key=f"lightning_strike_closest_{seconds // 3600}h",
+                name=f"Lightning Closest {seconds // 3600} Hours",
+                icon="mdi:lightning-bolt",
+                native_unit_of_measurement=UnitOfLength.KILOMETERS,
+                device_class=SensorDeviceClass.DISTANCE,
+                attr="closest",
+                conversion_fn=lambda attr: attr.to(UnitOfLength.MILES),
+                decimals=2,
+                event_subscriptions=[EVENT_STRIKE],
+                source_fn=_lightning_window(seconds),
+                statistic="lightning",
+            ),
+            WeatherFlowSensorEntityDescription(
+                key=f"lightning_strike_count_{seconds // 3600}h",
+                name=f"Lightning Count {seconds // 3600} Hours",
+                icon="mdi:lightning-bolt",
+                state_class=SensorStateClass.MEASUREMENT,
+                attr="count",
+                event_subscriptions=[EVENT_STRIKE],
+                source_fn=_lightning_window(seconds),
+                statistic="lightning",
+            ),
+        )
+    ),
+)
+
+
+def _wind_window(seconds: int) -> Callable[[WeatherFlowDeviceData], WindWindow | None]:
+    """Return a function that gets a device's wind statistics window."""
+    return lambda data: None if data.wind is None else data.wind.windows.get(seconds)
+
+
+WIND_STATISTICS_SENSORS: tuple[WeatherFlowSensorEntityDescription, ...] = tuple(
+    description
+    for seconds in DEFAULT_WIND_WINDOWS
+    for description in (
+        WeatherFlowWindSensorEntityDescription(
+            key=f"wind_average_{seconds // 60}m",
+            name=f"Wind Average {seconds // 60} Minutes",
+            attr="average",
+            entity_registry_enabled_default=False,
+            event_subscriptions=[EVENT_RAPID_WIND],
+            source_fn=_wind_window(seconds),
+            statistic="wind",
+        ),
+        WeatherFlowSensorEntityDescription(
+            key=f"wind_direction_average_{seconds // 60}m",
+            name=f"Wind Direction Average {seconds // 60} Minutes",
+            icon="mdi:compass-outline",
+            native_unit_of_measurement=DEGREE,
+            state_class=SensorStateClass.MEASUREMENT,
+            attr="direction",
+            decimals=0,
+            entity_registry_enabled_default=False,
+            event_subscriptions=[EVENT_RAPID_WIND],
+            source_fn=_wind_window(seconds),
+            statistic="wind",
+        ),
+        WeatherFlowWindSensorEntityDescription(
+            key=f"wind_gust_{seconds // 60}m",
+            name=f"Wind Gust {seconds // 60} Minutes",
+            attr="gust",
+            entity_registry_enabled_default=False,
+            event_subscriptions=[EVENT_RAPID_WIND],
+            source_fn=_wind_window(seconds),
+            statistic="wind",
+        ),
+        WeatherFlowWindSensorEntityDescription(
+            key=f"wind_lull_{seconds // 60}m",
+            name=f"Wind Lull {seconds // 60} Minutes",
+            attr="lull",
+            entity_registry_enabled_default=False,
+            event_subscriptions=[EVENT_RAPID_WIND],
+            source_fn=_wind_window(seconds),
+            statistic="wind",
+        ),
+    )
+)
+
+
+DIAGNOSTIC_SENSORS: tuple[WeatherFlowSensorEntityDescription, ...] = (
+    WeatherFlowDiagnosticSensorEntityDescription(
+        key="duplicate_packets",
+        name="Duplicate Packets",
+        icon="mdi:content-duplicate",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+    ),
+    WeatherFlowDiagnosticSensorEntityDescription(
+        key="last_packet_age",
+        name="Last Packet Age",
+        native_unit_of_measurement=UnitOfTime.SECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        decimals=0,
+    ),
+    WeatherFlowDiagnosticSensorEntityDescription(
+        key="out_of_order_packets",
+        name="Out of Order Packets",
+        icon="mdi:swap-horizontal",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+    ),
+    WeatherFlowDiagnosticSensorEntityDescription(
+        key="overflow_packets",
+        name="Overflow Packets",
+        icon="mdi:tray-full",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+    ),
+    WeatherFlowDiagnosticSensorEntityDescription(
+        key="packets_received",
+        name="Packets Received",
+        icon="mdi:download-network",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+    ),
+    WeatherFlowDiagnosticSensorEntityDescription(
+        key="state_writes",
+        name="State Writes",
+        icon="mdi:database-edit",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+    ),
+    WeatherFlowDiagnosticSensorEntityDescription(
+        key="superseded_packets",
+        name="Superseded Packets",
+        icon="mdi:layers-remove",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+    ),
+    WeatherFlowDiagnosticSensorEntityDescription(
+        key="suppressed_state_writes",
+        name="Suppressed State Writes",
+        icon="mdi:database-off",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+    ),
+)
+
+
+SENSORS: tuple[WeatherFlowSensorEntityDescription, ...] = (
+    WeatherFlowTemperatureSensorEntityDescription(
+        key="air_temperature",
+        name="Temperature",
+    ),
+    WeatherFlowSensorEntityDescription(
+        key="air_density",
+        name="Air Density",
+        native_unit_of_measurement=CONCENTRATION_KILOGRAMS_PER_CUBIC_METER,
+        state_class=SensorStateClass.MEASUREMENT,
+        conversion_fn=lambda attr: attr.to(CONCENTRATION_POUNDS_PER_CUBIC_FOOT),
+        decimals=5,
+        relative_deadband=0.0001,
+    ),
+    WeatherFlowTemperatureSensorEntityDescription(
+        key="dew_point_temperature",
+        name="Dew Point",
+    ),
+    WeatherFlowSensorEntityDescription(
+        key="battery",
+        name="Battery Voltage",
+        native_unit_of_measurement=UnitOfElectricPotential.VOLT,
+        device_class=SensorDeviceClass.VOLTAGE,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        state_class=SensorStateClass.MEASUREMENT,
+    ),
+    WeatherFlowTemperatureSensorEntityDescription(
+        key="feels_like_temperature",
+        name="Feels Like",
+    ),
+    WeatherFlowSensorEntityDescription(
+        key="illuminance",
+        name="Illuminance",
+        native_unit_of_measurement=LIGHT_LUX,
+        device_class=SensorDeviceClass.ILLUMINANCE,
+        state_class=SensorStateClass.MEASUREMENT,
+    ),
+    WeatherFlowSensorEntityDescription(
+        key="lightning_strike_average_distance",
+        name="Lightning Average Distance",
+        icon="mdi:lightning-bolt",
+        native_unit_of_measurement=UnitOfLength.KILOMETERS,
+        conversion_fn=lambda attr: attr.to(UnitOfLength.MILES),
+        decimals=2,
+    ),
+    WeatherFlowSensorEntityDescription(
+        key="lightning_strike_count",
+        name="Lightning Count",
+        icon="mdi:lightning-bolt",
+    ),
+    WeatherFlowSensorEntityDescription(
+        key="precipitation_type",
+        name="Precipitation Type",
+        icon="mdi:weather-rainy",
+    ),
+    WeatherFlowSensorEntityDescription(
+        key="rain_amount",
+        name="Rain Amount",
+        icon="mdi:weather-rainy",
+        native_unit_of_measurement=UnitOfPrecipitationDepth.MILLIMETERS,
+        state_class=SensorStateClass.TOTAL,
+        attr="rain_accumulation_previous_minute",
+        conversion_fn=lambda attr: attr.to(UnitOfPrecipitationDepth.INCHES),
+    ),
+    WeatherFlowRainSensorEntityDescription(
+        key="rain_event",
+        name="Rain Event",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        attr="event",
+    ),
+    WeatherFlowRainSensorEntityDescription(
+        key="rain_last_hour",
+        name="Rain Last Hour",
+        state_class=SensorStateClass.MEASUREMENT,
+        attr="last_hour",
+    ),
+    WeatherFlowRainSensorEntityDescription(
+        key="rain_today",
+        name="Rain Today",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        attr="today",
+    ),
+    WeatherFlowRainSensorEntityDescription(
+        key="rain_yesterday",
+        name="Rain Yesterday",
+        attr="yesterday",
+    ),
+    WeatherFlowSensorEntityDescription(
+        key="rain_rate",
+        name="Rain Rate",
+        icon="mdi:weather-rainy",
+        native_unit_of_measurement=UnitOfVolumetricFlux.MILLIMETERS_PER_HOUR,
+        attr="rain_rate",
+        conversion_fn=lambda attr: attr.to(UnitOfVolumetricFlux.INCHES_PER_HOUR),
+    ),
+    WeatherFlowSensorEntityDescription(
+        key="relative_humidity",
+        name="Humidity",
+        native_unit_of_measurement=PERCENTAGE,
+        device_class=SensorDeviceClass.HUMIDITY,
+        state_class=SensorStateClass.MEASUREMENT,
+    ),
+    WeatherFlowSensorEntityDescription(
+        key="rssi",
+        name="RSSI",
+        native_unit_of_measurement=SIGNAL_STRENGTH_DECIBELS_MILLIWATT,
+        device_class=SensorDeviceClass.SIGNAL_STRENGTH,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_registry_enabled_default=False,
+        event_subscriptions=[EVENT_STATUS_UPDATE],
+    ),
+    WeatherFlowSensorEntityDescription(
+        key="station_pressure",
+        name="Station Pressure",
+        native_unit_of_measurement=UnitOfPressure.MBAR,
+        device_class=SensorDeviceClass.PRESSURE,
+        state_class=SensorStateClass.MEASUREMENT,
+        conversion_fn=lambda attr: attr.to(UnitOfPressure.INHG),
+        decimals=5,
+        relative_deadband=0.0001,
+    ),
+    WeatherFlowSensorEntityDescription(
+        key="solar_radiation",
+        name="Solar Radiation",
+        native_unit_of_measurement=UnitOfIrradiance.WATTS_PER_SQUARE_METER,
+        device_class=SensorDeviceClass.IRRADIANCE,
+        state_class=SensorStateClass.MEASUREMENT,
+    ),
+    WeatherFlowSensorEntityDescription(
+        key="up_since",
+        name="Up Since",
+        device_class=SensorDeviceClass.TIMESTAMP,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        event_subscriptions=[EVENT_STATUS_UPDATE],
+    ),
+    WeatherFlowSensorEntityDescription(
+        key="uv",
+        name="UV",
+        native_unit_of_measurement=UV_INDEX,
+        state_class=SensorStateClass.MEASUREMENT,
+    ),
+    WeatherFlowSensorEntityDescription(
+        key="vapor_pressure",
+        name="Vapor Pressure",
+        native_unit_of_measurement=UnitOfPressure.MBAR,
+        device_class=SensorDeviceClass.PRESSURE,
+        state_class=SensorStateClass.MEASUREMENT,
+        conversion_fn=lambda attr: attr.to(UnitOfPressure.INHG),
+        decimals=5,
+        relative_deadband=0.0001,
+    ),
+    WeatherFlowTemperatureSensorEntityDescription(
+        key="wet_bulb_temperature",
+        name="Wet Bulb Temperature",
+    ),
+    WeatherFlowWindSensorEntityDescription(
+        key="wind_average",
+        name="Wind Average",
+    ),
+    WeatherFlowSensorEntityDescription(
+        key="wind_direction",
+        name="Wind Direction",
+        icon="mdi:compass-outline",
+        native_unit_of_measurement=DEGREE,
+        state_class=SensorStateClass.MEASUREMENT,
+        event_subscriptions=[EVENT_RAPID_WIND, EVENT_OBSERVATION],
+    ),
+    WeatherFlowSensorEntityDescription(
+        key="wind_direction_average",
+        name="Wind Direction Average",
+        icon="mdi:compass-outline",
+        native_unit_of_measurement=DEGREE,
+        state_class=SensorStateClass.MEASUREMENT,
+    ),
+    WeatherFlowWindSensorEntityDescription(
+        key="wind_gust",
+        name="Wind Gust",
+    ),
+    WeatherFlowWindSensorEntityDescription(
+        key="wind_lull",
+        name="Wind Lull",
+    ),
+    WeatherFlowWindSensorEntityDescription(
+        key="wind_speed",
+        name="Wind Speed",
+        event_subscriptions=[EVENT_RAPID_WIND, EVENT_OBSERVATION],
+    ),
+    *LIGHTNING_SENSORS,
+    *WIND_STATISTICS_SENSORS,
+    *DIAGNOSTIC_SENSORS,
+)
+
+
+@dataclass
+class SensorCapability:
+    """A sensor supported by a device class, shared by its entities."""
+
+    __slots__ = ("description", "value_attr", "converter")
+
+    description: WeatherFlowSensorEntityDescription
+    value_attr: str
+    converter: ValueConverter
+
+
+# The sensors supported by each device class, per unit system; filled in by the
+# first device of each class.
+_CAPABILITIES: dict[
+    tuple[type[WeatherFlowDevice], bool], tuple[SensorCapability, ...]
+] = {}
+
+
+def get_capabilities(
+    device_data: WeatherFlowDeviceData, is_metric: bool
+) -> tuple[SensorCapability, ...]:
+    """Return the sensors supported by a device."""
+    key = (type(device_data.device), is_metric)
+    if (capabilities := _CAPABILITIES.get(key)) is None:
+        capabilities = _CAPABILITIES[key] = tuple(
+            _build_capability(description, is_metric)
+            for description in SENSORS
+            if hasattr(
+                get_source(device_data, description),
+                description.key if description.attr is None else description.attr,
+            )
+        )
+    return capabilities
+
+
+def _build_capability(
+    description: WeatherFlowSensorEntityDescription, is_metric: bool
+) -> SensorCapability:
+    """Return the shared state of a sensor for a unit system."""
+    return SensorCapability(
+        description if is_metric else _imperial_description(description),
+        sys.intern(description.key if description.attr is None else description.attr),
+        ValueConverter(
+            description.conversion_fn
+            if not is_metric and description.conversion_fn is not None
+            else description.value_fn,
+            description.decimals,
+        ),
+    )
+
+
+def _imperial_description(
+    description: WeatherFlowSensorEntityDescription,
+) -> WeatherFlowSensorEntityDescription:
+    """Return a copy of a description with its imperial unit of measurement."""
+    if (unit := IMPERIAL_UNIT_MAP.get(description.native_unit_of_measurement)) is None:
+        return description
+    imperial = replace(description)
+    # Set after copying, as `__post_init__` sets the metric unit again.
+    imperial.native_unit_of_measurement = unit
+    return imperial
+
+
+def build_entity_context(
+    device_data: WeatherFlowDeviceData,
+    scheduler: StateWriteScheduler | None,
+    longterm: LongTermStatistics | None = None,
+) -> WeatherFlowEntityContext:
+    """Return the state shared by the entities of a device."""
+    device = device_data.device
+    name = sys.intern(f"{device.model} {device.serial_number}")
+    device_info = DeviceInfo(
+        identifiers={(DOMAIN, device.serial_number)},
+        manufacturer="WeatherFlow",
+        model=device.model,
+        name=name,
+        sw_version=device.firmware_revision,
+        suggested_area="Backyard",
+    )
+    if isinstance(device, WeatherFlowSensorDevice):
+        device_info["via_device"] = (DOMAIN, device.hub_sn)
+    return WeatherFlowEntityContext(
+        device_data,
+        scheduler,
+        device_info,
+        name,
+        sys.intern(f"{DOMAIN}_{device.serial_number}_"),
+        longterm,
+    )
+
+
+def imports_statistics(description: WeatherFlowSensorEntityDescription) -> bool:
+    """Return `True` if the long-term statistics of a sensor can be imported.
+
+    These are the device measurements and the rain amount. Directions can not
+    be averaged arithmetically, and the statistics sensors are already
+    aggregated.
+    """
+    return (
+        description.state_class
+        in (SensorStateClass.MEASUREMENT, SensorStateClass.TOTAL)
+        and description.entity_category is None
+        and description.statistic is None
+        and description.native_unit_of_measurement != DEGREE
+    )
+
+
+def statistic_metadata(
+    context: WeatherFlowEntityContext, description: WeatherFlowSensorEntityDescription
+) -> StatisticMetaData:
+    """Return the metadata of the imported long-term statistic of a sensor."""
+    object_id = (context.unique_id_prefix + description.key).removeprefix(f"{DOMAIN}_")
+    return StatisticMetaData(
+        has_mean=description.state_class == SensorStateClass.MEASUREMENT,
+        has_sum=description.state_class == SensorStateClass.TOTAL,
+        name=f"{context.name} {description.name}",
+        source=DOMAIN,
+        statistic_id=f"{DOMAIN}:{object_id.lower().replace('-', '_')}",
+        unit_of_measurement=description.native_unit_of_measurement,
+    )
+
+
+def get_source(
+    device_data: WeatherFlowDeviceData, description: WeatherFlowSensorEntityDescription
+) -> Any:
+    """Return the object a sensor reads its value from."""
+    if description.source_fn is None:
+        return device_data.device
+    return description.source_fn(device_data)
@@ -6,17 +6,33 @@ import logging
 from typing import Any
 
 from async_timeout import timeout
-from pyweatherflowudp.client import EVENT_DEVICE_DISCOVERED, WeatherFlowListener
-from pyweatherflowudp.const import DEFAULT_HOST
 from pyweatherflowudp.errors import AddressInUseError, ListenerError
 import voluptuous as vol
 
 from homeassistant import config_entries
 from homeassistant.const import CONF_HOST, CONF_NAME
-from homeassistant.core import callback
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.data_entry_flow import FlowResult
 
-from .const import DOMAIN
+from .const import (
+    CONF_EXPORT_FORMAT,
+    CONF_EXPORT_TARGET,
+    CONF_HEARTBEAT_INTERVAL,
+    CONF_IMPORT_STATISTICS,
+    CONF_RAPID_WIND_INTERVAL,
+    DEFAULT_EXPORT_FORMAT,
+    DEFAULT_EXPORT_TARGET,
+    DEFAULT_HEARTBEAT_INTERVAL,
+    DEFAULT_HOST,
+    DEFAULT_IMPORT_STATISTICS,
+    DEFAULT_RAPID_WIND_INTERVAL,
+    DOMAIN,
+    EXPORT_FORMAT_LINE_PROTOCOL,
+    EXPORT_FORMAT_NDJSON,
+    EXPORT_FORMAT_NONE,
+)
+from .exporter import create_sink
+from .loader import async_import_module
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -24,23 +40,33 @@ STEP_USER_DATA_SCHEMA = STEP_MANUAL_DATA_SCHEMA = vol.Schema(
     {vol.Required(CONF_HOST): str}
 )
 
+EXPORT_FORMATS = {
+    EXPORT_FORMAT_NONE: "Off",
+    EXPORT_FORMAT_NDJSON: "NDJSON",
+    EXPORT_FORMAT_LINE_PROTOCOL: "InfluxDB line protocol",
+}
+
 
-async def _async_has_devices(host: str = DEFAULT_HOST) -> bool:
+async def _async_has_devices(hass: HomeAssistant, host: str = DEFAULT_HOST) -> bool:
     """Return if there are devices that can be discovered."""
     event = asyncio.Event()
 
     @callback
-    def device_discovered():
-        """Handle a discovered device."""
+    def device_seen():
+        """Handle a device being heard."""
         event.set()
 
-    async with WeatherFlowListener(host) as client:
-        client.on(EVENT_DEVICE_DISCOVERED, lambda _: device_discovered())
+    listener = await async_import_module(hass, "listener")
+    service = listener.async_get_listener_service(hass)
+    async with service.async_listen(host) as client:
+        unsubscribe = client.on(listener.EVENT_DEVICE_SEEN, lambda _: device_seen())
         try:
             async with timeout(10):
                 await event.wait()
         except asyncio.TimeoutError:
             return False
+        finally:
+            unsubscribe()
 
     return True
 
@@ -50,6 +76,14 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
     VERSION = 1
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(
+        config_entry: config_entries.ConfigEntry,
+    ) -> OptionsFlowHandler:
+        """Get the options flow for this handler."""
+        return OptionsFlowHandler(config_entry)
+
     async def async_step_user(
         self, user_input: dict[str, Any] | None = None
     ) -> FlowResult:
@@ -74,10 +108,14 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         # Get current discovered entries.
         in_progress = self._async_in_progress()
 
-        if not (has_devices := in_progress):
+        listener = await async_import_module(self.hass, "listener")
+        service = listener.async_get_listener_service(self.hass)
+        # Devices heard by any running listener that no entry set up yet, e.g.
+        # the lingering listener of a removed entry, are on the network.
+        if not (has_devices := in_progress or service.async_get_unclaimed_devices()):
             errors = {}
             try:
-                has_devices = await self.hass.async_add_job(_async_has_devices, host)
+                has_devices = await _async_has_devices(self.hass, host)
             except AddressInUseError:
                 errors["base"] = "address_in_use"
             except ListenerError:
@@ -116,3 +154,61 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             title=f"{config.get(CONF_NAME, 'WeatherFlow')}{f' ({host})' if host != DEFAULT_HOST else ''}",
             data=config,
         )
+
+
+class OptionsFlowHandler(config_entries.OptionsFlow):
+    """Handle an options flow for smartweatherudp."""
+
+    def __init__(self, config_entry: config_entries.ConfigEntry) -> None:
+        """Initialize options flow."""
+        self.config_entry = config_entry
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Manage the options."""
+        errors: dict[str, str] = {}
+        if user_input is not None:
+            if user_input[CONF_EXPORT_FORMAT] != EXPORT_FORMAT_NONE:
+                try:
+                    create_sink(self.hass, user_input[CONF_EXPORT_TARGET])
+                except ValueError:
+                    errors[CONF_EXPORT_TARGET] = "invalid_export_target"
+            if not errors:
+                return self.async_create_entry(title="", data=user_input)
+
+        options = {**self.config_entry.options, **(user_input or {})}
+        return self.async_show_form(
+            step_id="init",
+            data_schema=vol.Schema(
+                {
+                    vol.Optional(
+                        CONF_RAPID_WIND_INTERVAL,
+                        default=options.get(
+                            CONF_RAPID_WIND_INTERVAL, DEFAULT_RAPID_WIND_INTERVAL
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=0, max=300)),
+                    vol.Optional(
+                        CONF_HEARTBEAT_INTERVAL,
+                        default=options.get(
+                            CONF_HEARTBEAT_INTERVAL, DEFAULT_HEARTBEAT_INTERVAL
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=0, max=1440)),
+                    vol.Optional(
+                        CONF_IMPORT_STATISTICS,
+                        default=options.get(
+                            CONF_IMPORT_STATISTICS, DEFAULT_IMPORT_STATISTICS
+                        ),
+                    ): bool,
+                    vol.Optional(
+                        CONF_EXPORT_FORMAT,
+                        default=options.get(CONF_EXPORT_FORMAT, DEFAULT_EXPORT_FORMAT),
+                    ): vol.In(EXPORT_FORMATS),
+                    vol.Optional(
+                        CONF_EXPORT_TARGET,
+                        default=options.get(CONF_EXPORT_TARGET, DEFAULT_EXPORT_TARGET),
+                    ): str,
+                }
+            ),
+            errors=errors,
+        )
@@ -1,2 +1,33 @@
 """Constants for smartweatherudp."""
+from homeassistant.const import Platform
+
 DOMAIN = "smartweatherudp"
+
+PLATFORMS = [Platform.SENSOR]
+
+CONF_EXPORT_FORMAT = "export_format"
+CONF_EXPORT_TARGET = "export_target"
+CONF_HEARTBEAT_INTERVAL = "heartbeat_interval"
+CONF_IMPORT_STATISTICS = "import_statistics"
+CONF_RAPID_WIND_INTERVAL = "rapid_wind_interval"
+
+EXPORT_FORMAT_LINE_PROTOCOL = "line_protocol"
+EXPORT_FORMAT_NDJSON = "ndjson"
+EXPORT_FORMAT_NONE = "none"
+
+# Same as `pyweatherflowudp.const.DEFAULT_HOST`, which builds a unit registry on import.
+DEFAULT_HOST = "0.0.0.0"
+DEFAULT_EXPORT_FORMAT = EXPORT_FORMAT_NONE
+DEFAULT_EXPORT_TARGET = ""
+DEFAULT_HEARTBEAT_INTERVAL = 15
+DEFAULT_IMPORT_STATISTICS = False
+DEFAULT_RAPID_WIND_INTERVAL = 0
+
+# Derived sensors whose statistics can be backfilled from recorded history.
+BACKFILL_SENSORS = (
+    "air_density",
+    "dew_point_temperature",
+    "feels_like_temperature",
+    "vapor_pressure",
+    "wet_bulb_temperature",
+)
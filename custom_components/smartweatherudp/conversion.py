@@ -0,0 +1,62 @@
+"""Value conversion for the smartweatherudp integration."""
+from __future__ import annotations
+
+from enum import Enum
+from typing import Any, Callable
+
+from pyweatherflowudp.calc import Quantity
+
+
+class ValueConverter:
+    """Convert device values into sensor states.
+
+    The conversion is compiled on the first value that is not `None`. Unit
+    conversions are reduced to a scale and offset applied directly to the
+    magnitude, so pint only resolves units once per sensor.
+    """
+
+    __slots__ = ("_fn", "_decimals", "convert")
+
+    def __init__(
+        self,
+        fn: Callable[[Quantity], Quantity] | None = None,
+        decimals: int | None = None,
+    ) -> None:
+        """Initialize a value converter."""
+        self._fn = fn
+        self._decimals = decimals
+        self.convert: Callable[[Any], Any] = self._compile
+
+    def _compile(self, value: Any) -> Any:
+        """Compile a converter for the type of value and convert it."""
+        self.convert = _build_converter(value, self._fn, self._decimals)
+        return self.convert(value)
+
+
+def _build_converter(
+    value: Any, fn: Callable[[Quantity], Quantity] | None, decimals: int | None
+) -> Callable[[Any], Any]:
+    """Return a converter specialized for the type of value."""
+    if isinstance(value, Quantity):
+        scale, offset = 1, 0
+        if fn is not None:
+            # Built directly, as multiplying offset units such as °C is ambiguous.
+            quantity, unit = type(value), value.units
+            offset = fn(quantity(0, unit)).m
+            scale = fn(quantity(1, unit)).m - offset
+
+        if scale == 1 and offset == 0:
+            if decimals is None:
+                return lambda value: value.m
+            return lambda value: round(value.m, decimals)
+        if decimals is None:
+            return lambda value: value.m * scale + offset
+        return lambda value: round(value.m * scale + offset, decimals)
+
+    if isinstance(value, Enum):
+        return lambda value: value.name
+
+    if decimals is not None and isinstance(value, (int, float)):
+        return lambda value: round(value, decimals)
+
+    return lambda value: value
@@ -0,0 +1,67 @@
+"""Duplicate and out-of-order packet detection for the smartweatherudp integration."""
+from __future__ import annotations
+
+from collections import deque
+from collections.abc import Hashable
+from typing import Any
+
+# Recent packets remembered per message type.
+DEDUP_WINDOW = 16
+
+# Packets older than the newest by more than this many seconds mean the device
+# clock was reset rather than a delayed delivery, so they are accepted.
+MAX_REORDER = 600
+
+NEW = 0
+DUPLICATE = 1
+OUT_OF_ORDER = 2
+
+
+def message_key(data: dict[str, Any]) -> tuple[float, Hashable] | None:
+    """Return the device timestamp of a message and a key identifying it."""
+    try:
+        if (evt := data.get("evt")) is not None:
+            # Several events, e.g. lightning strikes, can share a timestamp.
+            timestamp, key = evt[0], tuple(evt)
+        elif (ob := data.get("ob")) is not None:
+            timestamp = key = ob[0]
+        elif (obs := data.get("obs")) is not None:
+            timestamp = key = obs[-1][0]
+        else:
+            timestamp = key = data.get("timestamp")
+        hash(key)
+    except (IndexError, KeyError, TypeError):
+        return None
+    if isinstance(timestamp, (int, float)) and not isinstance(timestamp, bool):
+        return timestamp, key
+    return None
+
+
+class PacketIndex:
+    """Bounded index of the recent packets of a device, per message type."""
+
+    __slots__ = ("_recent", "_latest")
+
+    def __init__(self) -> None:
+        """Initialize the packet index."""
+        self._recent: dict[str, deque[Hashable]] = {}
+        self._latest: dict[str, float] = {}
+
+    def check(self, message_type: str, data: dict[str, Any]) -> int:
+        """Add a packet, returning `NEW`, `DUPLICATE` or `OUT_OF_ORDER`."""
+        if (message := message_key(data)) is None:
+            return NEW
+        timestamp, key = message
+
+        if (recent := self._recent.get(message_type)) is None:
+            recent = self._recent[message_type] = deque(maxlen=DEDUP_WINDOW)
+        elif key in recent:
+            return DUPLICATE
+        if (
+            latest := self._latest.get(message_type)
+        ) is not None and 0 < latest - timestamp <= MAX_REORDER:
+            return OUT_OF_ORDER
+
+        recent.append(key)
+        self._latest[message_type] = timestamp
+        return NEW
@@ -0,0 +1,237 @@
+"""Vectorized derived metrics for the smartweatherudp integration.
+
+NumPy versions of the derived metrics `pyweatherflowudp` computes per sample
+through pint and psychrolib, for computing them over long histories. The
+iterative psychrolib solvers are run element-wise with the same tolerance,
+so the results match the live sensors.
+
+Inputs are arrays of temperatures in °C, relative humidities in %, station
+pressures in mbar and wind speeds in m/s. Values that are not defined, e.g.
+the heat index below 80°F, are NaN.
+"""
+from __future__ import annotations
+
+import numpy as np
+import numpy.typing as npt
+
+Array = npt.NDArray[np.float64]
+
+# psychrolib constants, SI units.
+ZERO_CELSIUS_AS_KELVIN = 273.15
+TRIPLE_POINT_WATER = 0.01
+FREEZING_POINT_WATER = 0.0
+R_DA = 287.042
+MIN_HUM_RATIO = 1e-7
+TOLERANCE = 0.001
+MAX_ITERATIONS = 100
+TEMPERATURE_BOUNDS = (-100.0, 200.0)
+
+MPH = 0.44704
+
+
+def _ln_sat_vap_pres(temperature: Array) -> Array:
+    """Return the natural log of the saturation vapor pressure in Pa."""
+    kelvin = temperature + ZERO_CELSIUS_AS_KELVIN
+    ln_kelvin = np.log(kelvin)
+    ice = (
+        -5.6745359e03 / kelvin
+        + 6.3925247
+        - 9.677843e-03 * kelvin
+        + 6.2215701e-07 * kelvin**2
+        + 2.0747825e-09 * kelvin**3
+        - 9.484024e-13 * kelvin**4
+        + 4.1635019 * ln_kelvin
+    )
+    water = (
+        -5.8002206e03 / kelvin
+        + 1.3914993
+        - 4.8640239e-02 * kelvin
+        + 4.1764768e-05 * kelvin**2
+        - 1.4452093e-08 * kelvin**3
+        + 6.5459673 * ln_kelvin
+    )
+    return np.where(temperature <= TRIPLE_POINT_WATER, ice, water)
+
+
+def _d_ln_sat_vap_pres(temperature: Array) -> Array:
+    """Return the derivative of the log of the saturation vapor pressure."""
+    kelvin = temperature + ZERO_CELSIUS_AS_KELVIN
+    ice = (
+        5.6745359e03 / kelvin**2
+        - 9.677843e-03
+        + 2 * 6.2215701e-07 * kelvin
+        + 3 * 2.0747825e-09 * kelvin**2
+        - 4 * 9.484024e-13 * kelvin**3
+        + 4.1635019 / kelvin
+    )
+    water = (
+        5.8002206e03 / kelvin**2
+        - 4.8640239e-02
+        + 2 * 4.1764768e-05 * kelvin
+        - 3 * 1.4452093e-08 * kelvin**2
+        + 6.5459673 / kelvin
+    )
+    return np.where(temperature <= TRIPLE_POINT_WATER, ice, water)
+
+
+def _sat_vap_pres(temperature: Array) -> Array:
+    """Return the saturation vapor pressure in Pa."""
+    return np.exp(_ln_sat_vap_pres(temperature))
+
+
+def _vap_pres(temperature: Array, relative_humidity: Array) -> Array:
+    """Return the vapor pressure in Pa."""
+    return relative_humidity / 100 * _sat_vap_pres(temperature)
+
+
+def _hum_ratio(vap_pres: Array, pressure: Array) -> Array:
+    """Return the humidity ratio from a vapor pressure and a pressure in Pa."""
+    return np.maximum(0.621945 * vap_pres / (pressure - vap_pres), MIN_HUM_RATIO)
+
+
+def _dew_point_from_vap_pres(temperature: Array, vap_pres: Array) -> Array:
+    """Return the dew point in °C, solved by Newton-Raphson like psychrolib."""
+    low, high = (
+        _sat_vap_pres(np.array(bound, dtype=float)) for bound in TEMPERATURE_BOUNDS
+    )
+    valid = (vap_pres >= low) & (vap_pres <= high) & np.isfinite(temperature)
+    dew_point = np.where(valid, temperature, np.nan)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ln_vap_pres = np.log(vap_pres)
+    active = np.flatnonzero(valid)
+    for _ in range(MAX_ITERATIONS + 1):
+        if not active.size:
+            break
+        previous = dew_point[active]
+        current = np.clip(
+            previous
+            - (_ln_sat_vap_pres(previous) - ln_vap_pres[active])
+            / _d_ln_sat_vap_pres(previous),
+            *TEMPERATURE_BOUNDS,
+        )
+        dew_point[active] = current
+        active = active[np.abs(current - previous) > TOLERANCE]
+    else:
+        dew_point[active] = np.nan
+    return np.minimum(dew_point, temperature)
+
+
+def _hum_ratio_from_wet_bulb(
+    temperature: Array, wet_bulb: Array, pressure: Array
+) -> Array:
+    """Return the humidity ratio at a wet bulb temperature."""
+    sat_hum_ratio = _hum_ratio(_sat_vap_pres(wet_bulb), pressure)
+    above = (
+        (2501.0 - 2.326 * wet_bulb) * sat_hum_ratio - 1.006 * (temperature - wet_bulb)
+    ) / (2501.0 + 1.86 * temperature - 4.186 * wet_bulb)
+    below = (
+        (2830.0 - 0.24 * wet_bulb) * sat_hum_ratio - 1.006 * (temperature - wet_bulb)
+    ) / (2830.0 + 1.86 * temperature - 2.1 * wet_bulb)
+    return np.maximum(
+        np.where(wet_bulb >= FREEZING_POINT_WATER, above, below), MIN_HUM_RATIO
+    )
+
+
+def air_density(temperature: Array, station_pressure: Array) -> Array:
+    """Return the dry air density in kg/m³."""
+    return station_pressure * 100 / R_DA / (temperature + ZERO_CELSIUS_AS_KELVIN)
+
+
+def dew_point_temperature(temperature: Array, relative_humidity: Array) -> Array:
+    """Return the dew point temperature in °C."""
+    return _dew_point_from_vap_pres(
+        temperature, _vap_pres(temperature, relative_humidity)
+    )
+
+
+def vapor_pressure(temperature: Array, relative_humidity: Array) -> Array:
+    """Return the vapor pressure as reported by the device.
+
+    Like `pyweatherflowudp`, this is the psychrolib value in Pa, which the
+    sensor reports as mbar.
+    """
+    return _vap_pres(temperature, relative_humidity)
+
+
+def wet_bulb_temperature(
+    temperature: Array, relative_humidity: Array, station_pressure: Array
+) -> Array:
+    """Return the wet bulb temperature in °C, solved by bisection like psychrolib."""
+    pressure = station_pressure * 100
+    hum_ratio = _hum_ratio(_vap_pres(temperature, relative_humidity), pressure)
+    upper = temperature.astype(float, copy=True)
+    lower = _dew_point_from_vap_pres(
+        temperature, pressure * hum_ratio / (0.621945 + hum_ratio)
+    )
+    wet_bulb = (lower + upper) / 2
+    active = np.flatnonzero(np.isfinite(wet_bulb) & (upper - lower > TOLERANCE))
+    for _ in range(MAX_ITERATIONS):
+        if not active.size:
+            break
+        too_humid = (
+            _hum_ratio_from_wet_bulb(
+                temperature[active], wet_bulb[active], pressure[active]
+            )
+            > hum_ratio[active]
+        )
+        upper[active] = np.where(too_humid, wet_bulb[active], upper[active])
+        lower[active] = np.where(too_humid, lower[active], wet_bulb[active])
+        wet_bulb[active] = (upper[active] + lower[active]) / 2
+        active = active[upper[active] - lower[active] > TOLERANCE]
+    else:
+        wet_bulb[active] = np.nan
+    return wet_bulb
+
+
+def heat_index(temperature: Array, relative_humidity: Array) -> Array:
+    """Return the heat index in °C, NaN below 80°F."""
+    fahrenheit = temperature * 9 / 5 + 32
+    humidity = relative_humidity
+    simple = 0.5 * (fahrenheit + 61.0 + (fahrenheit - 68.0) * 1.2 + humidity * 0.094)
+    regression = (
+        -42.379
+        + 2.04901523 * fahrenheit
+        + 10.14333127 * humidity
+        - 0.22475541 * fahrenheit * humidity
+        - 0.00683783 * fahrenheit * fahrenheit
+        - 0.05481717 * humidity * humidity
+        + 0.00122874 * fahrenheit * fahrenheit * humidity
+        + 0.00085282 * fahrenheit * humidity * humidity
+        - 0.00000199 * fahrenheit * fahrenheit * humidity * humidity
+    )
+    dry = (humidity < 13) & (fahrenheit >= 80) & (fahrenheit <= 112)
+    humid = (humidity > 85) & (fahrenheit >= 80) & (fahrenheit <= 87)
+    with np.errstate(invalid="ignore"):
+        regression = np.where(
+            dry,
+            regression
+            - (13 - humidity) / 4 * np.sqrt((17 - np.abs(fahrenheit - 95.0)) / 17),
+            np.where(
+                humid,
+                regression + (humidity - 85) / 10 * ((87 - fahrenheit) / 5),
+                regression,
+            ),
+        )
+    index = np.where((simple + fahrenheit) / 2 >= 80, regression, simple)
+    return np.where(fahrenheit >= 80, (index - 32) * 5 / 9, np.nan)
+
+
+def wind_chill(temperature: Array, wind_speed: Array) -> Array:
+    """Return the wind chill in °C, NaN above 50°F or below 3 mph."""
+    fahrenheit = temperature * 9 / 5 + 32
+    mph = wind_speed / MPH
+    with np.errstate(invalid="ignore"):
+        factor = mph**0.16
+    chill = 35.74 + 0.6215 * fahrenheit - 35.75 * factor + 0.4275 * fahrenheit * factor
+    return np.where((fahrenheit <= 50) & (mph >= 3), (chill - 32) * 5 / 9, np.nan)
+
+
+def feels_like_temperature(
+    temperature: Array, relative_humidity: Array, wind_speed: Array
+) -> Array:
+    """Return the heat index, else the wind chill, else the temperature in °C."""
+    index = heat_index(temperature, relative_humidity)
+    chill = wind_chill(temperature, wind_speed)
+    return np.where(
+        np.isfinite(index), index, np.where(np.isfinite(chill), chill, temperature)
+    )
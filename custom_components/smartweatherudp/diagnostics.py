@@ -0,0 +1,60 @@
+"""Diagnostics support for the smartweatherudp integration."""
+from __future__ import annotations
+
+from dataclasses import asdict
+import time
+from typing import Any
+
+from pyweatherflowudp.device import WeatherFlowSensorDevice
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import CONF_EXPORT_TARGET, DOMAIN
+from .listener import async_get_listener_service
+from .models import WeatherFlowEntryData
+
+# The export target is a host and port or a file path.
+TO_REDACT = {CONF_EXPORT_TARGET, "target"}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    data: WeatherFlowEntryData = hass.data[DOMAIN][entry.entry_id]
+    service = async_get_listener_service(hass)
+    now = time.time()
+
+    return {
+        "entry": {
+            "data": dict(entry.data),
+            "options": async_redact_data(entry.options, TO_REDACT),
+        },
+        "listener": {
+            "host": data.client.host,
+            "is_listening": data.client.is_listening,
+            "seen_devices": [
+                {**asdict(seen), "last_seen_age": round(now - seen.last_seen, 1)}
+                for seen in service.async_get_seen_devices(data.client.host)
+            ],
+        },
+        "devices": {
+            serial_number: {
+                "model": device_data.device.model,
+                "hub_sn": device_data.device.hub_sn
+                if isinstance(device_data.device, WeatherFlowSensorDevice)
+                else None,
+                "firmware_revision": device_data.device.firmware_revision,
+                "load_complete": device_data.device.load_complete,
+                "restored": device_data.sensors is not None,
+                "enabled_sensors": sorted(device_data.enabled_sensors),
+                "stats": device_data.stats.as_dict(),
+            }
+            for serial_number, device_data in data.devices.items()
+        },
+        "exporter": None
+        if data.exporter is None
+        else async_redact_data(data.exporter.as_dict(), TO_REDACT),
+    }
@@ -0,0 +1,92 @@
+"""Device event dispatch for the smartweatherudp integration."""
+from __future__ import annotations
+
+from asyncio import Handle
+from functools import partial
+from typing import Any, Callable
+
+from pyweatherflowudp.device import WeatherFlowDevice
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+
+# Notified when sensors of the device are enabled or disabled.
+EVENT_ENABLED_SENSORS_CHANGED = "enabled_sensors_changed"
+
+# Notified periodically, so the runtime statistics of the device are updated.
+EVENT_STATS_UPDATED = "stats_updated"
+
+
+class DeviceEventDispatcher:
+    """Fan device events out to subscribers in a single batched pass.
+
+    One listener is registered on the device per subscribed event type. Events emitted
+    while parsing a packet are collected and the subscribers of all of them
+    are updated once, in a single loop callback.
+    """
+
+    def __init__(self, hass: HomeAssistant, device: WeatherFlowDevice) -> None:
+        """Initialize the dispatcher."""
+        self._hass = hass
+        self.device = device
+        self._subscribers: dict[str, list[Callable[[], None]]] = {}
+        self._device_listeners: dict[str, Callable[[], None]] = {}
+        self._pending_events: set[str] = set()
+        self._handle: Handle | None = None
+
+    @callback
+    def async_subscribe(self, event: str, update: Callable[[], None]) -> CALLBACK_TYPE:
+        """Subscribe to a device event and return a function to unsubscribe."""
+        if event not in self._device_listeners:
+            self._device_listeners[event] = self.device.on(
+                event, partial(self._handle_event, event)
+            )
+        subscribers = self._subscribers.setdefault(event, [])
+        subscribers.append(update)
+
+        @callback
+        def unsubscribe() -> None:
+            """Unsubscribe from the device event."""
+            if update in subscribers:
+                subscribers.remove(update)
+            # Stop listening to the device once the event has no subscribers.
+            if not subscribers and self._subscribers.get(event) is subscribers:
+                del self._subscribers[event]
+                if (remove := self._device_listeners.pop(event, None)) is not None:
+                    remove()
+
+        return unsubscribe
+
+    @callback
+    def async_notify(self, event_name: str) -> None:
+        """Update the subscribers of an event without a device event."""
+        self._handle_event(event_name, None)
+
+    @callback
+    def async_shutdown(self) -> None:
+        """Stop listening to the device and cancel a pending dispatch."""
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+        for unsubscribe in self._device_listeners.values():
+            unsubscribe()
+        self._device_listeners.clear()
+        self._subscribers.clear()
+        self._pending_events.clear()
+
+    @callback
+    def _handle_event(self, event_name: str, event: Any) -> None:
+        """Queue an event and schedule a dispatch if needed."""
+        self._pending_events.add(event_name)
+        if self._handle is None:
+            self._handle = self._hass.loop.call_soon(self._async_dispatch)
+
+    @callback
+    def _async_dispatch(self) -> None:
+        """Update each subscriber of the pending events once."""
+        self._handle = None
+        events, self._pending_events = self._pending_events, set()
+        updates = dict.fromkeys(
+            update for event in events for update in self._subscribers.get(event, ())
+        )
+        for update in updates:
+            update()
@@ -0,0 +1,353 @@
+"""Observation export for the smartweatherudp integration."""
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from collections.abc import Callable
+from datetime import datetime, timedelta
+from enum import Enum
+import json
+import logging
+import math
+import os
+import socket
+import time
+from typing import Any, BinaryIO, Protocol
+from urllib.parse import urlsplit
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_time_interval
+
+from .const import EXPORT_FORMAT_LINE_PROTOCOL, EXPORT_FORMAT_NDJSON
+from .stats import TimingHistogram
+
+_LOGGER = logging.getLogger(__name__)
+
+# Observations kept until written; the oldest are dropped when full.
+BUFFER_SIZE = 10000
+# Observations that trigger a write before the interval.
+FLUSH_SIZE = 500
+FLUSH_INTERVAL = timedelta(seconds=10)
+
+MAX_FILE_SIZE = 10 * 1024 * 1024
+FILE_BACKUP_COUNT = 3
+MAX_DATAGRAM_SIZE = 1400
+SOCKET_TIMEOUT = 5
+
+MEASUREMENT = "weatherflow"
+
+# Device attributes exported from each observation, in the device's metric units.
+OBSERVATION_FIELDS = (
+    "air_temperature",
+    "relative_humidity",
+    "station_pressure",
+    "illuminance",
+    "uv",
+    "solar_radiation",
+    "rain_accumulation_previous_minute",
+    "precipitation_type",
+    "wind_lull",
+    "wind_average",
+    "wind_gust",
+    "wind_direction",
+    "lightning_strike_average_distance",
+    "lightning_strike_count",
+    "battery",
+)
+# Fields written as integers in line protocol; the others always as floats, as
+# the type of a field can not change.
+INTEGER_FIELDS = frozenset(("lightning_strike_count", "precipitation_type"))
+
+# Epoch, serial number and field values of an observation.
+Observation = tuple[int, str, tuple[tuple[str, float], ...]]
+
+
+def format_ndjson(observation: Observation) -> str:
+    """Return an observation as a JSON object."""
+    epoch, serial_number, fields = observation
+    return json.dumps(
+        {"time": epoch, "serial_number": serial_number, **dict(fields)},
+        separators=(",", ":"),
+    )
+
+
+def format_line_protocol(observation: Observation) -> str:
+    """Return an observation as a line of InfluxDB line protocol."""
+    epoch, serial_number, fields = observation
+    values = ",".join(
+        f"{name}={int(value)}i"
+        if name in INTEGER_FIELDS
+        else f"{name}={float(value)!r}"
+        for name, value in fields
+    )
+    return f"{MEASUREMENT},serial_number={serial_number} {values} {epoch}000000000"
+
+
+FORMATTERS: dict[str, Callable[[Observation], str]] = {
+    EXPORT_FORMAT_LINE_PROTOCOL: format_line_protocol,
+    EXPORT_FORMAT_NDJSON: format_ndjson,
+}
+
+
+class ExportSink(Protocol):
+    """Destination of exported lines, written to from the executor."""
+
+    def write(self, lines: list[str]) -> None:
+        """Write lines, raising `OSError` on failure."""
+
+    def close(self) -> None:
+        """Release the destination."""
+
+
+class FileSink:
+    """Append lines to a local file, rotating it when it grows too large."""
+
+    def __init__(self, path: str) -> None:
+        """Initialize the file sink."""
+        self._path = path
+        self._file: BinaryIO | None = None
+
+    def __str__(self) -> str:
+        """Return the path of the file."""
+        return self._path
+
+    def write(self, lines: list[str]) -> None:
+        """Append lines to the file."""
+        data = "".join(f"{line}\n" for line in lines).encode()
+        if self._file is None:
+            os.makedirs(os.path.dirname(self._path), exist_ok=True)
+            self._file = open(self._path, "ab")
+        if self._file.tell() and self._file.tell() + len(data) > MAX_FILE_SIZE:
+            self._rotate()
+        self._file.write(data)
+        self._file.flush()
+
+    def close(self) -> None:
+        """Close the file."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _rotate(self) -> None:
+        """Move the file to the first backup, shifting older backups."""
+        self.close()
+        for index in range(FILE_BACKUP_COUNT - 1, 0, -1):
+            if os.path.exists(backup := f"{self._path}.{index}"):
+                os.replace(backup, f"{self._path}.{index + 1}")
+        os.replace(self._path, f"{self._path}.1")
+        self._file = open(self._path, "ab")
+
+
+class SocketSink:
+    """Send lines to a TCP or UDP endpoint, reconnecting after a failure."""
+
+    def __init__(self, protocol: str, host: str, port: int) -> None:
+        """Initialize the socket sink."""
+        self._protocol = protocol
+        self._host = host
+        self._port = port
+        self._socket: socket.socket | None = None
+
+    def __str__(self) -> str:
+        """Return the URL of the endpoint."""
+        return f"{self._protocol}://{self._host}:{self._port}"
+
+    def write(self, lines: list[str]) -> None:
+        """Send lines, packing them into datagrams over UDP."""
+        try:
+            if self._socket is None:
+                self._socket = self._connect()
+            if self._protocol == "tcp":
+                self._socket.sendall("".join(f"{line}\n" for line in lines).encode())
+                return
+            datagram = b""
+            for line in lines:
+                data = f"{line}\n".encode()
+                if datagram and len(datagram) + len(data) > MAX_DATAGRAM_SIZE:
+                    self._socket.send(datagram)
+                    datagram = b""
+                datagram += data
+            if datagram:
+                self._socket.send(datagram)
+        except OSError:
+            self.close()
+            raise
+
+    def close(self) -> None:
+        """Close the socket."""
+        if self._socket is not None:
+            self._socket.close()
+            self._socket = None
+
+    def _connect(self) -> socket.socket:
+        """Return a socket connected to the endpoint."""
+        family, kind, proto, _, address = socket.getaddrinfo(
+            self._host,
+            self._port,
+            type=socket.SOCK_STREAM if self._protocol == "tcp" else socket.SOCK_DGRAM,
+        )[0]
+        sock = socket.socket(family, kind, proto)
+        sock.settimeout(SOCKET_TIMEOUT)
+        try:
+            sock.connect(address)
+        except OSError:
+            sock.close()
+            raise
+        return sock
+
+
+def create_sink(hass: HomeAssistant, target: str) -> ExportSink:
+    """Return the sink of an export target, raising `ValueError` if invalid.
+
+    The target is a `tcp://host:port` or `udp://host:port` URL, or a file path,
+    relative to the configuration directory or in an allowed external directory.
+    """
+    if not (target := target.strip()):
+        raise ValueError("No export target")
+    if "://" in target:
+        url = urlsplit(target)
+        if url.scheme not in ("tcp", "udp") or not url.hostname or not url.port:
+            raise ValueError(f"Invalid export URL: {target}")
+        return SocketSink(url.scheme, url.hostname, url.port)
+    path = os.path.normpath(hass.config.path(target))
+    if path.startswith(
+        os.path.join(hass.config.config_dir, "")
+    ) or hass.config.is_allowed_path(path):
+        return FileSink(path)
+    raise ValueError(f"Export path is not in an allowed external directory: {path}")
+
+
+class ObservationExporter:
+    """Mirror device observations to a file or endpoint in batches.
+
+    Observations are taken from the device events into a bounded buffer, and
+    formatted and written from the executor every interval, or sooner once
+    enough are buffered. At most one write is in flight at a time.
+    """
+
+    def __init__(self, hass: HomeAssistant, export_format: str, sink: ExportSink):
+        """Initialize the exporter."""
+        self._hass = hass
+        self.export_format = export_format
+        self._formatter = FORMATTERS[export_format]
+        self._sink = sink
+        self._buffer: deque[Observation] = deque(maxlen=BUFFER_SIZE)
+        self._fields: dict[type, tuple[str, ...]] = {}
+        self._flush_task: asyncio.Task[None] | None = None
+        self._cancel_flush: CALLBACK_TYPE | None = None
+        self._failing = False
+        self._closed = False
+        self.exported = 0
+        # Observations dropped because the buffer was full.
+        self.dropped = 0
+        # Observations dropped because they could not be written.
+        self.failed = 0
+        self.flush_timing = TimingHistogram()
+
+    @property
+    def target(self) -> str:
+        """Return the file or endpoint written to."""
+        return str(self._sink)
+
+    @callback
+    def async_start(self) -> None:
+        """Write the buffered observations every interval."""
+        self._cancel_flush = async_track_time_interval(
+            self._hass, self._async_flush, FLUSH_INTERVAL
+        )
+
+    @callback
+    def async_add_observation(self, device: Any, event: Any) -> None:
+        """Buffer an observation of a device."""
+        if self._closed:
+            return
+        if (fields := self._fields.get(type(device))) is None:
+            fields = self._fields[type(device)] = tuple(
+                name for name in OBSERVATION_FIELDS if hasattr(device, name)
+            )
+        values = tuple(
+            (name, value)
+            for name in fields
+            if (value := _magnitude(getattr(device, name))) is not None
+        )
+        if not values:
+            return
+        if len(self._buffer) == BUFFER_SIZE:
+            self.dropped += 1
+        self._buffer.append((event.epoch, device.serial_number, values))
+        if len(self._buffer) >= FLUSH_SIZE:
+            self._async_flush()
+
+    @callback
+    def _async_flush(self, now: datetime | None = None) -> None:
+        """Start writing the buffered observations, unless a write is in flight."""
+        if self._flush_task is not None or not self._buffer:
+            return
+        batch = list(self._buffer)
+        self._buffer.clear()
+        self._flush_task = self._hass.async_create_task(self._async_write(batch))
+
+    async def _async_write(self, batch: list[Observation]) -> None:
+        """Write a batch of observations from the executor."""
+        try:
+            await self._hass.async_add_executor_job(self._write, batch)
+        except OSError as err:
+            self.failed += len(batch)
+            if not self._failing:
+                _LOGGER.warning(
+                    "Failed to export observations to %s: %s", self._sink, err
+                )
+                self._failing = True
+        else:
+            self.exported += len(batch)
+            if self._failing:
+                _LOGGER.info("Exporting observations to %s again", self._sink)
+                self._failing = False
+        finally:
+            self._flush_task = None
+        if len(self._buffer) >= FLUSH_SIZE:
+            self._async_flush()
+
+    def _write(self, batch: list[Observation]) -> None:
+        """Format and write a batch of observations."""
+        start = time.perf_counter()
+        self._sink.write([self._formatter(observation) for observation in batch])
+        self.flush_timing.record(time.perf_counter() - start)
+
+    async def async_shutdown(self) -> None:
+        """Write the buffered observations and release the sink."""
+        if self._closed:
+            return
+        self._closed = True
+        if self._cancel_flush is not None:
+            self._cancel_flush()
+            self._cancel_flush = None
+        if self._flush_task is not None:
+            await self._flush_task
+        self._async_flush()
+        if self._flush_task is not None:
+            await self._flush_task
+        await self._hass.async_add_executor_job(self._sink.close)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the export statistics."""
+        return {
+            "target": self.target,
+            "buffered": len(self._buffer),
+            "exported": self.exported,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "flush_timing": self.flush_timing.as_dict(),
+        }
+
+
+def _magnitude(value: Any) -> float | None:
+    """Return the magnitude of a device attribute, or `None` if not exportable."""
+    if isinstance(value, Enum):
+        value = value.value
+    value = getattr(value, "magnitude", value)
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return None
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    return value
@@ -0,0 +1,160 @@
+"""Lightning strike index for the smartweatherudp integration."""
+from __future__ import annotations
+
+from array import array
+from bisect import bisect_right
+from collections import deque
+from collections.abc import Iterable
+from datetime import datetime
+import time
+
+from pint import Quantity
+from pyweatherflowudp.const import UNIT_KILOMETERS
+from pyweatherflowudp.helpers import utc_timestamp_from_epoch, value_as_unit
+
+DEFAULT_WINDOWS = (3600, 10800, 86400)
+DEFAULT_CAPACITY = 4096
+
+
+class LightningStrikes:
+    """Fixed-size, time-ordered ring buffer of lightning strikes.
+
+    Strikes are addressed by an ever increasing sequence number; the strike for
+    `seq` is stored at `seq % capacity`. Indexing the buffer itself returns the
+    epochs of the stored strikes from oldest to newest, so it can be searched
+    with `bisect`.
+    """
+
+    __slots__ = ("capacity", "count", "epochs", "distances", "energies")
+
+    def __init__(self, capacity: int) -> None:
+        """Initialize the ring buffer."""
+        self.capacity = capacity
+        self.count = 0
+        self.epochs = array("q", bytes(8 * capacity))
+        self.distances = array("d", bytes(8 * capacity))
+        self.energies = array("q", bytes(8 * capacity))
+
+    @property
+    def first(self) -> int:
+        """Return the sequence number of the oldest stored strike."""
+        return max(self.count - self.capacity, 0)
+
+    def __len__(self) -> int:
+        """Return the number of stored strikes."""
+        return self.count - self.first
+
+    def __getitem__(self, index: int) -> int:
+        """Return the epoch of the stored strike at index, oldest first."""
+        return self.epochs[(self.first + index) % self.capacity]
+
+    def first_after(self, epoch: float) -> int:
+        """Return the sequence number of the first strike after epoch."""
+        return self.first + bisect_right(self, epoch)
+
+
+class LightningStrikeIndex:
+    """Index of recent lightning strikes.
+
+    Counts per window are answered with a binary search over the time-ordered
+    buffer. Each window keeps a monotonic queue of strike distances so the
+    closest strike is available in O(1) amortized time, provided successive
+    queries do not go back in time.
+    """
+
+    def __init__(
+        self,
+        windows: Iterable[int] = DEFAULT_WINDOWS,
+        capacity: int = DEFAULT_CAPACITY,
+    ) -> None:
+        """Initialize the lightning strike index."""
+        self._strikes = LightningStrikes(capacity)
+        self.windows: dict[int, LightningWindow] = {
+            seconds: LightningWindow(self._strikes, seconds) for seconds in windows
+        }
+
+    @property
+    def last_strike(self) -> datetime | None:
+        """Return the time of the last strike in UTC."""
+        if not (strikes := self._strikes).count:
+            return None
+        return utc_timestamp_from_epoch(
+            strikes.epochs[(strikes.count - 1) % strikes.capacity]
+        )
+
+    def add(self, epoch: int, distance: float, energy: int) -> bool:
+        """Add a strike, returning `False` if it is older than the last strike."""
+        strikes = self._strikes
+        if strikes.count and epoch < strikes[len(strikes) - 1]:
+            return False
+
+        seq = strikes.count
+        idx = seq % strikes.capacity
+        strikes.epochs[idx] = epoch
+        strikes.distances[idx] = distance
+        strikes.energies[idx] = energy
+        strikes.count = seq + 1
+
+        for window in self.windows.values():
+            window.append(seq)
+        return True
+
+    def next_expiry(self, now: float | None = None) -> float | None:
+        """Return the next epoch at which a strike leaves a window."""
+        if now is None:
+            now = time.time()
+        strikes = self._strikes
+        expiries = [
+            strikes.epochs[seq % strikes.capacity] + window.seconds
+            for window in self.windows.values()
+            if (seq := strikes.first_after(now - window.seconds)) < strikes.count
+        ]
+        return min(expiries, default=None)
+
+
+class LightningWindow:
+    """Lightning strikes within a single time window."""
+
+    __slots__ = ("_strikes", "seconds", "_closest")
+
+    def __init__(self, strikes: LightningStrikes, seconds: int) -> None:
+        """Initialize the window."""
+        self._strikes = strikes
+        self.seconds = seconds
+        self._closest: deque[int] = deque()
+
+    def append(self, seq: int) -> None:
+        """Add the newest strike."""
+        distances = self._strikes.distances
+        capacity = self._strikes.capacity
+        distance = distances[seq % capacity]
+        while self._closest and distances[self._closest[-1] % capacity] >= distance:
+            self._closest.pop()
+        self._closest.append(seq)
+        while self._closest[0] < self._strikes.first:
+            self._closest.popleft()
+
+    def count_at(self, now: float) -> int:
+        """Return the number of strikes in the window ending at now."""
+        strikes = self._strikes
+        return strikes.count - strikes.first_after(now - self.seconds)
+
+    def closest_at(self, now: float) -> float | None:
+        """Return the distance of the closest strike in the window ending at now."""
+        strikes = self._strikes
+        start = strikes.first_after(now - self.seconds)
+        while self._closest and self._closest[0] < start:
+            self._closest.popleft()
+        if not self._closest:
+            return None
+        return strikes.distances[self._closest[0] % strikes.capacity]
+
+    @property
+    def count(self) -> int:
+        """Return the number of strikes in the window."""
+        return self.count_at(time.time())
+
+    @property
+    def closest(self) -> Quantity[float] | None:
+        """Return the distance of the closest strike in the window in kilometers (km)."""
+        return value_as_unit(self.closest_at(time.time()), UNIT_KILOMETERS)
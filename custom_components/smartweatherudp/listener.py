@@ -0,0 +1,394 @@
+"""Shared UDP listeners for the smartweatherudp integration."""
+from __future__ import annotations
+
+import asyncio
+from asyncio import Handle, TimerHandle
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+import json
+import logging
+import time
+from typing import Any
+
+from pyweatherflowudp.client import (
+    DATA_SERIAL_NUMBER,
+    EVENT_DEVICE_DISCOVERED,
+    WeatherFlowListener,
+)
+from pyweatherflowudp.const import DEFAULT_PORT
+from pyweatherflowudp.device import (
+    DATA_HUB_SN,
+    DATA_TYPE,
+    WeatherFlowDevice,
+    WeatherFlowSensorDevice,
+    determine_device,
+)
+
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+from homeassistant.core import Event, HomeAssistant, callback
+
+from .const import DOMAIN
+from .dedup import DUPLICATE, MAX_REORDER, NEW, PacketIndex, message_key
+from .mailbox import QUEUED, SUPERSEDED, DeviceMailbox
+from .stats import (
+    DUPLICATE_PACKETS,
+    OUT_OF_ORDER_PACKETS,
+    OVERFLOW_PACKETS,
+    SUPERSEDED_PACKETS,
+    DeviceStats,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+DATA_LISTENER_SERVICE = "listener_service"
+
+# Emitted when a device is heard for the first time in a while.
+EVENT_DEVICE_SEEN = "device_seen"
+
+# Keep an unused socket open briefly so reloads and config flows can reuse it.
+LISTENER_LINGER = 10
+
+# Devices seen within this many seconds are considered present.
+SEEN_DEVICE_MAX_AGE = 300
+
+# Minimum seconds between two deliveries of the messages of a device.
+DRAIN_INTERVAL = 0.25
+
+# Packets received this many seconds later than their device timestamp implies
+# are assumed to be a backlog built up while the event loop was blocked, so
+# their delivery waits for the rest of it.
+STALE_PACKET_AGE = 10
+
+
+@dataclass
+class SeenDevice:
+    """A device recently heard by a listener."""
+
+    __slots__ = ("serial_number", "model", "hub_sn", "host", "last_seen")
+
+    serial_number: str
+    model: str
+    hub_sn: str | None
+    host: str
+    last_seen: float
+
+
+class SharedWeatherFlowListener(WeatherFlowListener):
+    """WeatherFlow listener that can be shared between config entries."""
+
+    def __init__(
+        self,
+        host: str,
+        port: int = DEFAULT_PORT,
+        seen_devices: dict[str, SeenDevice] | None = None,
+    ) -> None:
+        """Initialize the listener."""
+        super().__init__(host=host, port=port)
+        # The event mixin keeps listeners on the class, so give each
+        # instance its own to keep the events of different hosts apart.
+        self._listeners = {}
+        self._seen_devices = {} if seen_devices is None else seen_devices
+        self._stats: dict[str, DeviceStats] = {}
+        self._packet_indexes: dict[str, PacketIndex] = {}
+        self._mailboxes: dict[str, DeviceMailbox] = {}
+        self._drain_handles: dict[str, Handle] = {}
+        # Newest device timestamp of each device and the monotonic time it was
+        # received, to tell the device clock without comparing it to the host's.
+        self._device_clocks: dict[str, tuple[float, float]] = {}
+
+    @property
+    def host(self) -> str:
+        """Return the host address the listener is bound to."""
+        return self._host
+
+    def get_device_stats(self, serial_number: str) -> DeviceStats:
+        """Return the statistics of a device, creating them if needed."""
+        if (stats := self._stats.get(serial_number)) is None:
+            stats = self._stats[serial_number] = DeviceStats()
+        return stats
+
+    def _process_message(self, data: bytes) -> None:
+        """Process a UDP message and record the device as seen.
+
+        Packets already received, e.g. via another broadcast path, and packets
+        older than the last of their type are dropped before they are parsed,
+        so they do not emit device events.
+
+        Other packets go to the mailbox of the device, which is delivered at
+        most every `DRAIN_INTERVAL`. Only the newest rapid wind and status
+        packets are kept, so after the event loop was blocked the backlog is
+        parsed in one pass and each entity writes its state once.
+        """
+        start = time.perf_counter()
+        try:
+            json_data: dict[str, Any] = json.loads(data)
+            serial_number = json_data[DATA_SERIAL_NUMBER]
+        except (json.JSONDecodeError, KeyError, UnicodeDecodeError):
+            _LOGGER.warning("Received unknown message: %s", data)
+            return
+
+        if (device := self._devices.get(serial_number)) is None:
+            device = self._devices[serial_number] = determine_device(serial_number)(
+                serial_number=serial_number, data=json_data
+            )
+            self.emit(EVENT_DEVICE_DISCOVERED, device)
+
+        self._record_seen(device)
+        stats = self.get_device_stats(serial_number)
+        stats.record_packet(message_type := json_data.get(DATA_TYPE))
+        if (packet_index := self._packet_indexes.get(serial_number)) is None:
+            packet_index = self._packet_indexes[serial_number] = PacketIndex()
+        if (verdict := packet_index.check(message_type, json_data)) != NEW:
+            stats.counters[
+                DUPLICATE_PACKETS if verdict == DUPLICATE else OUT_OF_ORDER_PACKETS
+            ] += 1
+            return
+
+        if (mailbox := self._mailboxes.get(serial_number)) is None:
+            mailbox = self._mailboxes[serial_number] = DeviceMailbox()
+        if (result := mailbox.put(message_type, json_data)) != QUEUED:
+            stats.counters[
+                SUPERSEDED_PACKETS if result == SUPERSEDED else OVERFLOW_PACKETS
+            ] += 1
+        stale = self._check_stale(serial_number, json_data)
+        if serial_number not in self._drain_handles:
+            self._schedule_drain(serial_number, mailbox, stale)
+        stats.listener_timing.record(time.perf_counter() - start)
+
+    def _check_stale(self, serial_number: str, data: dict[str, Any]) -> bool:
+        """Return if a packet arrived `STALE_PACKET_AGE` late by the device clock.
+
+        The device clock is the newest timestamp of the device plus the
+        monotonic time since it was received, so a packet is only late relative
+        to the packets before it, however far the device and host clocks drift.
+        """
+        if (message := message_key(data)) is None:
+            return False
+        timestamp = message[0]
+        received = time.monotonic()
+        if (clock := self._device_clocks.get(serial_number)) is None:
+            self._device_clocks[serial_number] = (timestamp, received)
+            return False
+        newest, newest_received = clock
+        lag = newest + received - newest_received - timestamp
+        # A timestamp far behind the newest means the device clock was reset.
+        if timestamp > newest or newest - timestamp > MAX_REORDER:
+            self._device_clocks[serial_number] = (timestamp, received)
+        return lag > STALE_PACKET_AGE
+
+    def _schedule_drain(
+        self, serial_number: str, mailbox: DeviceMailbox, stale: bool
+    ) -> None:
+        """Schedule the delivery of the mailbox of a device."""
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        when = mailbox.last_drain + DRAIN_INTERVAL
+        if stale:
+            when = max(when, now + DRAIN_INTERVAL)
+        if when <= now:
+            handle = loop.call_soon(self._drain, serial_number)
+        else:
+            handle = loop.call_at(when, self._drain, serial_number)
+        self._drain_handles[serial_number] = handle
+
+    def _drain(self, serial_number: str) -> None:
+        """Parse the undelivered messages of a device."""
+        del self._drain_handles[serial_number]
+        mailbox = self._mailboxes[serial_number]
+        mailbox.last_drain = asyncio.get_running_loop().time()
+        device = self._devices[serial_number]
+        timing = self.get_device_stats(serial_number).parse_timing
+        for data in mailbox.drain():
+            start = time.perf_counter()
+            device.parse_message(data)
+            timing.record(time.perf_counter() - start)
+
+    async def stop_listening(self) -> None:
+        """Stop listening and drop the undelivered messages."""
+        for handle in self._drain_handles.values():
+            handle.cancel()
+        self._drain_handles.clear()
+        self._mailboxes.clear()
+        await super().stop_listening()
+
+    def restore_device(
+        self,
+        serial_number: str,
+        hub_sn: str | None = None,
+        firmware_revision: str | None = None,
+    ) -> WeatherFlowDevice:
+        """Return a device, creating it from stored data if it was not heard yet.
+
+        The first message of a restored device is parsed into the same device
+        object, so anything bound to it goes live without being recreated.
+        """
+        if (device := self._devices.get(serial_number)) is None:
+            device = self._devices[serial_number] = determine_device(serial_number)(
+                serial_number=serial_number, data={DATA_HUB_SN: hub_sn}
+            )
+            # pylint: disable-next=protected-access
+            device._firmware_revision = firmware_revision
+        return device
+
+    def _record_seen(self, device: WeatherFlowDevice) -> None:
+        """Record that a device was heard."""
+        now = time.time()
+        if (
+            (seen := self._seen_devices.get(device.serial_number)) is not None
+            and seen.host == self._host
+            and now - seen.last_seen < SEEN_DEVICE_MAX_AGE
+        ):
+            seen.last_seen = now
+            return
+
+        seen = self._seen_devices[device.serial_number] = SeenDevice(
+            device.serial_number,
+            device.model,
+            device.hub_sn if isinstance(device, WeatherFlowSensorDevice) else None,
+            self._host,
+            now,
+        )
+        self.emit(EVENT_DEVICE_SEEN, seen)
+
+
+class WeatherFlowListenerService:
+    """Own the UDP listeners and route their devices to config entries.
+
+    A single listener is started per host address and shared by every config
+    entry and config flow that uses it. Each device serial is claimed by the
+    first config entry that sets it up.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the listener service."""
+        self._hass = hass
+        self._listeners: dict[str, SharedWeatherFlowListener] = {}
+        self._users: dict[str, int] = {}
+        self._stop_handles: dict[str, TimerHandle] = {}
+        # Held while a listener starts or stops, so concurrent users of a host
+        # share one socket.
+        self._locks: dict[str, asyncio.Lock] = {}
+        self._claims: dict[str, str] = {}
+        self._seen_devices: dict[str, SeenDevice] = {}
+
+    def get_listener(self, host: str) -> SharedWeatherFlowListener | None:
+        """Return the running listener for a host, if any."""
+        return self._listeners.get(host)
+
+    async def async_acquire(self, host: str) -> SharedWeatherFlowListener:
+        """Return a started listener for a host, starting it if needed."""
+        if (handle := self._stop_handles.pop(host, None)) is not None:
+            handle.cancel()
+
+        async with self._locks.setdefault(host, asyncio.Lock()):
+            if (listener := self._listeners.get(host)) is None:
+                listener = SharedWeatherFlowListener(
+                    host, seen_devices=self._seen_devices
+                )
+                await listener.start_listening()
+                self._listeners[host] = listener
+                _LOGGER.debug("Started shared listener on %s", host)
+
+            self._users[host] = self._users.get(host, 0) + 1
+        return listener
+
+    @callback
+    def async_release(self, host: str) -> None:
+        """Release a listener, stopping it shortly after its last user is gone."""
+        if (users := self._users.get(host, 0) - 1) > 0:
+            self._users[host] = users
+            return
+
+        self._users.pop(host, None)
+        if host in self._listeners and host not in self._stop_handles:
+            self._stop_handles[host] = self._hass.loop.call_later(
+                LISTENER_LINGER,
+                lambda: self._hass.async_create_task(self._async_stop(host)),
+            )
+
+    @callback
+    def async_get_seen_devices(
+        self, host: str | None = None, max_age: float = SEEN_DEVICE_MAX_AGE
+    ) -> list[SeenDevice]:
+        """Return the hubs and devices recently heard, optionally on a host."""
+        cutoff = time.time() - max_age
+        return [
+            seen
+            for seen in self._seen_devices.values()
+            if seen.last_seen >= cutoff and (host is None or seen.host == host)
+        ]
+
+    @callback
+    def async_get_unclaimed_devices(
+        self, max_age: float = SEEN_DEVICE_MAX_AGE
+    ) -> list[SeenDevice]:
+        """Return the devices recently heard by a running listener, not yet set up.
+
+        These are the devices a new config entry would add, e.g. after an entry
+        was removed while its listener lingers.
+        """
+        cutoff = time.time() - max_age
+        return [
+            seen
+            for seen in self._seen_devices.values()
+            if seen.last_seen >= cutoff
+            and seen.host in self._listeners
+            and seen.serial_number not in self._claims
+        ]
+
+    @asynccontextmanager
+    async def async_listen(self, host: str) -> AsyncIterator[SharedWeatherFlowListener]:
+        """Acquire a listener for the duration of a context."""
+        listener = await self.async_acquire(host)
+        try:
+            yield listener
+        finally:
+            self.async_release(host)
+
+    @callback
+    def async_claim_device(self, serial_number: str, entry_id: str) -> bool:
+        """Claim a device for a config entry, returning `False` if taken."""
+        return self._claims.setdefault(serial_number, entry_id) == entry_id
+
+    @callback
+    def async_release_devices(self, entry_id: str) -> None:
+        """Release all devices claimed by a config entry."""
+        for serial_number in [
+            serial_number
+            for serial_number, owner in self._claims.items()
+            if owner == entry_id
+        ]:
+            self._claims.pop(serial_number)
+
+    async def async_shutdown(self) -> None:
+        """Stop all listeners."""
+        for host in list(self._listeners):
+            await self._async_stop(host, force=True)
+
+    async def _async_stop(self, host: str, force: bool = False) -> None:
+        """Stop the listener for a host if it is unused."""
+        if (handle := self._stop_handles.pop(host, None)) is not None:
+            handle.cancel()
+        async with self._locks.setdefault(host, asyncio.Lock()):
+            if (self._users.get(host) and not force) or (
+                listener := self._listeners.pop(host, None)
+            ) is None:
+                return
+            await listener.stop_listening()
+        _LOGGER.debug("Stopped shared listener on %s", host)
+
+
+@callback
+def async_get_listener_service(hass: HomeAssistant) -> WeatherFlowListenerService:
+    """Return the listener service, creating it if needed."""
+    domain_data: dict[str, Any] = hass.data.setdefault(DOMAIN, {})
+    if (service := domain_data.get(DATA_LISTENER_SERVICE)) is None:
+        service = domain_data[DATA_LISTENER_SERVICE] = WeatherFlowListenerService(hass)
+
+        async def handle_ha_shutdown(event: Event) -> None:
+            """Handle HA shutdown."""
+            await service.async_shutdown()
+
+        hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, handle_ha_shutdown)
+    return service
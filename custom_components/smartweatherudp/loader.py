@@ -0,0 +1,22 @@
+"""Deferred imports for the smartweatherudp integration."""
+from __future__ import annotations
+
+import importlib
+import sys
+from types import ModuleType
+
+from homeassistant.core import HomeAssistant
+
+
+async def async_import_module(hass: HomeAssistant, name: str) -> ModuleType:
+    """Import a module of the integration in the executor.
+
+    Importing `pyweatherflowudp` imports pint and builds its unit registry, which
+    is slow on low-power hardware. Modules that need it are only imported once a
+    config entry or flow needs them, and off the event loop.
+    """
+    if (module := sys.modules.get(f"{__package__}.{name}")) is not None:
+        return module
+    return await hass.async_add_executor_job(
+        importlib.import_module, f".{name}", __package__
+    )
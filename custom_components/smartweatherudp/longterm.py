@@ -0,0 +1,159 @@
+"""Long-term statistics import for the smartweatherudp integration."""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime
+import logging
+import math
+
+from homeassistant.components.recorder import get_instance
+from homeassistant.components.recorder.models import StatisticData, StatisticMetaData
+from homeassistant.components.recorder.statistics import (
+    async_add_external_statistics,
+    get_last_statistics,
+)
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_utc_time_change
+from homeassistant.util import dt as dt_util
+
+_LOGGER = logging.getLogger(__name__)
+
+# Seconds between state writes of the sensors whose statistics are imported.
+STATE_INTERVAL = 300
+
+HOUR = 3600
+
+
+class HourlyAggregator:
+    """Hourly mean, minimum, maximum and sum of the values of a sensor."""
+
+    __slots__ = ("_start", "_earliest", "_count", "_total", "_min", "_max", "completed")
+
+    def __init__(self) -> None:
+        """Initialize the aggregator."""
+        self._start: float | None = None
+        # Start of the earliest hour still open; samples of earlier hours arrive
+        # late, e.g. rapid wind interleaved with observations, and are dropped.
+        self._earliest = -math.inf
+        self._count = 0
+        self._total = 0.0
+        self._min = math.inf
+        self._max = -math.inf
+        # Start, mean, minimum, maximum and sum of each completed hour.
+        self.completed: list[tuple[float, float, float, float, float]] = []
+
+    def add(self, epoch: float, value: float) -> None:
+        """Add a value sampled at epoch."""
+        if (start := epoch - epoch % HOUR) != self._start:
+            if start < self._earliest:
+                return
+            self.close(start)
+            self._start = start
+        self._count += 1
+        self._total += value
+        if value < self._min:
+            self._min = value
+        if value > self._max:
+            self._max = value
+
+    def close(self, epoch: float) -> None:
+        """Complete the current hour if it started before the hour of epoch."""
+        start = epoch - epoch % HOUR
+        self._earliest = max(self._earliest, start)
+        if self._start is None or self._start >= start:
+            return
+        if self._count:
+            self.completed.append(
+                (
+                    self._start,
+                    self._total / self._count,
+                    self._min,
+                    self._max,
+                    self._total,
+                )
+            )
+        self._start = None
+        self._count = 0
+        self._total = 0.0
+        self._min = math.inf
+        self._max = -math.inf
+
+
+@dataclass
+class _ImportedStatistic:
+    """An imported statistic and the aggregator feeding it."""
+
+    __slots__ = ("metadata", "aggregator", "last_sum")
+
+    metadata: StatisticMetaData
+    aggregator: HourlyAggregator
+    last_sum: float | None
+
+
+class LongTermStatistics:
+    """Import hourly statistics of sensors aggregated from device events.
+
+    Each completed hour is imported as external statistics shortly after
+    the hour, so the recorder does not need a state row per sample to keep
+    accurate long-term statistics.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the long-term statistics."""
+        self._hass = hass
+        self._statistics: dict[str, _ImportedStatistic] = {}
+        self._cancel_import: CALLBACK_TYPE | None = None
+
+    @callback
+    def async_register(self, metadata: StatisticMetaData) -> HourlyAggregator:
+        """Return the aggregator of a statistic, registering it if needed."""
+        if (statistic := self._statistics.get(metadata["statistic_id"])) is None:
+            statistic = self._statistics[metadata["statistic_id"]] = _ImportedStatistic(
+                metadata, HourlyAggregator(), None
+            )
+        return statistic.aggregator
+
+    @callback
+    def async_start(self) -> None:
+        """Import the completed hours shortly after each hour."""
+        self._cancel_import = async_track_utc_time_change(
+            self._hass, self._async_import, minute=0, second=10
+        )
+
+    async def async_stop(self) -> None:
+        """Stop importing, importing the hours completed so far."""
+        if self._cancel_import is not None:
+            self._cancel_import()
+            self._cancel_import = None
+        await self._async_import(dt_util.utcnow())
+
+    async def _async_import(self, now: datetime) -> None:
+        """Import the statistics of the completed hours."""
+        epoch = now.timestamp()
+        # Sensors may be added while waiting for the recorder.
+        for statistic_id, statistic in list(self._statistics.items()):
+            aggregator = statistic.aggregator
+            aggregator.close(epoch)
+            if not (completed := aggregator.completed):
+                continue
+            aggregator.completed = []
+
+            metadata = statistic.metadata
+            if metadata["has_sum"] and statistic.last_sum is None:
+                last = await get_instance(self._hass).async_add_executor_job(
+                    get_last_statistics, self._hass, 1, statistic_id, True, {"sum"}
+                )
+                rows = last.get(statistic_id)
+                statistic.last_sum = (rows[0].get("sum") if rows else None) or 0.0
+
+            data: list[StatisticData] = []
+            for start, mean, minimum, maximum, total in completed:
+                row = StatisticData(start=dt_util.utc_from_timestamp(start))
+                if metadata["has_mean"]:
+                    row.update(mean=mean, min=minimum, max=maximum)
+                if metadata["has_sum"]:
+                    statistic.last_sum += total
+                    row.update(state=total, sum=statistic.last_sum)
+                data.append(row)
+            _LOGGER.debug("Importing %s hours of %s", len(data), statistic_id)
+            async_add_external_statistics(self._hass, metadata, data)
@@ -0,0 +1,57 @@
+"""Per-device mailboxes between the UDP listener and the device parsers."""
+from __future__ import annotations
+
+from collections import deque
+from operator import itemgetter
+from typing import Any
+
+# Message types of which only the newest message matters.
+LATEST_ONLY_TYPES = frozenset(("device_status", "hub_status", "rapid_wind"))
+
+# Messages of other types kept per type until the mailbox is drained. Each
+# observation and event feeds the rain and lightning statistics, so they are
+# queued rather than replaced; an hour of observations fits.
+QUEUE_SIZE = 60
+
+QUEUED = 0
+SUPERSEDED = 1
+OVERFLOW = 2
+
+
+class DeviceMailbox:
+    """Bounded mailbox of the undelivered messages of a device, per message type."""
+
+    __slots__ = ("_queues", "_sequence", "last_drain")
+
+    def __init__(self) -> None:
+        """Initialize the mailbox."""
+        self._queues: dict[str | None, deque[tuple[int, dict[str, Any]]]] = {}
+        self._sequence = 0
+        # Loop time of the last drain.
+        self.last_drain = float("-inf")
+
+    def put(self, message_type: str | None, data: dict[str, Any]) -> int:
+        """Add a message, returning `QUEUED`, `SUPERSEDED` or `OVERFLOW`.
+
+        `SUPERSEDED` means an undelivered message of a latest-only type was
+        replaced, and `OVERFLOW` that the oldest queued message was dropped.
+        """
+        if (queue := self._queues.get(message_type)) is None:
+            queue = self._queues[message_type] = deque(
+                maxlen=1 if message_type in LATEST_ONLY_TYPES else QUEUE_SIZE
+            )
+        result = QUEUED
+        if len(queue) == queue.maxlen:
+            result = SUPERSEDED if queue.maxlen == 1 else OVERFLOW
+        self._sequence += 1
+        queue.append((self._sequence, data))
+        return result
+
+    def drain(self) -> list[dict[str, Any]]:
+        """Remove and return the undelivered messages in the order received."""
+        messages: list[tuple[int, dict[str, Any]]] = []
+        for queue in self._queues.values():
+            messages.extend(queue)
+            queue.clear()
+        messages.sort(key=itemgetter(0))
+        return [data for _, data in messages]
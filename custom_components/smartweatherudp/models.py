@@ -0,0 +1,71 @@
+"""Models for the smartweatherudp integration."""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+
+from pyweatherflowudp.device import WeatherFlowDevice
+
+from homeassistant.helpers.entity import DeviceInfo
+
+from .dispatch import DeviceEventDispatcher
+from .exporter import ObservationExporter
+from .lightning import LightningStrikeIndex
+from .listener import SharedWeatherFlowListener
+from .longterm import LongTermStatistics
+from .rain import RainAccumulator
+from .scheduler import StateWriteScheduler
+from .stats import DeviceStats
+from .storage import DeviceSnapshotStore
+from .wind import WindStatistics
+
+
+@dataclass
+class WeatherFlowDeviceData:
+    """Runtime data for a WeatherFlow device."""
+
+    device: WeatherFlowDevice
+    dispatcher: DeviceEventDispatcher
+    stats: DeviceStats
+    lightning: LightningStrikeIndex | None = None
+    rain: RainAccumulator | None = None
+    wind: WindStatistics | None = None
+    # Sensor keys restored from storage, or `None` for a newly discovered device.
+    # The entities follow the sensors of the device class either way.
+    sensors: list[str] | None = None
+    # Keys of the sensors enabled in the entity registry, with the attribute
+    # holding the statistics each reads, if any.
+    enabled_sensors: dict[str, str | None] = field(default_factory=dict)
+
+
+@dataclass
+class WeatherFlowEntityContext:
+    """State shared by the sensor entities of a WeatherFlow device."""
+
+    __slots__ = (
+        "device_data",
+        "scheduler",
+        "device_info",
+        "name",
+        "unique_id_prefix",
+        "longterm",
+    )
+
+    device_data: WeatherFlowDeviceData
+    scheduler: StateWriteScheduler | None
+    device_info: DeviceInfo
+    name: str
+    unique_id_prefix: str
+    longterm: LongTermStatistics | None
+
+
+@dataclass
+class WeatherFlowEntryData:
+    """Runtime data for a WeatherFlow config entry."""
+
+    client: SharedWeatherFlowListener
+    scheduler: StateWriteScheduler
+    store: DeviceSnapshotStore
+    # Set when long-term statistics are imported rather than compiled by the recorder.
+    longterm: LongTermStatistics | None = None
+    exporter: ObservationExporter | None = None
+    devices: dict[str, WeatherFlowDeviceData] = field(default_factory=dict)
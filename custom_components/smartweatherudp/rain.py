@@ -0,0 +1,170 @@
+"""Rain accumulation for the smartweatherudp integration."""
+from __future__ import annotations
+
+from array import array
+from collections import deque
+from datetime import date, datetime, tzinfo
+from typing import Any
+
+from pint import Quantity
+from pyweatherflowudp.const import UNIT_MILLIMETERS
+from pyweatherflowudp.helpers import value_as_unit
+
+HOUR_SLOTS = 60
+
+# A rain event ends after this many seconds without rain.
+RAIN_EVENT_TIMEOUT = 3600
+
+# Observations kept to replay on top of a restored snapshot.
+PENDING_OBSERVATIONS = 180
+
+
+class RainAccumulator:
+    """Incremental rain accumulation.
+
+    Tracks the rain over the last hour in a rolling buffer of one minute slots,
+    the rain today and yesterday in local time, and the rain during the current
+    rain event. Each observation is an O(1) update.
+    """
+
+    def __init__(self, time_zone: tzinfo) -> None:
+        """Initialize the rain accumulator."""
+        self._time_zone = time_zone
+        self._pending: deque[tuple[int, float]] = deque(maxlen=PENDING_OBSERVATIONS)
+        self._restored_epoch = 0
+        self._reset()
+
+    def _reset(self) -> None:
+        """Reset the accumulated values."""
+        self._last_epoch = 0
+        self._minutes = array("q", [-1] * HOUR_SLOTS)
+        self._amounts = array("d", [0.0] * HOUR_SLOTS)
+        self._last_minute = -1
+        self._hour = 0.0
+        self._day: date | None = None
+        self._today = 0.0
+        self._yesterday = 0.0
+        self._event = 0.0
+        self._last_rain_epoch = 0
+
+    @property
+    def last_epoch(self) -> int:
+        """Return the epoch of the last observation."""
+        return self._last_epoch
+
+    @property
+    def last_hour(self) -> Quantity[float]:
+        """Return the rain accumulation over the last hour in millimeters (mm)."""
+        return value_as_unit(max(self._hour, 0.0), UNIT_MILLIMETERS)
+
+    @property
+    def today(self) -> Quantity[float]:
+        """Return the rain accumulation today in millimeters (mm)."""
+        return value_as_unit(self._today, UNIT_MILLIMETERS)
+
+    @property
+    def yesterday(self) -> Quantity[float]:
+        """Return the rain accumulation yesterday in millimeters (mm)."""
+        return value_as_unit(self._yesterday, UNIT_MILLIMETERS)
+
+    @property
+    def event(self) -> Quantity[float]:
+        """Return the rain accumulation of the current or last rain event in millimeters (mm)."""
+        return value_as_unit(self._event, UNIT_MILLIMETERS)
+
+    def add(self, epoch: int, amount: float | None) -> None:
+        """Add the rain accumulation of an observation in millimeters."""
+        self._pending.append((epoch, amount or 0.0))
+        self._add(epoch, amount or 0.0)
+
+    def _add(self, epoch: int, amount: float) -> None:
+        """Update the accumulated values with an observation."""
+        if epoch <= self._last_epoch:
+            return
+        self._last_epoch = epoch
+
+        minute = epoch // 60
+        self._expire_minutes(minute)
+        slot = minute % HOUR_SLOTS
+        if self._minutes[slot] != minute:
+            self._minutes[slot] = minute
+            self._amounts[slot] = 0.0
+        self._amounts[slot] += amount
+        self._hour += amount
+
+        day = datetime.fromtimestamp(epoch, self._time_zone).date()
+        if self._day != day:
+            self._yesterday = (
+                self._today
+                if self._day is not None and (day - self._day).days == 1
+                else 0.0
+            )
+            self._today = 0.0
+            self._day = day
+        self._today += amount
+
+        if amount > 0:
+            if epoch - self._last_rain_epoch > RAIN_EVENT_TIMEOUT:
+                self._event = 0.0
+            self._event += amount
+            self._last_rain_epoch = epoch
+
+    def _expire_minutes(self, minute: int) -> None:
+        """Drop the slots that are more than an hour old."""
+        if self._last_minute < 0 or minute - self._last_minute >= HOUR_SLOTS:
+            self._minutes = array("q", [-1] * HOUR_SLOTS)
+            self._amounts = array("d", [0.0] * HOUR_SLOTS)
+            self._hour = 0.0
+        else:
+            for expired in range(self._last_minute + 1, minute + 1):
+                slot = expired % HOUR_SLOTS
+                if self._minutes[slot] != -1:
+                    self._hour -= self._amounts[slot]
+                    self._minutes[slot] = -1
+                    self._amounts[slot] = 0.0
+        if minute > self._last_minute:
+            self._last_minute = minute
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a snapshot of the accumulated values."""
+        return {
+            "epoch": self._last_epoch,
+            "hour": [
+                [minute, amount]
+                for minute, amount in zip(self._minutes, self._amounts)
+                if minute != -1
+            ],
+            "day": None if self._day is None else self._day.isoformat(),
+            "today": self._today,
+            "yesterday": self._yesterday,
+            "event": self._event,
+            "last_rain_epoch": self._last_rain_epoch,
+        }
+
+    def restore(self, snapshot: dict[str, Any] | None) -> None:
+        """Restore a snapshot and replay the observations received since."""
+        if not snapshot or (epoch := snapshot.get("epoch", 0)) <= self._restored_epoch:
+            return
+
+        try:
+            self._reset()
+            self._last_epoch = epoch
+            for minute, amount in snapshot.get("hour", []):
+                slot = minute % HOUR_SLOTS
+                self._minutes[slot] = minute
+                self._amounts[slot] = amount
+                self._hour += amount
+                self._last_minute = max(self._last_minute, minute)
+            if (day := snapshot.get("day")) is not None:
+                self._day = date.fromisoformat(day)
+            self._today = snapshot.get("today", 0.0)
+            self._yesterday = snapshot.get("yesterday", 0.0)
+            self._event = snapshot.get("event", 0.0)
+            self._last_rain_epoch = snapshot.get("last_rain_epoch", 0)
+        except (TypeError, ValueError):
+            self._reset()
+        else:
+            self._restored_epoch = epoch
+
+        for pending_epoch, amount in self._pending:
+            self._add(pending_epoch, amount)
@@ -0,0 +1,438 @@
+"""Config entry runtime for the smartweatherudp integration."""
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from functools import partial
+import logging
+import math
+
+from pyweatherflowudp.client import EVENT_DEVICE_DISCOVERED
+from pyweatherflowudp.const import EVENT_RAPID_WIND, EVENT_STRIKE
+from pyweatherflowudp.device import (
+    EVENT_LOAD_COMPLETE,
+    EVENT_OBSERVATION,
+    AirSensorType,
+    SkySensorType,
+    WeatherFlowDevice,
+    WeatherFlowSensorDevice,
+)
+from pyweatherflowudp.errors import ListenerError
+from pyweatherflowudp.event import CustomEvent, LightningStrikeEvent, WindEvent
+
+from homeassistant.components.sensor import DOMAIN as SENSOR_DOMAIN
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import (
+    CONF_HOST,
+    EVENT_HOMEASSISTANT_STARTED,
+    EVENT_HOMEASSISTANT_STOP,
+)
+from homeassistant.core import (
+    CALLBACK_TYPE,
+    CoreState,
+    Event,
+    HomeAssistant,
+    callback,
+)
+from homeassistant.exceptions import ConfigEntryNotReady
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+from homeassistant.helpers.event import (
+    async_track_point_in_utc_time,
+    async_track_time_interval,
+)
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    CONF_EXPORT_FORMAT,
+    CONF_EXPORT_TARGET,
+    CONF_HEARTBEAT_INTERVAL,
+    CONF_IMPORT_STATISTICS,
+    DEFAULT_EXPORT_FORMAT,
+    DEFAULT_EXPORT_TARGET,
+    DEFAULT_HEARTBEAT_INTERVAL,
+    DEFAULT_HOST,
+    DEFAULT_IMPORT_STATISTICS,
+    DOMAIN,
+    PLATFORMS,
+)
+from .dispatch import (
+    EVENT_ENABLED_SENSORS_CHANGED,
+    EVENT_STATS_UPDATED,
+    DeviceEventDispatcher,
+)
+from .exporter import FORMATTERS, ObservationExporter, create_sink
+from .lightning import LightningStrikeIndex
+from .listener import async_get_listener_service
+from .longterm import LongTermStatistics
+from .models import WeatherFlowDeviceData, WeatherFlowEntryData
+from .rain import RainAccumulator
+from .scheduler import StateWriteScheduler
+from .services import async_setup_services
+from .storage import DeviceSnapshotStore
+from .websocket_api import async_get_rapid_wind_stream
+from .wind import WindStatistics
+
+_LOGGER = logging.getLogger(__name__)
+
+# How often wind samples are expired while no rapid wind arrives.
+WIND_EXPIRY_INTERVAL = timedelta(seconds=10)
+
+# How often the runtime statistics sensors are updated.
+STATS_UPDATE_INTERVAL = timedelta(seconds=30)
+
+
+async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
+    """Set up WeatherFlow from a config entry."""
+    service = async_get_listener_service(hass)
+    host = entry.data.get(CONF_HOST, DEFAULT_HOST)
+
+    try:
+        client = await service.async_acquire(host)
+    except ListenerError as ex:
+        raise ConfigEntryNotReady from ex
+
+    store = DeviceSnapshotStore(hass, entry.entry_id)
+    await store.async_load()
+
+    data = hass.data[DOMAIN][entry.entry_id] = WeatherFlowEntryData(
+        client=client,
+        scheduler=StateWriteScheduler(hass),
+        store=store,
+    )
+    await _async_apply_options(hass, entry, data)
+
+    async def shutdown_exporter(event: Event) -> None:
+        """Write the buffered observations when Home Assistant stops."""
+        if data.exporter is not None:
+            await data.exporter.async_shutdown()
+
+    entry.async_on_unload(
+        hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, shutdown_exporter)
+    )
+
+    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    async_setup_services(hass)
+    rapid_wind_stream = async_get_rapid_wind_stream(hass)
+
+    @callback
+    def device_discovered(
+        device: WeatherFlowDevice, sensors: list[str] | None = None
+    ) -> None:
+        if device.serial_number in data.devices:
+            return
+        if not service.async_claim_device(device.serial_number, entry.entry_id):
+            _LOGGER.debug("Ignoring a device set up by another entry: %s", device)
+            return
+
+        _LOGGER.debug("Found a device: %s", device)
+        device_data = data.devices[device.serial_number] = WeatherFlowDeviceData(
+            device=device,
+            dispatcher=DeviceEventDispatcher(hass, device),
+            stats=client.get_device_stats(device.serial_number),
+            sensors=sensors,
+        )
+        entry.async_on_unload(device_data.dispatcher.async_shutdown)
+
+        _async_setup_device_statistics(hass, entry, device_data)
+        if isinstance(device, WeatherFlowSensorDevice):
+            # Exporting can be turned on and off without a reload.
+            entry.async_on_unload(
+                device.on(
+                    EVENT_OBSERVATION,
+                    partial(_async_export_observation, data, device),
+                )
+            )
+        if isinstance(device, SkySensorType):
+            entry.async_on_unload(
+                device.on(
+                    EVENT_RAPID_WIND,
+                    partial(rapid_wind_stream.async_publish, device.serial_number),
+                )
+            )
+
+        @callback
+        def add_device() -> None:
+            async_dispatcher_send(
+                hass, f"{DOMAIN}_{entry.entry_id}_add_{SENSOR_DOMAIN}", device_data
+            )
+
+        if sensors is not None:
+            # Restored devices get their entities right away; the snapshot is
+            # refreshed once the device has reported.
+            add_device()
+            if not device.load_complete:
+                entry.async_on_unload(
+                    device.on(
+                        EVENT_LOAD_COMPLETE,
+                        lambda _: store.async_update_device(device),
+                    )
+                )
+            return
+
+        if device.load_complete:
+            add_device()
+            return
+
+        entry.async_on_unload(
+            device.on(
+                EVENT_LOAD_COMPLETE,
+                lambda _: add_device()
+                if hass.state == CoreState.running
+                else hass.bus.async_listen_once(
+                    EVENT_HOMEASSISTANT_STARTED, lambda _: add_device()
+                ),
+            )
+        )
+
+    entry.async_on_unload(client.on(EVENT_DEVICE_DISCOVERED, device_discovered))
+
+    @callback
+    def update_stats(now: datetime) -> None:
+        """Update the runtime statistics sensors of every device."""
+        for device_data in data.devices.values():
+            device_data.dispatcher.async_notify(EVENT_STATS_UPDATED)
+
+    entry.async_on_unload(
+        async_track_time_interval(hass, update_stats, STATS_UPDATE_INTERVAL)
+    )
+
+    for snapshot in store.devices.values():
+        device_discovered(
+            client.restore_device(
+                snapshot["serial_number"],
+                snapshot["hub_sn"],
+                snapshot["firmware_revision"],
+            ),
+            snapshot["sensors"],
+        )
+
+    # The shared listener may already know devices, e.g. after a reload.
+    for device in client.devices:
+        device_discovered(device)
+
+    return True
+
+
+async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
+    """Unload a config entry."""
+    unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
+
+    data: WeatherFlowEntryData = hass.data[DOMAIN][entry.entry_id]
+    data.scheduler.async_shutdown()
+    if data.longterm is not None:
+        await data.longterm.async_stop()
+    if data.exporter is not None:
+        await data.exporter.async_shutdown()
+
+    service = async_get_listener_service(hass)
+    service.async_release_devices(entry.entry_id)
+    service.async_release(entry.data.get(CONF_HOST, DEFAULT_HOST))
+
+    if unload_ok:
+        hass.data[DOMAIN].pop(entry.entry_id)
+
+    return unload_ok
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove the stored devices of a config entry."""
+    await DeviceSnapshotStore(hass, entry.entry_id).async_remove()
+
+
+async def async_update_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Apply changed options without reloading the entry.
+
+    The listener, devices and entities are kept, so no packets are missed and
+    no sensor becomes unavailable. The host an entry listens on can not be
+    changed, so there is nothing that needs a reload.
+    """
+    data: WeatherFlowEntryData = hass.data[DOMAIN][entry.entry_id]
+    _LOGGER.debug("Applying the options of %s", entry.title)
+    await _async_apply_options(hass, entry, data)
+    async_dispatcher_send(hass, f"{DOMAIN}_{entry.entry_id}_options_updated")
+
+
+async def _async_apply_options(
+    hass: HomeAssistant, entry: ConfigEntry, data: WeatherFlowEntryData
+) -> None:
+    """Apply the options that are not read by the platforms."""
+    data.scheduler.heartbeat = (
+        entry.options.get(CONF_HEARTBEAT_INTERVAL, DEFAULT_HEARTBEAT_INTERVAL) * 60
+    )
+
+    import_statistics = entry.options.get(
+        CONF_IMPORT_STATISTICS, DEFAULT_IMPORT_STATISTICS
+    )
+    if import_statistics and "recorder" not in hass.config.components:
+        _LOGGER.warning("Long-term statistics can not be imported without the recorder")
+        import_statistics = False
+    if import_statistics and data.longterm is None:
+        data.longterm = LongTermStatistics(hass)
+        data.longterm.async_start()
+    elif not import_statistics and (longterm := data.longterm) is not None:
+        data.longterm = None
+        await longterm.async_stop()
+
+    export_format = entry.options.get(CONF_EXPORT_FORMAT, DEFAULT_EXPORT_FORMAT)
+    exporter: ObservationExporter | None = None
+    if export_format in FORMATTERS:
+        try:
+            sink = create_sink(
+                hass, entry.options.get(CONF_EXPORT_TARGET, DEFAULT_EXPORT_TARGET)
+            )
+        except ValueError as err:
+            _LOGGER.warning("Observations can not be exported: %s", err)
+        else:
+            if (previous := data.exporter) is not None and (
+                previous.export_format,
+                previous.target,
+            ) == (export_format, str(sink)):
+                return
+            exporter = ObservationExporter(hass, export_format, sink)
+            exporter.async_start()
+    # Replaced before the previous exporter is shut down, so no observation is lost.
+    previous, data.exporter = data.exporter, exporter
+    if previous is not None:
+        await previous.async_shutdown()
+
+
+@callback
+def _async_export_observation(
+    data: WeatherFlowEntryData, device: WeatherFlowDevice, event: CustomEvent
+) -> None:
+    """Export an observation of a device, if exporting."""
+    if data.exporter is not None:
+        data.exporter.async_add_observation(device, event)
+
+
+@callback
+def _async_setup_device_statistics(
+    hass: HomeAssistant, entry: ConfigEntry, device_data: WeatherFlowDeviceData
+) -> None:
+    """Feed device events into the statistics kept for the device.
+
+    The rain and lightning statistics accumulate, so they are always fed. The
+    work only needed for enabled sensors, the wind windows and the lightning
+    window updates, runs only while a sensor reading the statistic is enabled.
+    """
+    device = device_data.device
+    # The callbacks resuming and pausing the gated work of each statistic.
+    gates: dict[str, tuple[CALLBACK_TYPE, CALLBACK_TYPE]] = {}
+    active: set[str] = set()
+
+    if isinstance(device, AirSensorType):
+        lightning = device_data.lightning = LightningStrikeIndex()
+        cancel_expiry: CALLBACK_TYPE | None = None
+
+        @callback
+        def schedule_expiry() -> None:
+            """Schedule an update for when the next strike leaves a window."""
+            nonlocal cancel_expiry
+            if cancel_expiry is not None:
+                cancel_expiry()
+                cancel_expiry = None
+            if (expiry := lightning.next_expiry()) is not None:
+                cancel_expiry = async_track_point_in_utc_time(
+                    hass, handle_expiry, dt_util.utc_from_timestamp(math.ceil(expiry))
+                )
+
+        @callback
+        def handle_expiry(now: datetime) -> None:
+            """Update the lightning sensors when a strike leaves a window."""
+            nonlocal cancel_expiry
+            cancel_expiry = None
+            device_data.dispatcher.async_notify(EVENT_STRIKE)
+            schedule_expiry()
+
+        @callback
+        def add_strike(event: LightningStrikeEvent) -> None:
+            """Add a lightning strike to the index."""
+            if (
+                lightning.add(event.epoch, event.distance.m, event.energy)
+                and "lightning" in active
+            ):
+                schedule_expiry()
+
+        @callback
+        def cancel_scheduled_expiry() -> None:
+            """Cancel the scheduled lightning window update."""
+            nonlocal cancel_expiry
+            if cancel_expiry is not None:
+                cancel_expiry()
+                cancel_expiry = None
+
+        entry.async_on_unload(device.on(EVENT_STRIKE, add_strike))
+        entry.async_on_unload(cancel_scheduled_expiry)
+        gates["lightning"] = (schedule_expiry, cancel_scheduled_expiry)
+
+    if isinstance(device, SkySensorType):
+        rain = device_data.rain = RainAccumulator(dt_util.DEFAULT_TIME_ZONE)
+        wind = device_data.wind = WindStatistics()
+        unsubscribe_wind: CALLBACK_TYPE | None = None
+
+        @callback
+        def add_rain_observation(event: CustomEvent) -> None:
+            """Add an observation to the rain accumulation."""
+            if (amount := device.rain_accumulation_previous_minute) is not None:
+                amount = amount.m
+            rain.add(event.epoch, amount)
+
+        @callback
+        def add_wind_sample(event: WindEvent) -> None:
+            """Add a rapid wind sample to the wind statistics."""
+            wind.add(event.epoch, event.speed.m, event.direction.m)
+
+        @callback
+        def subscribe_wind() -> None:
+            """Feed rapid wind samples into the wind statistics."""
+            nonlocal unsubscribe_wind
+            if unsubscribe_wind is None:
+                unsubscribe_wind = device.on(EVENT_RAPID_WIND, add_wind_sample)
+
+        @callback
+        def unsubscribe_wind_samples() -> None:
+            """Stop feeding rapid wind samples into the wind statistics."""
+            nonlocal unsubscribe_wind
+            if unsubscribe_wind is not None:
+                unsubscribe_wind()
+                unsubscribe_wind = None
+
+        @callback
+        def expire_wind(now: datetime) -> None:
+            """Update the wind statistics sensors when samples leave a window."""
+            if wind.expire():
+                device_data.dispatcher.async_notify(EVENT_RAPID_WIND)
+
+        entry.async_on_unload(device.on(EVENT_OBSERVATION, add_rain_observation))
+        entry.async_on_unload(unsubscribe_wind_samples)
+        entry.async_on_unload(
+            async_track_time_interval(hass, expire_wind, WIND_EXPIRY_INTERVAL)
+        )
+        gates["wind"] = (subscribe_wind, unsubscribe_wind_samples)
+
+    if not gates:
+        return
+
+    # Until the sensors are added all work runs, so no event is missed.
+    for statistic, (resume, _) in gates.items():
+        active.add(statistic)
+        resume()
+
+    @callback
+    def update_gates() -> None:
+        """Run the gated work of the statistics read by enabled sensors only."""
+        enabled = set(device_data.enabled_sensors.values())
+        for statistic, (resume, pause) in gates.items():
+            if statistic not in enabled and statistic in active:
+                _LOGGER.debug("Pausing %s statistics for %s", statistic, device)
+                active.discard(statistic)
+                pause()
+            elif statistic in enabled and statistic not in active:
+                _LOGGER.debug("Resuming %s statistics for %s", statistic, device)
+                active.add(statistic)
+                resume()
+
+    entry.async_on_unload(
+        device_data.dispatcher.async_subscribe(
+            EVENT_ENABLED_SENSORS_CHANGED, update_gates
+        )
+    )
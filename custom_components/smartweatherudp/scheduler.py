@@ -0,0 +1,94 @@
+"""State write scheduler for the smartweatherudp integration."""
+from __future__ import annotations
+
+from asyncio import TimerHandle
+import time
+from typing import Callable
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.entity import Entity
+
+
+class StateWriteScheduler:
+    """Coalesce state writes so each entity writes at most once per interval.
+
+    Writes are issued on the leading edge when the interval has elapsed. Writes
+    requested within the interval are collapsed into a single trailing write at
+    the end of the interval, so the newest value is never lost.
+
+    `heartbeat` is the number of seconds after which an entity should write its
+    state even if the value has not changed, or 0 to never force a write.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        intervals: dict[str, float] | None = None,
+        heartbeat: float = 0,
+    ) -> None:
+        """Initialize the scheduler."""
+        self._hass = hass
+        self._intervals: dict[str, float] = dict(intervals or {})
+        self.heartbeat = heartbeat
+        self._last_write: dict[Entity, float] = {}
+        self._pending: dict[Entity, TimerHandle] = {}
+
+    @callback
+    def async_set_intervals(self, intervals: dict[str, float]) -> None:
+        """Replace the minimum write interval, in seconds, per sensor key."""
+        self._intervals = dict(intervals)
+
+    @callback
+    def async_schedule(
+        self, entity: Entity, write: Callable[[], None] | None = None
+    ) -> None:
+        """Write the entity state now or schedule a trailing write.
+
+        `write` defaults to `entity.async_write_ha_state`.
+        """
+        if write is None:
+            write = entity.async_write_ha_state
+
+        if not (interval := self._intervals.get(entity.entity_description.key)):
+            write()
+            return
+
+        if entity in self._pending:
+            return
+
+        now = time.monotonic()
+        if (last_write := self._last_write.get(entity)) is None or (
+            delay := last_write + interval - now
+        ) <= 0:
+            self._write(entity, write, now)
+            return
+
+        self._pending[entity] = self._hass.loop.call_later(
+            delay, self._flush, entity, write
+        )
+
+    @callback
+    def async_cancel(self, entity: Entity) -> None:
+        """Cancel a pending write and forget the entity."""
+        if (handle := self._pending.pop(entity, None)) is not None:
+            handle.cancel()
+        self._last_write.pop(entity, None)
+
+    @callback
+    def async_shutdown(self) -> None:
+        """Cancel all pending writes."""
+        for handle in self._pending.values():
+            handle.cancel()
+        self._pending.clear()
+        self._last_write.clear()
+
+    @callback
+    def _flush(self, entity: Entity, write: Callable[[], None]) -> None:
+        """Issue a trailing write."""
+        self._pending.pop(entity, None)
+        self._write(entity, write, time.monotonic())
+
+    def _write(self, entity: Entity, write: Callable[[], None], now: float) -> None:
+        """Write the entity state and record the write time."""
+        self._last_write[entity] = now
+        write()
@@ -1,75 +1,63 @@
 """Sensors for the smartweatherudp integration."""
 from __future__ import annotations
 
-from dataclasses import dataclass, field
+from dataclasses import dataclass
 from datetime import datetime
-from enum import Enum
 import logging
+import time
 from typing import Any
 
-from pyweatherflowudp.calc import Quantity
 from pyweatherflowudp.const import EVENT_RAPID_WIND
-from pyweatherflowudp.device import (
-    EVENT_OBSERVATION,
-    EVENT_STATUS_UPDATE,
-    WeatherFlowDevice,
-    WeatherFlowSensorDevice,
-)
+from pyweatherflowudp.device import WeatherFlowDevice
+from pyweatherflowudp.event import CustomEvent, WindEvent
 import voluptuous as vol
 
 from homeassistant.components.sensor import (
     DOMAIN as SENSOR_DOMAIN,
     PLATFORM_SCHEMA,
-    SensorDeviceClass,
-    SensorEntity,
-    SensorEntityDescription,
+    RestoreSensor,
+    SensorExtraStoredData,
     SensorStateClass,
 )
 from homeassistant.config_entries import SOURCE_IMPORT, ConfigEntry
-from homeassistant.const import (
-    CONF_HOST,
-    CONF_MONITORED_CONDITIONS,
-    CONF_NAME,
-    DEGREE,
-    LIGHT_LUX,
-    PERCENTAGE,
-    SIGNAL_STRENGTH_DECIBELS_MILLIWATT,
-    UV_INDEX,
-    UnitOfElectricPotential,
-    UnitOfIrradiance,
-    UnitOfLength,
-    UnitOfPrecipitationDepth,
-    UnitOfPressure,
-    UnitOfSpeed,
-    UnitOfTemperature,
-    UnitOfVolumetricFlux,
-)
-from homeassistant.core import Callable, HomeAssistant, callback
+from homeassistant.const import CONF_HOST, CONF_MONITORED_CONDITIONS, CONF_NAME
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
 import homeassistant.helpers.config_validation as cv
 from homeassistant.helpers.dispatcher import async_dispatcher_connect
-from homeassistant.helpers.entity import DeviceInfo, EntityCategory
-from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.entity import DeviceInfo
+from homeassistant.helpers.entity_platform import (
+    AddEntitiesCallback,
+    async_get_current_platform,
+)
 from homeassistant.helpers.typing import ConfigType, StateType
 from homeassistant.util.unit_system import METRIC_SYSTEM
 
-from .const import DOMAIN
+from .capabilities import (
+    SENSORS,
+    SensorCapability,
+    WeatherFlowDiagnosticSensorEntityDescription,
+    WeatherFlowRainSensorEntityDescription,
+    WeatherFlowSensorEntityDescription,
+    build_entity_context,
+    get_capabilities,
+    get_source,
+    imports_statistics,
+    statistic_metadata,
+)
+from .const import CONF_RAPID_WIND_INTERVAL, DEFAULT_RAPID_WIND_INTERVAL, DOMAIN
+from .dispatch import EVENT_ENABLED_SENSORS_CHANGED
+from .longterm import STATE_INTERVAL, HourlyAggregator
+from .models import (
+    WeatherFlowDeviceData,
+    WeatherFlowEntityContext,
+    WeatherFlowEntryData,
+)
+from .rain import RainAccumulator
+from .stats import SUPPRESSED_WRITES, WRITES, DeviceStats
 
 _LOGGER = logging.getLogger(__name__)
 
-CONCENTRATION_KILOGRAMS_PER_CUBIC_METER = "kg/m³"
-CONCENTRATION_POUNDS_PER_CUBIC_FOOT = "lbs/ft³"
-
-QUANTITY_KILOMETERS_PER_HOUR = "kph"
-
-IMPERIAL_UNIT_MAP = {
-    CONCENTRATION_KILOGRAMS_PER_CUBIC_METER: CONCENTRATION_POUNDS_PER_CUBIC_FOOT,
-    UnitOfLength.KILOMETERS: UnitOfLength.MILES,
-    UnitOfPrecipitationDepth.MILLIMETERS: UnitOfPrecipitationDepth.INCHES,
-    UnitOfVolumetricFlux.MILLIMETERS_PER_HOUR: UnitOfVolumetricFlux.INCHES_PER_HOUR,
-    UnitOfPressure.MBAR: UnitOfPressure.INHG,
-    UnitOfSpeed.KILOMETERS_PER_HOUR: UnitOfSpeed.MILES_PER_HOUR,
-}
-
 # Deprecated configuration.yaml
 DEPRECATED_CONF_WIND_UNIT = "wind_unit"
 DEPRECATED_SENSOR_TYPES = [
@@ -132,206 +120,29 @@ async def async_setup_platform(
 
 
 @dataclass
-class WeatherFlowSensorEntityDescription(SensorEntityDescription):
-    """Describes a WeatherFlow sensor entity description."""
-
-    attr: str | None = None
-    conversion_fn: Callable[[Quantity], Quantity] | None = None
-    decimals: int | None = None
-    event_subscriptions: list[str] = field(default_factory=lambda: [EVENT_OBSERVATION])
-    value_fn: Callable[[Quantity], Quantity] | None = None
-
-
-@dataclass
-class WeatherFlowTemperatureSensorEntityDescription(WeatherFlowSensorEntityDescription):
-    """Describes a WeatherFlow temperature sensor entity description."""
-
-    def __post_init__(self) -> None:
-        """Post initialisation processing."""
-        self.native_unit_of_measurement = UnitOfTemperature.CELSIUS
-        self.device_class = SensorDeviceClass.TEMPERATURE
-        self.state_class = SensorStateClass.MEASUREMENT
-        self.decimals = 1
-
-
-@dataclass
-class WeatherFlowWindSensorEntityDescription(WeatherFlowSensorEntityDescription):
-    """Describes a WeatherFlow wind sensor entity description."""
-
-    def __post_init__(self) -> None:
-        """Post initialisation processing."""
-        self.icon = "mdi:weather-windy"
-        self.native_unit_of_measurement = UnitOfSpeed.KILOMETERS_PER_HOUR
-        self.state_class = SensorStateClass.MEASUREMENT
-        self.conversion_fn = lambda attr: attr.to(UnitOfSpeed.MILES_PER_HOUR)
-        self.decimals = 2
-        self.value_fn = lambda attr: attr.to(QUANTITY_KILOMETERS_PER_HOUR)
-
-
-SENSORS: tuple[WeatherFlowSensorEntityDescription, ...] = (
-    WeatherFlowTemperatureSensorEntityDescription(
-        key="air_temperature",
-        name="Temperature",
-    ),
-    WeatherFlowSensorEntityDescription(
-        key="air_density",
-        name="Air Density",
-        native_unit_of_measurement=CONCENTRATION_KILOGRAMS_PER_CUBIC_METER,
-        state_class=SensorStateClass.MEASUREMENT,
-        conversion_fn=lambda attr: attr.to(CONCENTRATION_POUNDS_PER_CUBIC_FOOT),
-        decimals=5,
-    ),
-    WeatherFlowTemperatureSensorEntityDescription(
-        key="dew_point_temperature",
-        name="Dew Point",
-    ),
-    WeatherFlowSensorEntityDescription(
-        key="battery",
-        name="Battery Voltage",
-        native_unit_of_measurement=UnitOfElectricPotential.VOLT,
-        device_class=SensorDeviceClass.VOLTAGE,
-        entity_category=EntityCategory.DIAGNOSTIC,
-        state_class=SensorStateClass.MEASUREMENT,
-    ),
-    WeatherFlowTemperatureSensorEntityDescription(
-        key="feels_like_temperature",
-        name="Feels Like",
-    ),
-    WeatherFlowSensorEntityDescription(
-        key="illuminance",
-        name="Illuminance",
-        native_unit_of_measurement=LIGHT_LUX,
-        device_class=SensorDeviceClass.ILLUMINANCE,
-        state_class=SensorStateClass.MEASUREMENT,
-    ),
-    WeatherFlowSensorEntityDescription(
-        key="lightning_strike_average_distance",
-        name="Lightning Average Distance",
-        icon="mdi:lightning-bolt",
-        native_unit_of_measurement=UnitOfLength.KILOMETERS,
-        conversion_fn=lambda attr: attr.to(UnitOfLength.MILES),
-        decimals=2,
-    ),
-    WeatherFlowSensorEntityDescription(
-        key="lightning_strike_count",
-        name="Lightning Count",
-        icon="mdi:lightning-bolt",
-    ),
-    WeatherFlowSensorEntityDescription(
-        key="precipitation_type",
-        name="Precipitation Type",
-        icon="mdi:weather-rainy",
-    ),
-    WeatherFlowSensorEntityDescription(
-        key="rain_amount",
-        name="Rain Amount",
-        icon="mdi:weather-rainy",
-        native_unit_of_measurement=UnitOfPrecipitationDepth.MILLIMETERS,
-        state_class=SensorStateClass.TOTAL,
-        attr="rain_accumulation_previous_minute",
-        conversion_fn=lambda attr: attr.to(UnitOfPrecipitationDepth.INCHES),
-    ),
-    WeatherFlowSensorEntityDescription(
-        key="rain_rate",
-        name="Rain Rate",
-        icon="mdi:weather-rainy",
-        native_unit_of_measurement=UnitOfVolumetricFlux.MILLIMETERS_PER_HOUR,
-        attr="rain_rate",
-        conversion_fn=lambda attr: attr.to(UnitOfVolumetricFlux.INCHES_PER_HOUR),
-    ),
-    WeatherFlowSensorEntityDescription(
-        key="relative_humidity",
-        name="Humidity",
-        native_unit_of_measurement=PERCENTAGE,
-        device_class=SensorDeviceClass.HUMIDITY,
-        state_class=SensorStateClass.MEASUREMENT,
-    ),
-    WeatherFlowSensorEntityDescription(
-        key="rssi",
-        name="RSSI",
-        native_unit_of_measurement=SIGNAL_STRENGTH_DECIBELS_MILLIWATT,
-        device_class=SensorDeviceClass.SIGNAL_STRENGTH,
-        entity_category=EntityCategory.DIAGNOSTIC,
-        state_class=SensorStateClass.MEASUREMENT,
-        entity_registry_enabled_default=False,
-        event_subscriptions=[EVENT_STATUS_UPDATE],
-    ),
-    WeatherFlowSensorEntityDescription(
-        key="station_pressure",
-        name="Station Pressure",
-        native_unit_of_measurement=UnitOfPressure.MBAR,
-        device_class=SensorDeviceClass.PRESSURE,
-        state_class=SensorStateClass.MEASUREMENT,
-        conversion_fn=lambda attr: attr.to(UnitOfPressure.INHG),
-        decimals=5,
-    ),
-    WeatherFlowSensorEntityDescription(
-        key="solar_radiation",
-        name="Solar Radiation",
-        native_unit_of_measurement=UnitOfIrradiance.WATTS_PER_SQUARE_METER,
-        device_class=SensorDeviceClass.IRRADIANCE,
-        state_class=SensorStateClass.MEASUREMENT,
-    ),
-    WeatherFlowSensorEntityDescription(
-        key="up_since",
-        name="Up Since",
-        device_class=SensorDeviceClass.TIMESTAMP,
-        entity_category=EntityCategory.DIAGNOSTIC,
-        entity_registry_enabled_default=False,
-        event_subscriptions=[EVENT_STATUS_UPDATE],
-    ),
-    WeatherFlowSensorEntityDescription(
-        key="uv",
-        name="UV",
-        native_unit_of_measurement=UV_INDEX,
-        state_class=SensorStateClass.MEASUREMENT,
-    ),
-    WeatherFlowSensorEntityDescription(
-        key="vapor_pressure",
-        name="Vapor Pressure",
-        native_unit_of_measurement=UnitOfPressure.MBAR,
-        device_class=SensorDeviceClass.PRESSURE,
-        state_class=SensorStateClass.MEASUREMENT,
-        conversion_fn=lambda attr: attr.to(UnitOfPressure.INHG),
-        decimals=5,
-    ),
-    WeatherFlowTemperatureSensorEntityDescription(
-        key="wet_bulb_temperature",
-        name="Wet Bulb Temperature",
-    ),
-    WeatherFlowWindSensorEntityDescription(
-        key="wind_average",
-        name="Wind Average",
-    ),
-    WeatherFlowSensorEntityDescription(
-        key="wind_direction",
-        name="Wind Direction",
-        icon="mdi:compass-outline",
-        native_unit_of_measurement=DEGREE,
-        state_class=SensorStateClass.MEASUREMENT,
-        event_subscriptions=[EVENT_RAPID_WIND, EVENT_OBSERVATION],
-    ),
-    WeatherFlowSensorEntityDescription(
-        key="wind_direction_average",
-        name="Wind Direction Average",
-        icon="mdi:compass-outline",
-        native_unit_of_measurement=DEGREE,
-        state_class=SensorStateClass.MEASUREMENT,
-    ),
-    WeatherFlowWindSensorEntityDescription(
-        key="wind_gust",
-        name="Wind Gust",
-    ),
-    WeatherFlowWindSensorEntityDescription(
-        key="wind_lull",
-        name="Wind Lull",
-    ),
-    WeatherFlowWindSensorEntityDescription(
-        key="wind_speed",
-        name="Wind Speed",
-        event_subscriptions=[EVENT_RAPID_WIND, EVENT_OBSERVATION],
-    ),
-)
+class WeatherFlowRainExtraStoredData(SensorExtraStoredData):
+    """Object to hold extra stored data for rain accumulation sensors."""
+
+    accumulator: dict[str, Any] | None = None
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a dict representation of the extra data."""
+        data = super().as_dict()
+        data["accumulator"] = self.accumulator
+        return data
+
+    @classmethod
+    def from_dict(
+        cls, restored: dict[str, Any]
+    ) -> WeatherFlowRainExtraStoredData | None:
+        """Initialize a stored rain sensor state from a dict."""
+        if (sensor_data := SensorExtraStoredData.from_dict(restored)) is None:
+            return None
+        return cls(
+            sensor_data.native_value,
+            sensor_data.native_unit_of_measurement,
+            restored.get("accumulator"),
+        )
 
 
 async def async_setup_entry(
@@ -340,22 +151,66 @@ async def async_setup_entry(
     async_add_entities: AddEntitiesCallback,
 ):
     """Set up WeatherFlow sensors using config entry."""
+    data: WeatherFlowEntryData = hass.data[DOMAIN][config_entry.entry_id]
+    _async_set_intervals(config_entry, data)
+
+    is_metric = hass.config.units is METRIC_SYSTEM
+    registry = er.async_get(hass)
+    platform = async_get_current_platform()
+    contexts: dict[str, WeatherFlowEntityContext] = {}
 
     @callback
-    def async_add_sensor(device: WeatherFlowDevice) -> None:
+    def async_add_sensor(device_data: WeatherFlowDeviceData) -> None:
         """Add WeatherFlow sensor."""
-        _LOGGER.debug("Adding sensors for %s", device)
+        _LOGGER.debug("Adding sensors for %s", device_data.device)
+        # Restored devices get every sensor of their class too, so sensors added
+        # in a later release are created for known devices.
+        capabilities = get_capabilities(device_data, is_metric)
+        data.store.async_update_device(
+            device_data.device,
+            (capability.description.key for capability in capabilities),
+        )
+        context = contexts[device_data.device.serial_number] = build_entity_context(
+            device_data, data.scheduler, data.longterm
+        )
+        # Entities disabled in the registry are never added, so only the
+        # statistics read by enabled sensors need to be kept.
+        device_data.enabled_sensors = {
+            capability.description.key: capability.description.statistic
+            for capability in capabilities
+            if _is_enabled(registry, context, capability.description)
+        }
+        device_data.dispatcher.async_notify(EVENT_ENABLED_SENSORS_CHANGED)
         async_add_entities(
-            WeatherFlowSensorEntity(
-                device, description, hass.config.units is METRIC_SYSTEM
-            )
-            for description in SENSORS
-            if hasattr(
-                device,
-                description.key if description.attr is None else description.attr,
-            )
+            _entity_class(capability.description)(context, capability)
+            for capability in capabilities
         )
 
+    @callback
+    def async_registry_updated(event: Event) -> None:
+        """Add a sensor enabled in the entity registry right away."""
+        if (
+            event.data["action"] != "update"
+            or "disabled_by" not in event.data["changes"]
+            or (entity_entry := registry.async_get(event.data["entity_id"])) is None
+            or entity_entry.config_entry_id != config_entry.entry_id
+            or entity_entry.disabled
+            or entity_entry.entity_id in platform.entities
+        ):
+            return
+        serial_number, _, key = entity_entry.unique_id.removeprefix(
+            f"{DOMAIN}_"
+        ).partition("_")
+        if (context := contexts.get(serial_number)) is None:
+            return
+        for capability in get_capabilities(context.device_data, is_metric):
+            if capability.description.key == key:
+                _LOGGER.debug("Adding enabled sensor %s", entity_entry.entity_id)
+                async_add_entities(
+                    [_entity_class(capability.description)(context, capability)]
+                )
+                return
+
     config_entry.async_on_unload(
         async_dispatcher_connect(
             hass,
@@ -364,41 +219,118 @@ async def async_setup_entry(
         )
     )
 
+    @callback
+    def async_options_updated() -> None:
+        """Apply changed options to the running sensors."""
+        _async_set_intervals(config_entry, data)
+        for context in contexts.values():
+            context.longterm = data.longterm
+        for entity in platform.entities.values():
+            if isinstance(entity, WeatherFlowSensorEntity):
+                entity.async_update_statistics_import()
+
+    config_entry.async_on_unload(
+        hass.bus.async_listen(er.EVENT_ENTITY_REGISTRY_UPDATED, async_registry_updated)
+    )
+    config_entry.async_on_unload(
+        async_dispatcher_connect(
+            hass,
+            f"{DOMAIN}_{config_entry.entry_id}_options_updated",
+            async_options_updated,
+        )
+    )
+
+
+@callback
+def _async_set_intervals(config_entry: ConfigEntry, data: WeatherFlowEntryData) -> None:
+    """Set the minimum intervals between state writes of the sensors."""
+    rapid_wind_interval = config_entry.options.get(
+        CONF_RAPID_WIND_INTERVAL, DEFAULT_RAPID_WIND_INTERVAL
+    )
+    intervals = {
+        description.key: rapid_wind_interval
+        for description in SENSORS
+        if EVENT_RAPID_WIND in description.event_subscriptions
+    }
+    if data.longterm is not None:
+        # The imported statistics keep every update, so the states can be sparse.
+        for description in SENSORS:
+            if imports_statistics(description):
+                intervals[description.key] = max(
+                    intervals.get(description.key, 0), STATE_INTERVAL
+                )
+    data.scheduler.async_set_intervals(intervals)
+
+
+def _is_enabled(
+    registry: er.EntityRegistry,
+    context: WeatherFlowEntityContext,
+    description: WeatherFlowSensorEntityDescription,
+) -> bool:
+    """Return `True` if a sensor is enabled in the entity registry."""
+    if (
+        entity_id := registry.async_get_entity_id(
+            SENSOR_DOMAIN, DOMAIN, context.unique_id_prefix + description.key
+        )
+    ) is None or (entity_entry := registry.async_get(entity_id)) is None:
+        return description.entity_registry_enabled_default
+    return not entity_entry.disabled
+
+
+def _entity_class(
+    description: WeatherFlowSensorEntityDescription,
+) -> type[WeatherFlowSensorEntity]:
+    """Return the entity class for a sensor description."""
+    if isinstance(description, WeatherFlowRainSensorEntityDescription):
+        return WeatherFlowRainSensorEntity
+    if isinstance(description, WeatherFlowDiagnosticSensorEntityDescription):
+        return WeatherFlowDiagnosticSensorEntity
+    return WeatherFlowSensorEntity
 
-class WeatherFlowSensorEntity(SensorEntity):
-    """Defines a WeatherFlow sensor entity."""
+
+class WeatherFlowSensorEntity(RestoreSensor):
+    """Defines a WeatherFlow sensor entity.
+
+    The device info, name and unique ID are derived from the context shared by
+    the entities of the device and the capability shared by every entity of the
+    sensor, rather than stored per entity.
+    """
 
     entity_description: WeatherFlowSensorEntityDescription
     _attr_should_poll = False
 
     def __init__(
-        self,
-        device: WeatherFlowDevice,
-        description: WeatherFlowSensorEntityDescription,
-        is_metric: bool = True,
+        self, context: WeatherFlowEntityContext, capability: SensorCapability
     ) -> None:
         """Initialize a WeatherFlow sensor entity."""
-        self.device = device
-        if not is_metric and (
-            (unit := IMPERIAL_UNIT_MAP.get(description.native_unit_of_measurement))
-            is not None
-        ):
-            description.native_unit_of_measurement = unit
-        self.entity_description = description
-        self._attr_device_info = DeviceInfo(
-            identifiers={(DOMAIN, self.device.serial_number)},
-            manufacturer="WeatherFlow",
-            model=self.device.model,
-            name=f"{self.device.model} {self.device.serial_number}",
-            sw_version=self.device.firmware_revision,
-            suggested_area="Backyard",
-        )
-        if isinstance(device, WeatherFlowSensorDevice):
-            self._attr_device_info["via_device"] = (DOMAIN, self.device.hub_sn)
-        self._attr_name = (
-            f"{self.device.model} {self.device.serial_number} {description.name}"
-        )
-        self._attr_unique_id = f"{DOMAIN}_{self.device.serial_number}_{description.key}"
+        self._shared = context
+        self._source = get_source(context.device_data, capability.description)
+        self._value_attr = capability.value_attr
+        self._converter = capability.converter
+        self._last_write_time = 0.0
+        self._aggregator: HourlyAggregator | None = None
+        self._cancel_aggregation: list[CALLBACK_TYPE] = []
+        self.entity_description = capability.description
+
+    @property
+    def device(self) -> WeatherFlowDevice:
+        """Return the device of the sensor."""
+        return self._shared.device_data.device
+
+    @property
+    def device_info(self) -> DeviceInfo:
+        """Return the device info shared by the entities of the device."""
+        return self._shared.device_info
+
+    @property
+    def name(self) -> str:
+        """Return the name of the sensor."""
+        return f"{self._shared.name} {self.entity_description.name}"
+
+    @property
+    def unique_id(self) -> str:
+        """Return the unique ID of the sensor."""
+        return self._shared.unique_id_prefix + self.entity_description.key
 
     @property
     def last_reset(self) -> datetime | None:
@@ -407,37 +339,172 @@ class WeatherFlowSensorEntity(SensorEntity):
             return self.device.last_report
         return None
 
-    @property
-    def native_value(self) -> datetime | StateType:
-        """Return the state of the sensor."""
-        attr = getattr(
-            self.device,
-            self.entity_description.key
-            if self.entity_description.attr is None
-            else self.entity_description.attr,
-        )
+    def _compute_native_value(self) -> datetime | StateType:
+        """Compute the state of the sensor from the device."""
+        if (attr := getattr(self._source, self._value_attr)) is None:
+            return None
+        return self._converter.convert(attr)
 
-        if attr is None:
-            return attr
+    async def async_added_to_hass(self) -> None:
+        """Restore the last state if needed and subscribe to events."""
+        await super().async_added_to_hass()
+        # Only computed once added, as entities disabled in the registry never are.
+        self._attr_native_value = self._compute_native_value()
+        # A restored device reports placeholders such as a 0 V battery until it
+        # is heard, so its last state is shown instead.
+        if (
+            not self.device.load_complete
+            and (last_sensor_data := await self.async_get_last_sensor_data())
+            is not None
+        ):
+            self._attr_native_value = last_sensor_data.native_value
+        self._last_write_time = time.monotonic()
+        self.async_update_statistics_import()
+        device_data = self._shared.device_data
+        for event in self.entity_description.event_subscriptions:
+            self.async_on_remove(
+                device_data.dispatcher.async_subscribe(event, self._async_handle_update)
+            )
+        description = self.entity_description
+        device_data.enabled_sensors[description.key] = description.statistic
+        if description.statistic is not None:
+            device_data.dispatcher.async_notify(EVENT_ENABLED_SENSORS_CHANGED)
+
+    async def async_will_remove_from_hass(self) -> None:
+        """Cancel any pending state write and stop feeding unused statistics."""
+        if (scheduler := self._shared.scheduler) is not None:
+            scheduler.async_cancel(self)
+        self._async_stop_aggregation()
+        device_data = self._shared.device_data
+        if device_data.enabled_sensors.pop(self.entity_description.key, None):
+            device_data.dispatcher.async_notify(EVENT_ENABLED_SENSORS_CHANGED)
+
+    @callback
+    def async_update_statistics_import(self) -> None:
+        """Start or stop importing the long-term statistics of the sensor."""
+        longterm = self._shared.longterm
+        if longterm is None or not imports_statistics(self.entity_description):
+            if self._aggregator is None:
+                return
+            self._async_stop_aggregation()
+            self._attr_state_class = self.entity_description.state_class
+        elif self._aggregator is None:
+            self._aggregator = longterm.async_register(
+                statistic_metadata(self._shared, self.entity_description)
+            )
+            # Fed from every device event rather than the coalesced updates, so
+            # each observation of a backlog is counted, at its own time.
+            self._cancel_aggregation = [
+                self.device.on(event, self._async_add_statistic)
+                for event in self.entity_description.event_subscriptions
+            ]
+            # Imported instead, as statistics compiled from sparse states are not.
+            self._attr_state_class = None
+        else:
+            return
+        if self.hass is not None:
+            self.async_write_ha_state()
+
+    @callback
+    def _async_stop_aggregation(self) -> None:
+        """Stop feeding the long-term statistics of the sensor."""
+        for cancel in self._cancel_aggregation:
+            cancel()
+        self._cancel_aggregation = []
+        self._aggregator = None
+
+    @callback
+    def _async_add_statistic(self, event: CustomEvent | WindEvent) -> None:
+        """Add the value of the sensor after a device event to its statistics."""
+        if self._aggregator is not None and (
+            (value := self._compute_native_value()) is not None
+        ):
+            self._aggregator.add(event.epoch, value)
 
+    @callback
+    def _async_handle_update(self) -> None:
+        """Handle updated device data."""
+        if (scheduler := self._shared.scheduler) is None:
+            self._async_write_if_changed()
+        else:
+            scheduler.async_schedule(self, self._async_write_if_changed)
+
+    @callback
+    def _async_write_if_changed(self) -> None:
+        """Write the state if the value changed or the heartbeat is due."""
+        stats = self._shared.device_data.stats
+        start = time.perf_counter()
+        value = self._compute_native_value()
+        stats.native_value_timing.record(time.perf_counter() - start)
+        now = time.monotonic()
+        if not self._is_significant_change(value) and (
+            (scheduler := self._shared.scheduler) is None
+            or not (heartbeat := scheduler.heartbeat)
+            or now - self._last_write_time < heartbeat
+        ):
+            stats.counters[SUPPRESSED_WRITES] += 1
+            return
+
+        self._attr_native_value = value
+        self._last_write_time = now
+        stats.counters[WRITES] += 1
+        self.async_write_ha_state()
+
+    def _is_significant_change(self, value: datetime | StateType) -> bool:
+        """Return `True` if the value differs enough from the last written value."""
+        # Each state of a total sensor covers a new period, so always write it.
+        if self.entity_description.state_class == SensorStateClass.TOTAL:
+            return True
+
+        previous = self._attr_native_value
+        if (
+            previous is None
+            or value is None
+            or isinstance(value, bool)
+            or not isinstance(value, (int, float))
+            or not isinstance(previous, (int, float))
+        ):
+            return value != previous
+
+        delta = abs(value - previous)
+        if (deadband := self.entity_description.deadband) is not None and (
+            delta < deadband
+        ):
+            return False
         if (
-            not self.hass.config.units is METRIC_SYSTEM
-            and (fn := self.entity_description.conversion_fn) is not None
-        ) or (fn := self.entity_description.value_fn) is not None:
-            attr = fn(attr)
+            relative_deadband := self.entity_description.relative_deadband
+        ) is not None and (delta < abs(previous) * relative_deadband):
+            return False
+        return delta != 0
 
-        if isinstance(attr, Quantity):
-            attr = attr.m
-        elif isinstance(attr, Enum):
-            attr = attr.name
 
-        if (decimals := self.entity_description.decimals) is not None:
-            attr = round(attr, decimals)
-        return attr
+class WeatherFlowRainSensorEntity(WeatherFlowSensorEntity):
+    """Defines a WeatherFlow rain accumulation sensor entity."""
+
+    _source: RainAccumulator
 
     async def async_added_to_hass(self) -> None:
-        """Subscribe to events."""
-        for event in self.entity_description.event_subscriptions:
-            self.async_on_remove(
-                self.device.on(event, lambda _: self.async_write_ha_state())
-            )
+        """Restore the rain accumulation and subscribe to events."""
+        if (last_extra_data := await self.async_get_last_extra_data()) is not None:
+            self._source.restore(last_extra_data.as_dict().get("accumulator"))
+        await super().async_added_to_hass()
+
+    @property
+    def extra_restore_state_data(self) -> WeatherFlowRainExtraStoredData:
+        """Return sensor specific state data to be restored."""
+        return WeatherFlowRainExtraStoredData(
+            self.native_value, self.native_unit_of_measurement, self._source.as_dict()
+        )
+
+
+class WeatherFlowDiagnosticSensorEntity(WeatherFlowSensorEntity):
+    """Defines a WeatherFlow runtime statistics sensor entity."""
+
+    _source: DeviceStats
+
+    @callback
+    def _async_handle_update(self) -> None:
+        """Write the statistic if it changed, without counting the write itself."""
+        if (value := self._compute_native_value()) != self._attr_native_value:
+            self._attr_native_value = value
+            self.async_write_ha_state()
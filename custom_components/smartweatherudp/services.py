@@ -0,0 +1,52 @@
+"""Services for the smartweatherudp integration."""
+from __future__ import annotations
+
+import voluptuous as vol
+
+from homeassistant.const import ATTR_DEVICE_ID
+from homeassistant.core import HomeAssistant, ServiceCall, callback
+import homeassistant.helpers.config_validation as cv
+from homeassistant.util import dt as dt_util
+
+from .const import BACKFILL_SENSORS, DOMAIN
+from .loader import async_import_module
+
+SERVICE_BACKFILL = "backfill"
+
+ATTR_END = "end"
+ATTR_SENSORS = "sensors"
+ATTR_START = "start"
+
+BACKFILL_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_DEVICE_ID): cv.string,
+        vol.Required(ATTR_START): cv.datetime,
+        vol.Optional(ATTR_END): cv.datetime,
+        vol.Optional(ATTR_SENSORS, default=list(BACKFILL_SENSORS)): vol.All(
+            cv.ensure_list, [vol.In(BACKFILL_SENSORS)]
+        ),
+    }
+)
+
+
+@callback
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the services of the integration, if not registered yet."""
+    if hass.services.has_service(DOMAIN, SERVICE_BACKFILL):
+        return
+
+    async def async_backfill(call: ServiceCall) -> None:
+        """Backfill the statistics of derived sensors from recorded history."""
+        # Imports NumPy, which is only needed when backfilling.
+        backfill = await async_import_module(hass, "backfill")
+        await backfill.async_backfill(
+            hass,
+            call.data[ATTR_DEVICE_ID],
+            dt_util.as_utc(call.data[ATTR_START]),
+            None if (end := call.data.get(ATTR_END)) is None else dt_util.as_utc(end),
+            call.data[ATTR_SENSORS],
+        )
+
+    hass.services.async_register(
+        DOMAIN, SERVICE_BACKFILL, async_backfill, schema=BACKFILL_SCHEMA
+    )
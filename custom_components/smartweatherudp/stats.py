@@ -0,0 +1,182 @@
+"""Runtime statistics for the smartweatherudp integration."""
+from __future__ import annotations
+
+from array import array
+from bisect import bisect_left
+import time
+from typing import Any
+
+# Upper bounds of the timing histogram buckets in seconds; the last bucket
+# holds everything slower.
+TIMING_BUCKETS = tuple(
+    bound * 1e-6
+    for bound in (5, 10, 20, 50, 100, 200, 500, 1e3, 2e3, 5e3, 1e4, 2e4, 5e4, 1e5)
+)
+
+MESSAGE_TYPES = (
+    "hub_status",
+    "device_status",
+    "obs_st",
+    "obs_air",
+    "obs_sky",
+    "rapid_wind",
+    "evt_strike",
+    "evt_precip",
+)
+OTHER_MESSAGE_TYPE = "other"
+_MESSAGE_TYPE_INDEX = {
+    message_type: idx for idx, message_type in enumerate(MESSAGE_TYPES)
+}
+
+# Indexes into `DeviceStats.counters`.
+WRITES = 0
+SUPPRESSED_WRITES = 1
+DUPLICATE_PACKETS = 2
+OUT_OF_ORDER_PACKETS = 3
+SUPERSEDED_PACKETS = 4
+OVERFLOW_PACKETS = 5
+
+
+class TimingHistogram:
+    """Fixed-bucket histogram of durations.
+
+    Recording a duration is a binary search over the bucket bounds and a
+    counter increment, so it can be left on in production.
+    """
+
+    __slots__ = ("counts", "count", "total", "max")
+
+    def __init__(self) -> None:
+        """Initialize the histogram."""
+        self.counts = array("Q", bytes(8 * (len(TIMING_BUCKETS) + 1)))
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds: float) -> None:
+        """Record a duration in seconds."""
+        self.counts[bisect_left(TIMING_BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, pct: float) -> float | None:
+        """Return the upper bound of the bucket holding a percentile in seconds."""
+        if not self.count:
+            return None
+        rank = self.count * pct / 100
+        seen = 0
+        for idx, count in enumerate(self.counts):
+            if (seen := seen + count) >= rank:
+                break
+        if idx < len(TIMING_BUCKETS):
+            return min(TIMING_BUCKETS[idx], self.max)
+        return self.max
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a summary in milliseconds."""
+
+        def milliseconds(seconds: float | None) -> float | None:
+            return None if seconds is None else round(seconds * 1000, 3)
+
+        return {
+            "count": self.count,
+            "mean_ms": milliseconds(self.total / self.count if self.count else None),
+            "p50_ms": milliseconds(self.percentile(50)),
+            "p99_ms": milliseconds(self.percentile(99)),
+            "max_ms": milliseconds(self.max if self.count else None),
+        }
+
+
+class DeviceStats:
+    """Packet, state write and timing statistics of a device."""
+
+    __slots__ = (
+        "packets",
+        "last_packet",
+        "counters",
+        "listener_timing",
+        "parse_timing",
+        "native_value_timing",
+    )
+
+    def __init__(self) -> None:
+        """Initialize the device statistics."""
+        # The last slot counts unknown message types.
+        self.packets = array("Q", bytes(8 * (len(MESSAGE_TYPES) + 1)))
+        self.last_packet: float | None = None
+        self.counters = array("Q", bytes(8 * 6))
+        self.listener_timing = TimingHistogram()
+        self.parse_timing = TimingHistogram()
+        self.native_value_timing = TimingHistogram()
+
+    @property
+    def packets_received(self) -> int:
+        """Return the number of packets received."""
+        return sum(self.packets)
+
+    @property
+    def last_packet_age(self) -> float | None:
+        """Return the seconds since the last packet."""
+        if self.last_packet is None:
+            return None
+        return time.monotonic() - self.last_packet
+
+    @property
+    def state_writes(self) -> int:
+        """Return the number of state writes issued."""
+        return self.counters[WRITES]
+
+    @property
+    def suppressed_state_writes(self) -> int:
+        """Return the number of state writes suppressed as insignificant."""
+        return self.counters[SUPPRESSED_WRITES]
+
+    @property
+    def duplicate_packets(self) -> int:
+        """Return the number of duplicate packets dropped."""
+        return self.counters[DUPLICATE_PACKETS]
+
+    @property
+    def out_of_order_packets(self) -> int:
+        """Return the number of out-of-order packets dropped."""
+        return self.counters[OUT_OF_ORDER_PACKETS]
+
+    @property
+    def superseded_packets(self) -> int:
+        """Return the number of packets replaced by a newer one before parsing."""
+        return self.counters[SUPERSEDED_PACKETS]
+
+    @property
+    def overflow_packets(self) -> int:
+        """Return the number of packets dropped because the mailbox was full."""
+        return self.counters[OVERFLOW_PACKETS]
+
+    def record_packet(self, message_type: str) -> None:
+        """Record a packet."""
+        self.packets[_MESSAGE_TYPE_INDEX.get(message_type, len(MESSAGE_TYPES))] += 1
+        self.last_packet = time.monotonic()
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the statistics."""
+        age = self.last_packet_age
+        return {
+            "packets": {
+                message_type: count
+                for message_type, count in zip(
+                    (*MESSAGE_TYPES, OTHER_MESSAGE_TYPE), self.packets
+                )
+                if count
+            },
+            "last_packet_age": None if age is None else round(age, 1),
+            "state_writes": self.state_writes,
+            "suppressed_state_writes": self.suppressed_state_writes,
+            "duplicate_packets": self.duplicate_packets,
+            "out_of_order_packets": self.out_of_order_packets,
+            "superseded_packets": self.superseded_packets,
+            "overflow_packets": self.overflow_packets,
+            "listener_timing": self.listener_timing.as_dict(),
+            "parse_timing": self.parse_timing.as_dict(),
+            "native_value_timing": self.native_value_timing.as_dict(),
+        }
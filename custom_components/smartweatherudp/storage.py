@@ -0,0 +1,77 @@
+"""Device snapshot storage for the smartweatherudp integration."""
+from __future__ import annotations
+
+from collections.abc import Iterable
+from typing import Any, TypedDict
+
+from pyweatherflowudp.device import WeatherFlowDevice, WeatherFlowSensorDevice
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN
+
+STORAGE_VERSION = 1
+STORAGE_SAVE_DELAY = 10
+
+
+class DeviceSnapshot(TypedDict):
+    """Stored details of a discovered device."""
+
+    serial_number: str
+    model: str
+    hub_sn: str | None
+    firmware_revision: str | None
+    sensors: list[str]
+
+
+class DeviceSnapshotStore:
+    """Persist the devices of a config entry so they can be restored at startup."""
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """Initialize the device snapshot store."""
+        self._store: Store[dict[str, Any]] = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}.devices"
+        )
+        self.devices: dict[str, DeviceSnapshot] = {}
+
+    async def async_load(self) -> None:
+        """Load the stored device snapshots."""
+        if (data := await self._store.async_load()) is not None:
+            self.devices = data.get("devices", {})
+
+    @callback
+    def async_update_device(
+        self, device: WeatherFlowDevice, sensors: Iterable[str] | None = None
+    ) -> None:
+        """Update the snapshot of a device, keeping its sensors if not given."""
+        previous = self.devices.get(device.serial_number)
+        if sensors is None:
+            sensors = [] if previous is None else previous["sensors"]
+        if device.load_complete:
+            firmware_revision = device.firmware_revision
+        elif previous is not None:
+            firmware_revision = previous["firmware_revision"]
+        else:
+            firmware_revision = None
+        snapshot = DeviceSnapshot(
+            serial_number=device.serial_number,
+            model=device.model,
+            hub_sn=device.hub_sn
+            if isinstance(device, WeatherFlowSensorDevice)
+            else None,
+            firmware_revision=firmware_revision,
+            sensors=sorted(sensors),
+        )
+        if snapshot != previous:
+            self.devices[device.serial_number] = snapshot
+            self._store.async_delay_save(self._data_to_save, STORAGE_SAVE_DELAY)
+
+    async def async_remove(self) -> None:
+        """Remove the stored device snapshots."""
+        await self._store.async_remove()
+
+    @callback
+    def _data_to_save(self) -> dict[str, Any]:
+        """Return the data to store."""
+        return {"devices": self.devices}
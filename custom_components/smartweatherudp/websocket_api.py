@@ -0,0 +1,141 @@
+"""Websocket API for the smartweatherudp integration."""
+from __future__ import annotations
+
+from collections.abc import Callable
+from datetime import datetime
+from typing import Any
+
+from pyweatherflowudp.event import WindEvent
+import voluptuous as vol
+
+from homeassistant.components import websocket_api
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+
+from .const import DOMAIN
+
+DATA_RAPID_WIND_STREAM = "rapid_wind_stream"
+
+MAX_DECIMATION = 100
+MAX_BATCH_INTERVAL = 60
+
+
+class RapidWindStream:
+    """Fan the rapid wind samples of every device out to websocket clients.
+
+    Samples go from the device events straight to the subscribers, without
+    the state machine or the recorder.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the rapid wind stream."""
+        self._subscribers: list[Callable[[dict[str, Any]], None]] = []
+
+    @callback
+    def async_subscribe(
+        self, subscriber: Callable[[dict[str, Any]], None]
+    ) -> CALLBACK_TYPE:
+        """Subscribe to the samples and return a function to unsubscribe."""
+        self._subscribers.append(subscriber)
+
+        @callback
+        def unsubscribe() -> None:
+            """Unsubscribe from the samples."""
+            self._subscribers.remove(subscriber)
+
+        return unsubscribe
+
+    @callback
+    def async_publish(self, serial_number: str, event: WindEvent) -> None:
+        """Send a rapid wind sample of a device to the subscribers."""
+        if not self._subscribers:
+            return
+        sample = {
+            "serial_number": serial_number,
+            "epoch": event.epoch,
+            "speed": event.speed.m,
+            "direction": event.direction.m,
+        }
+        for subscriber in self._subscribers:
+            subscriber(sample)
+
+
+@callback
+def async_get_rapid_wind_stream(hass: HomeAssistant) -> RapidWindStream:
+    """Return the rapid wind stream, registering the websocket API if needed."""
+    domain_data: dict[str, Any] = hass.data.setdefault(DOMAIN, {})
+    if (stream := domain_data.get(DATA_RAPID_WIND_STREAM)) is None:
+        stream = domain_data[DATA_RAPID_WIND_STREAM] = RapidWindStream()
+        websocket_api.async_register_command(hass, websocket_subscribe_rapid_wind)
+    return stream
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): f"{DOMAIN}/subscribe_rapid_wind",
+        vol.Optional("serial_number"): str,
+        vol.Optional("decimation", default=1): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=MAX_DECIMATION)
+        ),
+        vol.Optional("batch_interval", default=0): vol.All(
+            vol.Coerce(float), vol.Range(min=0, max=MAX_BATCH_INTERVAL)
+        ),
+    }
+)
+@callback
+def websocket_subscribe_rapid_wind(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict[str, Any],
+) -> None:
+    """Stream rapid wind samples, in m/s and degrees, to a websocket client.
+
+    Only every `decimation`th sample of each device is sent. With a
+    `batch_interval`, samples are collected and sent together at most once
+    per interval.
+    """
+    msg_id: int = msg["id"]
+    serial_number: str | None = msg.get("serial_number")
+    decimation: int = msg["decimation"]
+    batch_interval: float = msg["batch_interval"]
+    counts: dict[str, int] = {}
+    batch: list[dict[str, Any]] = []
+    cancel_flush: CALLBACK_TYPE | None = None
+
+    @callback
+    def flush(now: datetime | None = None) -> None:
+        """Send the collected samples."""
+        nonlocal batch, cancel_flush
+        cancel_flush = None
+        samples, batch = batch, []
+        connection.send_message(
+            websocket_api.event_message(msg_id, {"samples": samples})
+        )
+
+    @callback
+    def add_sample(sample: dict[str, Any]) -> None:
+        """Decimate and collect a sample."""
+        nonlocal cancel_flush
+        if serial_number is not None and sample["serial_number"] != serial_number:
+            return
+        count = counts.get(sample["serial_number"], 0)
+        counts[sample["serial_number"]] = count + 1
+        if count % decimation:
+            return
+        batch.append(sample)
+        if not batch_interval:
+            flush()
+        elif cancel_flush is None:
+            cancel_flush = async_call_later(hass, batch_interval, flush)
+
+    unsubscribe_stream = async_get_rapid_wind_stream(hass).async_subscribe(add_sample)
+
+    @callback
+    def unsubscribe() -> None:
+        """Stop streaming samples to the client."""
+        unsubscribe_stream()
+        if cancel_flush is not None:
+            cancel_flush()
+
+    connection.subscriptions[msg_id] = unsubscribe
+    connection.send_result(msg_id)
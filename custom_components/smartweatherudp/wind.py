@@ -0,0 +1,220 @@
+"""Rolling wind statistics for the smartweatherudp integration."""
+from __future__ import annotations
+
+from array import array
+from collections import deque
+from collections.abc import Iterable
+import math
+import time
+
+from pint import Quantity
+from pyweatherflowudp.const import UNIT_DEGREES, UNIT_METERS_PER_SECOND
+from pyweatherflowudp.helpers import value_as_unit
+
+DEFAULT_WINDOWS = (120, 600, 3600)
+
+# Rapid wind samples arrive every 3 seconds, so this holds over an hour of samples.
+DEFAULT_CAPACITY = 2048
+
+
+class WindSamples:
+    """Fixed-size ring buffer of wind samples.
+
+    Samples are addressed by an ever increasing sequence number; the sample
+    for `seq` is stored at `seq % capacity`.
+    """
+
+    __slots__ = ("capacity", "count", "epochs", "speeds", "east", "north")
+
+    def __init__(self, capacity: int) -> None:
+        """Initialize the ring buffer."""
+        self.capacity = capacity
+        self.count = 0
+        self.epochs = array("d", bytes(8 * capacity))
+        self.speeds = array("d", bytes(8 * capacity))
+        self.east = array("d", bytes(8 * capacity))
+        self.north = array("d", bytes(8 * capacity))
+
+    @property
+    def last_epoch(self) -> float | None:
+        """Return the epoch of the newest sample."""
+        if not self.count:
+            return None
+        return self.epochs[(self.count - 1) % self.capacity]
+
+
+class WindStatistics:
+    """Rolling wind statistics over one or more time windows.
+
+    Samples are stored once and shared by all windows. Each window keeps
+    running sums for the mean and vector-averaged direction and monotonic
+    queues for the gust and lull, so adding a sample is O(1) amortized
+    regardless of the window length.
+
+    Samples only leave the windows when a sample is added, or on `expire`.
+    """
+
+    def __init__(
+        self,
+        windows: Iterable[int] = DEFAULT_WINDOWS,
+        capacity: int = DEFAULT_CAPACITY,
+    ) -> None:
+        """Initialize the wind statistics."""
+        self._samples = WindSamples(capacity)
+        self.windows: dict[int, WindWindow] = {
+            seconds: WindWindow(self._samples, seconds) for seconds in windows
+        }
+        # Monotonic time the newest sample was added.
+        self._added: float | None = None
+
+    def add(self, epoch: float, speed: float, direction: float) -> None:
+        """Add a wind sample, in meters per second and degrees."""
+        samples = self._samples
+        if (last_epoch := samples.last_epoch) is not None and epoch < last_epoch:
+            return
+
+        seq = samples.count
+        # Evict the sample about to be overwritten, plus anything that expired.
+        oldest = seq - samples.capacity + 1
+        for window in self.windows.values():
+            window.evict(epoch, oldest)
+
+        radians = math.radians(direction)
+        idx = seq % samples.capacity
+        samples.epochs[idx] = epoch
+        samples.speeds[idx] = speed
+        samples.east[idx] = speed * math.sin(radians)
+        samples.north[idx] = speed * math.cos(radians)
+        samples.count = seq + 1
+
+        for window in self.windows.values():
+            window.append(seq)
+        self._added = time.monotonic()
+
+    def expire(self, now: float | None = None) -> bool:
+        """Drop the samples that left their window, returning if any did.
+
+        The device clock is taken as the epoch of the newest sample plus the
+        monotonic time elapsed since it was added, so samples expire when the
+        device stops reporting, regardless of the host clock.
+        """
+        if (last_epoch := self._samples.last_epoch) is None or self._added is None:
+            return False
+        if now is None:
+            now = time.monotonic()
+        epoch = last_epoch + now - self._added
+        expired = False
+        for window in self.windows.values():
+            size = window.size
+            window.evict(epoch, 0)
+            expired |= window.size != size
+        return expired
+
+
+class WindWindow:
+    """Wind statistics over a single time window."""
+
+    __slots__ = (
+        "_samples",
+        "seconds",
+        "_start",
+        "_speed_sum",
+        "_east_sum",
+        "_north_sum",
+        "_max",
+        "_min",
+    )
+
+    def __init__(self, samples: WindSamples, seconds: int) -> None:
+        """Initialize the window."""
+        self._samples = samples
+        self.seconds = seconds
+        self._start = samples.count
+        self._speed_sum = 0.0
+        self._east_sum = 0.0
+        self._north_sum = 0.0
+        self._max: deque[int] = deque()
+        self._min: deque[int] = deque()
+
+    @property
+    def size(self) -> int:
+        """Return the number of samples in the window."""
+        return self._samples.count - self._start
+
+    def append(self, seq: int) -> None:
+        """Add the newest sample."""
+        samples = self._samples
+        capacity = samples.capacity
+        speeds = samples.speeds
+        idx = seq % capacity
+        speed = speeds[idx]
+
+        while self._max and speeds[self._max[-1] % capacity] <= speed:
+            self._max.pop()
+        self._max.append(seq)
+        while self._min and speeds[self._min[-1] % capacity] >= speed:
+            self._min.pop()
+        self._min.append(seq)
+
+        self._speed_sum += speed
+        self._east_sum += samples.east[idx]
+        self._north_sum += samples.north[idx]
+
+    def evict(self, epoch: float, oldest: int) -> None:
+        """Drop samples older than the window or the oldest sequence."""
+        samples = self._samples
+        capacity = samples.capacity
+        cutoff = epoch - self.seconds
+        while self._start < samples.count and (
+            self._start < oldest or samples.epochs[self._start % capacity] <= cutoff
+        ):
+            idx = self._start % capacity
+            self._speed_sum -= samples.speeds[idx]
+            self._east_sum -= samples.east[idx]
+            self._north_sum -= samples.north[idx]
+            self._start += 1
+
+        if self._start == samples.count:
+            # Reset the sums so floating point error does not accumulate.
+            self._speed_sum = self._east_sum = self._north_sum = 0.0
+        while self._max and self._max[0] < self._start:
+            self._max.popleft()
+        while self._min and self._min[0] < self._start:
+            self._min.popleft()
+
+    @property
+    def average(self) -> Quantity[float] | None:
+        """Return the average wind speed in meters per second (m/s)."""
+        if not (size := self.size):
+            return None
+        return value_as_unit(max(self._speed_sum / size, 0.0), UNIT_METERS_PER_SECOND)
+
+    @property
+    def direction(self) -> Quantity[float] | None:
+        """Return the speed weighted vector average direction in degrees (°)."""
+        if not self.size or (
+            abs(self._east_sum) < 1e-9 and abs(self._north_sum) < 1e-9
+        ):
+            return None
+        degrees = math.degrees(math.atan2(self._east_sum, self._north_sum)) % 360
+        return value_as_unit(degrees, UNIT_DEGREES)
+
+    @property
+    def gust(self) -> Quantity[float] | None:
+        """Return the maximum wind speed in meters per second (m/s)."""
+        if not self._max:
+            return None
+        samples = self._samples
+        return value_as_unit(
+            samples.speeds[self._max[0] % samples.capacity], UNIT_METERS_PER_SECOND
+        )
+
+    @property
+    def lull(self) -> Quantity[float] | None:
+        """Return the minimum wind speed in meters per second (m/s)."""
+        if not self._min:
+            return None
+        samples = self._samples
+        return value_as_unit(
+            samples.speeds[self._min[0] % samples.capacity], UNIT_METERS_PER_SECOND
+        )
@@ -0,0 +1,396 @@
+"""Load test the integration with a fleet of virtual WeatherFlow stations.
+
+Each virtual hub has a Tempest, an Air and a Sky that send `obs_st`,
+`obs_air`, `obs_sky`, `rapid_wind`, `device_status` and `hub_status`
+datagrams to a local socket at the real cadence multiplied by `--rate`, with
+a random jitter on every interval.
+
+By default a throwaway Home Assistant instance is bootstrapped with this
+repository's integration, a config entry is imported through the real config
+flow and `async_setup_entry` path, and the fleet is grown stage by stage. For
+each stage the event loop lag, state writes per second and memory use are
+reported:
+
+    python scripts/fleet_load.py --hubs 1,10,50,100 --rate 10 --stage 60
+
+With `--generate-only` only the datagrams are sent, e.g. to load a running
+Home Assistant instance.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+from collections.abc import Callable
+import heapq
+import json
+import os
+from pathlib import Path
+import random
+import resource
+import socket
+import sys
+import tempfile
+import time
+from typing import Any
+
+ROOT = Path(__file__).parents[1]
+DOMAIN = "smartweatherudp"
+DEFAULT_PORT = 50222
+
+HUB_STATUS_INTERVAL = 10
+DEVICE_STATUS_INTERVAL = 60
+OBSERVATION_INTERVAL = 60
+RAPID_WIND_INTERVAL = 3
+
+
+class VirtualDevice:
+    """A virtual WeatherFlow sensor device with slowly drifting readings."""
+
+    def __init__(self, prefix: str, index: int, hub_sn: str) -> None:
+        """Initialize the virtual device."""
+        self.serial_number = f"{prefix}-{index:08d}"
+        self.hub_sn = hub_sn
+        self.started = time.time()
+        self.temperature = random.uniform(-5, 30)
+        self.pressure = random.uniform(990, 1030)
+        self.wind = random.uniform(0, 8)
+        self.direction = random.uniform(0, 360)
+
+    def _drift(self) -> None:
+        """Move the readings a little."""
+        self.temperature += random.gauss(0, 0.05)
+        self.pressure += random.gauss(0, 0.02)
+        self.wind = max(self.wind + random.gauss(0, 0.3), 0)
+        self.direction = (self.direction + random.gauss(0, 5)) % 360
+
+    def _message(self, message_type: str, **data: Any) -> bytes:
+        """Return a datagram from the device."""
+        return json.dumps(
+            {
+                "serial_number": self.serial_number,
+                "type": message_type,
+                "hub_sn": self.hub_sn,
+                **data,
+            }
+        ).encode()
+
+    def device_status(self, epoch: int) -> bytes:
+        """Return a device status datagram."""
+        return self._message(
+            "device_status",
+            timestamp=epoch,
+            uptime=int(epoch - self.started),
+            voltage=2.6,
+            firmware_revision=172,
+            rssi=random.randint(-80, -40),
+            hub_rssi=random.randint(-80, -40),
+            sensor_status=0,
+            debug=0,
+        )
+
+    def rapid_wind(self, epoch: int) -> bytes:
+        """Return a rapid wind datagram."""
+        self._drift()
+        return self._message(
+            "rapid_wind",
+            ob=[epoch, round(self.wind, 2), round(self.direction)],
+        )
+
+    def observation(self, epoch: int) -> bytes:
+        """Return an observation datagram."""
+        raise NotImplementedError
+
+
+class VirtualTempest(VirtualDevice):
+    """A virtual Tempest."""
+
+    def __init__(self, index: int, hub_sn: str) -> None:
+        """Initialize the virtual Tempest."""
+        super().__init__("ST", index, hub_sn)
+
+    def observation(self, epoch: int) -> bytes:
+        """Return an `obs_st` datagram."""
+        self._drift()
+        wind = round(self.wind, 2)
+        return self._message(
+            "obs_st",
+            obs=[
+                [epoch, max(wind - 1, 0), wind, wind + 1.5, round(self.direction), 3]
+                + [round(self.pressure, 2), round(self.temperature, 2), 65, 9000]
+                + [2.1, 75, 0.0, 0, 0, 0, 2.6, 1]
+            ],
+            firmware_revision=172,
+        )
+
+
+class VirtualAir(VirtualDevice):
+    """A virtual Air."""
+
+    def __init__(self, index: int, hub_sn: str) -> None:
+        """Initialize the virtual Air."""
+        super().__init__("AR", index, hub_sn)
+
+    def observation(self, epoch: int) -> bytes:
+        """Return an `obs_air` datagram."""
+        self._drift()
+        return self._message(
+            "obs_air",
+            obs=[
+                [epoch, round(self.pressure, 2), round(self.temperature, 2), 65]
+                + [0, 0, 3.46, 1]
+            ],
+            firmware_revision=17,
+        )
+
+
+class VirtualSky(VirtualDevice):
+    """A virtual Sky."""
+
+    def __init__(self, index: int, hub_sn: str) -> None:
+        """Initialize the virtual Sky."""
+        super().__init__("SK", index, hub_sn)
+
+    def observation(self, epoch: int) -> bytes:
+        """Return an `obs_sky` datagram."""
+        self._drift()
+        wind = round(self.wind, 2)
+        return self._message(
+            "obs_sky",
+            obs=[
+                [epoch, 9000, 2.1, 0.0, max(wind - 1, 0), wind, wind + 1.5]
+                + [round(self.direction), 3.12, 1, 75, None, 0, 3]
+            ],
+            firmware_revision=43,
+        )
+
+
+class VirtualHub:
+    """A virtual hub with a Tempest, an Air and a Sky."""
+
+    def __init__(self, index: int) -> None:
+        """Initialize the virtual hub."""
+        self.serial_number = f"HB-{index:08d}"
+        self.started = time.time()
+        self.seq = 0
+        self.devices: list[VirtualDevice] = [
+            VirtualTempest(index, self.serial_number),
+            VirtualAir(index, self.serial_number),
+            VirtualSky(index, self.serial_number),
+        ]
+
+    def hub_status(self, epoch: int) -> bytes:
+        """Return a hub status datagram."""
+        self.seq += 1
+        return json.dumps(
+            {
+                "serial_number": self.serial_number,
+                "type": "hub_status",
+                "firmware_revision": "177",
+                "uptime": int(epoch - self.started),
+                "rssi": random.randint(-70, -40),
+                "timestamp": epoch,
+                "reset_flags": "BOR,PIN,POR",
+                "seq": self.seq,
+                "radio_stats": [25, 1, 0, 3, 16527],
+                "mqtt_stats": [1, 0],
+            }
+        ).encode()
+
+    def streams(self) -> list[tuple[float, Callable[[int], bytes]]]:
+        """Return the interval and datagram factory of each stream."""
+        streams: list[tuple[float, Callable[[int], bytes]]] = [
+            (HUB_STATUS_INTERVAL, self.hub_status)
+        ]
+        for device in self.devices:
+            streams.append((DEVICE_STATUS_INTERVAL, device.device_status))
+            streams.append((OBSERVATION_INTERVAL, device.observation))
+            if not isinstance(device, VirtualAir):
+                streams.append((RAPID_WIND_INTERVAL, device.rapid_wind))
+        return streams
+
+
+async def generate(
+    hubs: int, target: str, port: int, rate: float, jitter: float
+) -> None:
+    """Send the datagrams of a fleet of virtual hubs until cancelled."""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.setblocking(False)
+    loop = asyncio.get_running_loop()
+    now = loop.time()
+
+    # (due, seq, interval, factory), the seq keeps the heap from comparing factories.
+    schedule: list[tuple[float, int, float, Callable[[int], bytes]]] = []
+    for index in range(hubs):
+        for interval, factory in VirtualHub(index).streams():
+            interval /= rate
+            # Spread the first datagrams so the fleet does not report in lockstep.
+            due = now + random.uniform(0, min(interval, 5))
+            schedule.append((due, len(schedule), interval, factory))
+    heapq.heapify(schedule)
+
+    try:
+        while True:
+            due, seq, interval, factory = schedule[0]
+            if (delay := due - loop.time()) > 0:
+                await asyncio.sleep(delay)
+            sock.sendto(factory(int(time.time())), (target, port))
+            heapq.heapreplace(
+                schedule,
+                (
+                    due + interval * (1 + random.uniform(-jitter, jitter)),
+                    seq,
+                    interval,
+                    factory,
+                ),
+            )
+    finally:
+        sock.close()
+
+
+def rss_mib() -> float:
+    """Return the resident memory of this process in MiB."""
+    try:
+        with open("/proc/self/statm", encoding="ascii") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        # Peak rather than current usage, in KiB on Linux and bytes on macOS.
+        maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return maxrss / 2**20 if sys.platform == "darwin" else maxrss / 2**10
+
+
+async def monitor_lag(samples: list[float], interval: float = 0.05) -> None:
+    """Sample how late the event loop wakes up a sleeping task."""
+    loop = asyncio.get_running_loop()
+    while True:
+        start = loop.time()
+        await asyncio.sleep(interval)
+        samples.append(loop.time() - start - interval)
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    """Return a percentile of the samples."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(int(len(ordered) * pct / 100), len(ordered) - 1)]
+
+
+async def run_stages(args: argparse.Namespace) -> None:
+    """Bootstrap Home Assistant, set up the integration and grow the fleet."""
+    # pylint: disable=import-outside-toplevel
+    from homeassistant import bootstrap, runner
+    from homeassistant.config_entries import SOURCE_IMPORT
+    from homeassistant.const import CONF_HOST, EVENT_STATE_CHANGED
+    from homeassistant.core import Event, callback
+
+    with tempfile.TemporaryDirectory() as config_dir:
+        config_path = Path(config_dir)
+        (config_path / "custom_components").mkdir()
+        (config_path / "custom_components" / DOMAIN).symlink_to(
+            ROOT / "custom_components" / DOMAIN
+        )
+        (config_path / "configuration.yaml").write_text(
+            "homeassistant:\n  time_zone: UTC\n  unit_system: metric\n"
+            "logger:\n  default: warning\n",
+            encoding="utf-8",
+        )
+        sys.path.insert(0, config_dir)
+
+        hass = await bootstrap.async_setup_hass(
+            runner.RuntimeConfig(config_dir=config_dir, skip_pip=True)
+        )
+        if hass is None:
+            raise SystemExit("Home Assistant could not be set up")
+        await hass.async_start()
+        await hass.config_entries.flow.async_init(
+            DOMAIN, context={"source": SOURCE_IMPORT}, data={CONF_HOST: args.host}
+        )
+        await hass.async_block_till_done()
+        (entry,) = hass.config_entries.async_entries(DOMAIN)
+
+        writes = 0
+
+        @callback
+        def count_write(event: Event) -> None:
+            nonlocal writes
+            writes += 1
+
+        hass.bus.async_listen(EVENT_STATE_CHANGED, count_write)
+
+        lag: list[float] = []
+        lag_task = asyncio.create_task(monitor_lag(lag))
+        baseline = rss_mib()
+        print(
+            f"{'hubs':>6}{'devices':>9}{'entities':>10}{'writes/s':>10}"
+            f"{'lag p50 ms':>12}{'lag p99 ms':>12}{'lag max ms':>12}"
+            f"{'RSS MiB':>10}{'growth':>9}"
+        )
+        try:
+            for hubs in args.hubs:
+                generator = await asyncio.create_subprocess_exec(
+                    sys.executable,
+                    __file__,
+                    "--generate-only",
+                    f"--hubs={hubs}",
+                    f"--target={args.target}",
+                    f"--port={args.port}",
+                    f"--rate={args.rate}",
+                    f"--jitter={args.jitter}",
+                )
+                lag.clear()
+                writes = 0
+                start = time.monotonic()
+                await asyncio.sleep(args.stage)
+                elapsed = time.monotonic() - start
+                generator.terminate()
+                await generator.wait()
+
+                rss = rss_mib()
+                print(
+                    f"{hubs:>6}"
+                    f"{len(hass.data[DOMAIN][entry.entry_id].devices):>9}"
+                    f"{len(hass.states.async_entity_ids('sensor')):>10}"
+                    f"{writes / elapsed:>10.1f}"
+                    f"{percentile(lag, 50) * 1000:>12.2f}"
+                    f"{percentile(lag, 99) * 1000:>12.2f}"
+                    f"{max(lag, default=0) * 1000:>12.2f}"
+                    f"{rss:>10.1f}{rss - baseline:>+9.1f}"
+                )
+        finally:
+            lag_task.cancel()
+            await hass.async_stop()
+
+
+def main() -> None:
+    """Parse the arguments and run the load test."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--hubs",
+        type=lambda value: [int(hubs) for hubs in value.split(",")],
+        default=[1, 10, 50, 100],
+        help="comma separated number of hubs per stage",
+    )
+    parser.add_argument("--rate", type=float, default=1.0, help="cadence multiplier")
+    parser.add_argument(
+        "--jitter", type=float, default=0.1, help="relative interval jitter"
+    )
+    parser.add_argument("--stage", type=float, default=120, help="seconds per stage")
+    parser.add_argument("--target", default="127.0.0.1", help="address to send to")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--host", default="0.0.0.0", help="address to listen on")
+    parser.add_argument("--generate-only", action="store_true")
+    args = parser.parse_args()
+
+    try:
+        if args.generate_only:
+            asyncio.run(
+                generate(max(args.hubs), args.target, args.port, args.rate, args.jitter)
+            )
+        else:
+            asyncio.run(run_stages(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Compact file format for recorded WeatherFlow UDP datagrams.
+
+A recording starts with a header holding a magic string and the UTC epoch of
+the first datagram. Each datagram follows as a record of the milliseconds
+since the previous datagram, the payload length and the raw payload:
+
+    header: b"WFUDP\\x01" + <d start epoch>
+    record: <I delta ms> <H length> payload
+
+Recordings ending in `.gz` are gzip compressed.
+"""
+from __future__ import annotations
+
+from collections.abc import Iterator
+import gzip
+from pathlib import Path
+import struct
+from typing import BinaryIO
+
+MAGIC = b"WFUDP\x01"
+HEADER = struct.Struct("<d")
+RECORD = struct.Struct("<IH")
+
+
+def _open(path: str | Path, mode: str) -> BinaryIO:
+    """Open a recording, compressed if the name ends in `.gz`."""
+    if str(path).endswith(".gz"):
+        return gzip.open(path, mode)
+    return open(path, mode)  # pylint: disable=consider-using-with
+
+
+class PacketWriter:
+    """Append datagrams to a recording."""
+
+    def __init__(self, path: str | Path) -> None:
+        """Open a recording for writing."""
+        self._file = _open(path, "wb")
+        self._last: float | None = None
+        self.count = 0
+
+    def write(self, epoch: float, payload: bytes) -> None:
+        """Write a datagram received at epoch."""
+        if self._last is None:
+            self._file.write(MAGIC + HEADER.pack(epoch))
+            self._last = epoch
+        delta = max(round((epoch - self._last) * 1000), 0)
+        self._last += delta / 1000
+        self._file.write(RECORD.pack(delta, len(payload)) + payload)
+        self.count += 1
+
+    def close(self) -> None:
+        """Close the recording."""
+        self._file.close()
+
+    def __enter__(self) -> PacketWriter:
+        """Enter the context."""
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        """Close the recording when leaving the context."""
+        self.close()
+
+
+def read_packets(path: str | Path) -> Iterator[tuple[float, bytes]]:
+    """Yield the epoch and payload of each recorded datagram."""
+    with _open(path, "rb") as file:
+        if file.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a WeatherFlow UDP recording")
+        (epoch,) = HEADER.unpack(file.read(HEADER.size))
+        while header := file.read(RECORD.size):
+            if len(header) < RECORD.size:
+                raise ValueError(f"{path} is truncated")
+            delta, length = RECORD.unpack(header)
+            epoch += delta / 1000
+            yield epoch, file.read(length)
@@ -0,0 +1,52 @@
+"""Record WeatherFlow UDP datagrams to a file.
+
+    python scripts/record_packets.py recording.wfudp.gz --duration 3600
+
+The socket is opened with address and port reuse so it can run next to a
+Home Assistant instance listening on the same port. Stop with Ctrl+C.
+"""
+from __future__ import annotations
+
+import argparse
+import socket
+import time
+
+from packetlog import PacketWriter
+
+DEFAULT_PORT = 50222
+
+
+def main() -> None:
+    """Record datagrams until the duration passes or the user interrupts."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("output", help="recording to write, gzip if it ends in .gz")
+    parser.add_argument("--host", default="0.0.0.0", help="address to listen on")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--duration", type=float, help="seconds to record")
+    args = parser.parse_args()
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    if hasattr(socket, "SO_REUSEPORT"):
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    sock.bind((args.host, args.port))
+    sock.settimeout(1)
+
+    end = None if args.duration is None else time.monotonic() + args.duration
+    with PacketWriter(args.output) as writer:
+        try:
+            while end is None or time.monotonic() < end:
+                try:
+                    payload = sock.recv(4096)
+                except socket.timeout:
+                    continue
+                writer.write(time.time(), payload)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            sock.close()
+        print(f"Recorded {writer.count} datagrams to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
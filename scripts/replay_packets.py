@@ -0,0 +1,62 @@
+"""Replay recorded WeatherFlow UDP datagrams to a local socket.
+
+    python scripts/replay_packets.py recording.wfudp.gz --speed 60
+
+Datagrams are sent with their recorded spacing divided by the speed, from 1x
+(real time) to 1000x.
+"""
+from __future__ import annotations
+
+import argparse
+import socket
+import time
+
+from packetlog import read_packets
+
+DEFAULT_PORT = 50222
+
+
+def speed(value: str) -> float:
+    """Parse a replay speed between 1 and 1000."""
+    if not 1 <= (result := float(value)) <= 1000:
+        raise argparse.ArgumentTypeError("speed must be between 1 and 1000")
+    return result
+
+
+def main() -> None:
+    """Replay a recording."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("recording", help="recording to replay")
+    parser.add_argument("--host", default="127.0.0.1", help="address to send to")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--speed", type=speed, default=1.0, help="1 to 1000")
+    parser.add_argument("--loop", action="store_true", help="replay forever")
+    args = parser.parse_args()
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+    sent = 0
+    try:
+        while True:
+            start = time.monotonic()
+            first: float | None = None
+            for epoch, payload in read_packets(args.recording):
+                if first is None:
+                    first = epoch
+                if (
+                    delay := start + (epoch - first) / args.speed - time.monotonic()
+                ) > 0:
+                    time.sleep(delay)
+                sock.sendto(payload, (args.host, args.port))
+                sent += 1
+            if not args.loop:
+                break
+    except KeyboardInterrupt:
+        pass
+    finally:
+        sock.close()
+    print(f"Sent {sent} datagrams to {args.host}:{args.port}")
+
+
+if __name__ == "__main__":
+    main()
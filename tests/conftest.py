@@ -0,0 +1,15 @@
+"""Fixtures for the smartweatherudp tests.
+
+The tests of the Home Assistant parts run on
+`pytest-homeassistant-custom-component`, see `requirements_test.txt`, and are
+skipped without it. The tests of the modules that do not need Home Assistant
+import them directly from the integration directory.
+"""
+from pathlib import Path
+import sys
+
+# First on the path, so `mailbox` is the integration's rather than the standard
+# library module of the same name.
+sys.path.insert(
+    0, str(Path(__file__).parents[1] / "custom_components" / "smartweatherudp")
+)
@@ -0,0 +1,50 @@
+"""Tests for the smartweatherudp config flow."""
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+pytest.importorskip("pytest_homeassistant_custom_component")
+
+# pylint: disable=wrong-import-position
+from pytest_homeassistant_custom_component.common import (  # noqa: E402
+    MockConfigEntry,
+)
+
+from custom_components.smartweatherudp.const import (  # noqa: E402
+    DEFAULT_HOST,
+    DOMAIN,
+)
+from custom_components.smartweatherudp.listener import (  # noqa: E402
+    SharedWeatherFlowListener,
+    async_get_listener_service,
+)
+from homeassistant import config_entries  # noqa: E402
+from homeassistant.const import CONF_HOST  # noqa: E402
+from homeassistant.core import HomeAssistant  # noqa: E402
+from homeassistant.data_entry_flow import FlowResultType  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def auto_enable_custom_integrations(enable_custom_integrations):
+    """Enable the custom integration in every test."""
+    yield
+
+
+async def test_manual_host_while_listening_on_all_addresses(
+    hass: HomeAssistant,
+) -> None:
+    """Test the flow asks for a host address while 0.0.0.0 is set up."""
+    MockConfigEntry(domain=DOMAIN, data={CONF_HOST: DEFAULT_HOST}).add_to_hass(hass)
+    with patch.object(SharedWeatherFlowListener, "start_listening", AsyncMock()):
+        await async_get_listener_service(hass).async_acquire(DEFAULT_HOST)
+
+    with patch(
+        "custom_components.smartweatherudp.config_flow._async_has_devices"
+    ) as has_devices:
+        result = await hass.config_entries.flow.async_init(
+            DOMAIN, context={"source": config_entries.SOURCE_USER}
+        )
+
+    assert result["type"] == FlowResultType.FORM
+    assert result["step_id"] == "user"
+    has_devices.assert_not_called()
@@ -0,0 +1,69 @@
+"""Tests for the precompiled sensor value conversions."""
+from enum import Enum
+
+from conversion import ValueConverter
+import pytest
+from pyweatherflowudp.calc import Quantity
+
+
+class Precipitation(Enum):
+    """Precipitation type."""
+
+    NONE = 0
+    RAIN = 1
+
+
+def test_quantity_magnitude() -> None:
+    """Test a quantity without a conversion returns its magnitude."""
+    converter = ValueConverter()
+    assert converter.convert(Quantity(22.37, "degC")) == 22.37
+
+    converter = ValueConverter(decimals=1)
+    assert converter.convert(Quantity(22.37, "degC")) == 22.4
+
+
+@pytest.mark.parametrize(
+    ("value", "unit", "fn"),
+    [
+        (22.37, "degC", lambda attr: attr.to("degF")),
+        (1017.57, "mbar", lambda attr: attr.to("inHg")),
+        (1.2, "kg/m³", lambda attr: attr.to("lbs/ft³")),
+        (3.5, "m/s", lambda attr: attr.to("km/h")),
+    ],
+)
+def test_unit_conversion_matches_pint(value, unit, fn) -> None:
+    """Test the compiled scale and offset match the pint conversion."""
+    converter = ValueConverter(fn, 5)
+    expected = round(fn(Quantity(value, unit)).m, 5)
+    assert converter.convert(Quantity(value, unit)) == pytest.approx(expected)
+    # Later values reuse the compiled conversion.
+    expected = round(fn(Quantity(value * 2, unit)).m, 5)
+    assert converter.convert(Quantity(value * 2, unit)) == pytest.approx(expected)
+
+
+def test_compiled_once() -> None:
+    """Test the conversion is compiled on the first value only."""
+    calls = []
+
+    def to_fahrenheit(attr: Quantity) -> Quantity:
+        calls.append(attr)
+        return attr.to("degF")
+
+    converter = ValueConverter(to_fahrenheit)
+    for value in (0.0, 10.0, 20.0):
+        converter.convert(Quantity(value, "degC"))
+
+    assert len(calls) == 2
+    assert converter.convert(Quantity(100.0, "degC")) == pytest.approx(212.0)
+
+
+def test_enum_name() -> None:
+    """Test an enum is converted to its name."""
+    assert ValueConverter().convert(Precipitation.RAIN) == "RAIN"
+
+
+def test_plain_values() -> None:
+    """Test plain numbers are rounded and other values passed through."""
+    assert ValueConverter(decimals=2).convert(1.23456) == 1.23
+    assert ValueConverter().convert(1.23456) == 1.23456
+    assert ValueConverter(decimals=2).convert("on") == "on"
@@ -0,0 +1,98 @@
+"""Tests for the duplicate and out-of-order packet detection."""
+from dedup import (
+    DEDUP_WINDOW,
+    DUPLICATE,
+    MAX_REORDER,
+    NEW,
+    OUT_OF_ORDER,
+    PacketIndex,
+    message_key,
+)
+
+
+def _rapid_wind(epoch: int, speed: float = 2.3) -> dict:
+    """Return a rapid wind message sent at epoch."""
+    return {"type": "rapid_wind", "ob": [epoch, speed, 128]}
+
+
+def _strike(epoch: int, distance: int) -> dict:
+    """Return a lightning strike event sent at epoch."""
+    return {"type": "evt_strike", "evt": [epoch, distance, 3848]}
+
+
+def test_message_key() -> None:
+    """Test the timestamp and key of each kind of message."""
+    assert message_key(_rapid_wind(100)) == (100, 100)
+    assert message_key(_strike(100, 27)) == (100, (100, 27, 3848))
+    assert message_key({"obs": [[90, 1.0], [100, 2.0]]}) == (100, 100)
+    assert message_key({"type": "hub_status", "timestamp": 100}) == (100, 100)
+
+
+def test_message_key_without_timestamp() -> None:
+    """Test messages without a usable timestamp have no key."""
+    assert message_key({"type": "hub_status"}) is None
+    assert message_key({"ob": []}) is None
+    assert message_key({"obs": [{"a": 1}]}) is None
+    assert message_key({"timestamp": "100"}) is None
+    assert message_key({"timestamp": True}) is None
+    assert message_key({"evt": [[1], 2]}) is None
+
+
+def test_duplicate() -> None:
+    """Test a packet received twice is a duplicate."""
+    index = PacketIndex()
+    assert index.check("rapid_wind", _rapid_wind(100)) == NEW
+    assert index.check("rapid_wind", _rapid_wind(100)) == DUPLICATE
+    assert index.check("rapid_wind", _rapid_wind(103)) == NEW
+
+
+def test_events_sharing_a_timestamp() -> None:
+    """Test distinct events with the same timestamp are all new."""
+    index = PacketIndex()
+    assert index.check("evt_strike", _strike(100, 27)) == NEW
+    assert index.check("evt_strike", _strike(100, 12)) == NEW
+    assert index.check("evt_strike", _strike(100, 27)) == DUPLICATE
+
+
+def test_message_types_independent() -> None:
+    """Test each message type is ordered on its own."""
+    index = PacketIndex()
+    assert index.check("rapid_wind", _rapid_wind(100)) == NEW
+    assert index.check("obs_st", {"obs": [[40, 1.0]]}) == NEW
+
+
+def test_out_of_order() -> None:
+    """Test a packet older than the newest of its type is out of order."""
+    index = PacketIndex()
+    assert index.check("rapid_wind", _rapid_wind(100)) == NEW
+    assert index.check("rapid_wind", _rapid_wind(97)) == OUT_OF_ORDER
+    assert index.check("rapid_wind", _rapid_wind(100 - MAX_REORDER)) == OUT_OF_ORDER
+
+
+def test_clock_reset() -> None:
+    """Test a packet far older than the newest is accepted as a clock reset."""
+    index = PacketIndex()
+    assert index.check("rapid_wind", _rapid_wind(10_000)) == NEW
+    reset = 10_000 - MAX_REORDER - 1
+    assert index.check("rapid_wind", _rapid_wind(reset)) == NEW
+    assert index.check("rapid_wind", _rapid_wind(reset + 3)) == NEW
+
+
+def test_duplicate_window() -> None:
+    """Test duplicates are only detected within the recent packets.
+
+    Older packets are still dropped as out of order.
+    """
+    index = PacketIndex()
+    for epoch in range(100, 100 + 3 * (DEDUP_WINDOW + 1), 3):
+        assert index.check("rapid_wind", _rapid_wind(epoch)) == NEW
+
+    assert index.check("rapid_wind", _rapid_wind(100)) == OUT_OF_ORDER
+    assert index.check("rapid_wind", _rapid_wind(103)) == DUPLICATE
+
+
+def test_messages_without_key_are_new() -> None:
+    """Test messages without a timestamp are never dropped."""
+    index = PacketIndex()
+    assert index.check("hub_status", {"type": "hub_status"}) == NEW
+    assert index.check("hub_status", {"type": "hub_status"}) == NEW
@@ -0,0 +1,216 @@
+"""Tests for the observation export."""
+import json
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+pytest.importorskip("pytest_homeassistant_custom_component")
+
+# pylint: disable=wrong-import-position
+from pyweatherflowudp.calc import Quantity  # noqa: E402
+from pyweatherflowudp.enums import PrecipitationType  # noqa: E402
+
+from custom_components.smartweatherudp.const import (  # noqa: E402
+    EXPORT_FORMAT_LINE_PROTOCOL,
+    EXPORT_FORMAT_NDJSON,
+)
+from custom_components.smartweatherudp.exporter import (  # noqa: E402
+    FileSink,
+    ObservationExporter,
+    SocketSink,
+    create_sink,
+    format_line_protocol,
+    format_ndjson,
+)
+from homeassistant.core import HomeAssistant  # noqa: E402
+
+OBSERVATION = (
+    1588948614,
+    "ST-00000512",
+    (("air_temperature", 22.37), ("precipitation_type", 1), ("uv", 3)),
+)
+
+
+class FakeDevice:
+    """Device with a few observation attributes."""
+
+    serial_number = "ST-00000512"
+
+    def __init__(self, temperature: float | None = 22.37) -> None:
+        """Initialize the device."""
+        self.air_temperature = (
+            None if temperature is None else Quantity(temperature, "degC")
+        )
+        self.precipitation_type = PrecipitationType.RAIN
+        self.uv = 3
+        self.battery = float("nan")
+
+
+class MemorySink:
+    """Sink keeping the lines written to it."""
+
+    def __init__(self) -> None:
+        """Initialize the sink."""
+        self.lines: list[str] = []
+        self.closed = False
+        self.error: OSError | None = None
+
+    def __str__(self) -> str:
+        """Return the name of the sink."""
+        return "memory"
+
+    def write(self, lines: list[str]) -> None:
+        """Keep the lines, or raise the error set."""
+        if self.error is not None:
+            raise self.error
+        self.lines.extend(lines)
+
+    def close(self) -> None:
+        """Close the sink."""
+        self.closed = True
+
+
+def test_format_ndjson() -> None:
+    """Test an observation formatted as a JSON object."""
+    assert json.loads(format_ndjson(OBSERVATION)) == {
+        "time": 1588948614,
+        "serial_number": "ST-00000512",
+        "air_temperature": 22.37,
+        "precipitation_type": 1,
+        "uv": 3,
+    }
+
+
+def test_format_line_protocol() -> None:
+    """Test an observation formatted as line protocol, with stable field types."""
+    assert format_line_protocol(OBSERVATION) == (
+        "weatherflow,serial_number=ST-00000512 "
+        "air_temperature=22.37,precipitation_type=1i,uv=3.0 "
+        "1588948614000000000"
+    )
+
+
+def test_file_sink_rotates(tmp_path) -> None:
+    """Test the file is rotated when it would grow too large."""
+    path = tmp_path / "export" / "observations.txt"
+    sink = FileSink(str(path))
+    with patch("custom_components.smartweatherudp.exporter.MAX_FILE_SIZE", 10), patch(
+        "custom_components.smartweatherudp.exporter.FILE_BACKUP_COUNT", 2
+    ):
+        for line in ("first", "second", "third", "fourth"):
+            sink.write([line])
+    sink.close()
+
+    assert path.read_text() == "fourth\n"
+    assert (tmp_path / "export" / "observations.txt.1").read_text() == "third\n"
+    assert (tmp_path / "export" / "observations.txt.2").read_text() == "second\n"
+    assert not (tmp_path / "export" / "observations.txt.3").exists()
+
+
+def test_socket_sink_packs_datagrams() -> None:
+    """Test lines are packed into datagrams over UDP."""
+    sink = SocketSink("udp", "127.0.0.1", 8094)
+    with patch.object(SocketSink, "_connect") as connect, patch(
+        "custom_components.smartweatherudp.exporter.MAX_DATAGRAM_SIZE", 12
+    ):
+        sink.write(["aaaa", "bbbb", "cccc"])
+
+    assert [call.args for call in connect.return_value.send.call_args_list] == [
+        (b"aaaa\nbbbb\n",),
+        (b"cccc\n",),
+    ]
+
+
+def test_socket_sink_reconnects() -> None:
+    """Test the socket is closed after a failure and reconnected on the next write."""
+    sink = SocketSink("tcp", "127.0.0.1", 8094)
+    with patch.object(SocketSink, "_connect") as connect:
+        connect.return_value.sendall.side_effect = OSError("reset")
+        with pytest.raises(OSError):
+            sink.write(["aaaa"])
+        connect.return_value.close.assert_called_once()
+
+        connect.return_value.sendall.side_effect = None
+        sink.write(["bbbb"])
+        assert connect.call_count == 2
+        connect.return_value.sendall.assert_called_with(b"bbbb\n")
+
+
+async def test_create_sink(hass: HomeAssistant) -> None:
+    """Test the sinks of valid and invalid export targets."""
+    assert str(create_sink(hass, "tcp://localhost:8094")) == "tcp://localhost:8094"
+    assert str(create_sink(hass, " udp://10.0.0.2:8094 ")) == "udp://10.0.0.2:8094"
+    assert str(create_sink(hass, "export/weatherflow.txt")) == hass.config.path(
+        "export/weatherflow.txt"
+    )
+    for target in ("", "http://localhost:8094", "tcp://localhost", "../outside"):
+        with pytest.raises(ValueError):
+            create_sink(hass, target)
+
+
+async def test_exporter_writes_batches(hass: HomeAssistant) -> None:
+    """Test observations are buffered and written on flush and shutdown."""
+    sink = MemorySink()
+    exporter = ObservationExporter(hass, EXPORT_FORMAT_NDJSON, sink)
+    exporter.async_add_observation(FakeDevice(), SimpleNamespace(epoch=100))
+    exporter.async_add_observation(FakeDevice(None), SimpleNamespace(epoch=160))
+    assert exporter.as_dict()["buffered"] == 2
+
+    await exporter.async_shutdown()
+
+    assert [json.loads(line) for line in sink.lines] == [
+        {
+            "time": 100,
+            "serial_number": "ST-00000512",
+            "air_temperature": 22.37,
+            "precipitation_type": 1,
+            "uv": 3,
+        },
+        {
+            "time": 160,
+            "serial_number": "ST-00000512",
+            "precipitation_type": 1,
+            "uv": 3,
+        },
+    ]
+    assert exporter.exported == 2
+    assert sink.closed
+
+    # Observations after the shutdown are ignored.
+    exporter.async_add_observation(FakeDevice(), SimpleNamespace(epoch=220))
+    assert exporter.as_dict()["buffered"] == 0
+
+
+async def test_exporter_counts_failures(hass: HomeAssistant) -> None:
+    """Test observations that could not be written are counted."""
+    sink = MemorySink()
+    sink.error = OSError("unreachable")
+    exporter = ObservationExporter(hass, EXPORT_FORMAT_LINE_PROTOCOL, sink)
+    with patch("custom_components.smartweatherudp.exporter.FLUSH_SIZE", 2):
+        for epoch in range(3):
+            exporter.async_add_observation(FakeDevice(), SimpleNamespace(epoch=epoch))
+        await hass.async_block_till_done()
+    assert exporter.failed == 2
+    assert exporter.exported == 0
+
+    sink.error = None
+    await exporter.async_shutdown()
+    assert exporter.exported == 1
+    assert sink.lines[0].endswith(" 2000000000")
+
+
+async def test_exporter_drops_oldest(hass: HomeAssistant) -> None:
+    """Test the oldest observations are dropped once the buffer is full."""
+    sink = MemorySink()
+    with patch("custom_components.smartweatherudp.exporter.BUFFER_SIZE", 2):
+        exporter = ObservationExporter(hass, EXPORT_FORMAT_LINE_PROTOCOL, sink)
+        for epoch in range(3):
+            exporter.async_add_observation(FakeDevice(), SimpleNamespace(epoch=epoch))
+    assert exporter.dropped == 1
+
+    await exporter.async_shutdown()
+    assert [line.rsplit(" ", 1)[1] for line in sink.lines] == [
+        "1000000000",
+        "2000000000",
+    ]
@@ -0,0 +1,95 @@
+"""Tests for setting up and updating smartweatherudp config entries."""
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+pytest.importorskip("pytest_homeassistant_custom_component")
+
+# pylint: disable=wrong-import-position
+from pytest_homeassistant_custom_component.common import (  # noqa: E402
+    MockConfigEntry,
+)
+
+from custom_components.smartweatherudp.const import (  # noqa: E402
+    CONF_EXPORT_FORMAT,
+    CONF_EXPORT_TARGET,
+    CONF_HEARTBEAT_INTERVAL,
+    DEFAULT_HOST,
+    DOMAIN,
+    EXPORT_FORMAT_NDJSON,
+    EXPORT_FORMAT_NONE,
+)
+from custom_components.smartweatherudp.listener import (  # noqa: E402
+    SharedWeatherFlowListener,
+)
+from homeassistant.config_entries import ConfigEntryState  # noqa: E402
+from homeassistant.const import CONF_HOST  # noqa: E402
+from homeassistant.core import HomeAssistant  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def auto_enable_custom_integrations(enable_custom_integrations):
+    """Enable the custom integration in every test."""
+    yield
+
+
+@pytest.fixture(autouse=True)
+def mock_listener():
+    """Keep the listeners from opening sockets."""
+    with patch.object(
+        SharedWeatherFlowListener, "start_listening", AsyncMock()
+    ), patch.object(SharedWeatherFlowListener, "stop_listening", AsyncMock()):
+        yield
+
+
+async def test_options_applied_without_reload(hass: HomeAssistant) -> None:
+    """Test changed options are applied to the running entry."""
+    entry = MockConfigEntry(domain=DOMAIN, data={CONF_HOST: DEFAULT_HOST})
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    data = hass.data[DOMAIN][entry.entry_id]
+    client = data.client
+    assert data.scheduler.heartbeat == 15 * 60
+    assert data.exporter is None
+
+    with patch(
+        "custom_components.smartweatherudp.runtime.async_setup_entry"
+    ) as setup_entry:
+        hass.config_entries.async_update_entry(
+            entry,
+            options={
+                CONF_HEARTBEAT_INTERVAL: 5,
+                CONF_EXPORT_FORMAT: EXPORT_FORMAT_NDJSON,
+                CONF_EXPORT_TARGET: "weatherflow.ndjson",
+            },
+        )
+        await hass.async_block_till_done()
+
+        assert entry.state is ConfigEntryState.LOADED
+        assert hass.data[DOMAIN][entry.entry_id] is data
+        assert data.client is client
+        assert data.scheduler.heartbeat == 5 * 60
+        assert data.exporter is not None
+        assert data.exporter.export_format == EXPORT_FORMAT_NDJSON
+        assert data.exporter.target == hass.config.path("weatherflow.ndjson")
+        exporter = data.exporter
+
+        # Unchanged export options keep the running exporter.
+        hass.config_entries.async_update_entry(
+            entry, options={**entry.options, CONF_HEARTBEAT_INTERVAL: 0}
+        )
+        await hass.async_block_till_done()
+        assert data.scheduler.heartbeat == 0
+        assert data.exporter is exporter
+
+        hass.config_entries.async_update_entry(
+            entry, options={**entry.options, CONF_EXPORT_FORMAT: EXPORT_FORMAT_NONE}
+        )
+        await hass.async_block_till_done()
+        assert data.exporter is None
+
+    setup_entry.assert_not_called()
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
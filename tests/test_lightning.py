@@ -0,0 +1,95 @@
+"""Tests for the lightning strike index."""
+from datetime import datetime, timezone
+from unittest.mock import patch
+
+from lightning import LightningStrikeIndex
+
+EPOCH = 1_700_000_000
+
+
+def test_window_counts() -> None:
+    """Test the strikes counted in each window."""
+    index = LightningStrikeIndex(windows=(60, 600))
+    assert index.add(EPOCH, 12.0, 100)
+    assert index.add(EPOCH + 100, 8.0, 200)
+    assert index.add(EPOCH + 130, 20.0, 300)
+
+    short, long = index.windows[60], index.windows[600]
+    assert short.count_at(EPOCH + 150) == 2
+    assert long.count_at(EPOCH + 150) == 3
+    # A strike exactly a window length old has left the window.
+    assert short.count_at(EPOCH + 160) == 1
+    assert long.count_at(EPOCH + 600) == 2
+    assert long.count_at(EPOCH + 2000) == 0
+
+
+def test_closest_in_window() -> None:
+    """Test the closest strike leaves the window with the strike."""
+    index = LightningStrikeIndex(windows=(60,))
+    index.add(EPOCH, 5.0, 100)
+    index.add(EPOCH + 30, 20.0, 100)
+    index.add(EPOCH + 40, 10.0, 100)
+    window = index.windows[60]
+
+    assert window.closest_at(EPOCH + 50) == 5.0
+    assert window.closest_at(EPOCH + 70) == 10.0
+    assert window.closest_at(EPOCH + 100) is None
+
+
+def test_older_strike_rejected() -> None:
+    """Test a strike older than the last strike is rejected."""
+    index = LightningStrikeIndex(windows=(60,))
+    assert index.add(EPOCH, 5.0, 100)
+    assert not index.add(EPOCH - 1, 3.0, 100)
+    assert index.add(EPOCH, 4.0, 100)
+
+    assert index.windows[60].count_at(EPOCH) == 2
+    assert index.last_strike == datetime.fromtimestamp(EPOCH, timezone.utc)
+
+
+def test_capacity() -> None:
+    """Test only the newest strikes are kept once the buffer is full."""
+    index = LightningStrikeIndex(windows=(3600,), capacity=4)
+    for offset, distance in enumerate((1.0, 9.0, 8.0, 7.0, 6.0, 5.0)):
+        index.add(EPOCH + offset, distance, 100)
+
+    window = index.windows[3600]
+    assert window.count_at(EPOCH + 10) == 4
+    assert window.closest_at(EPOCH + 10) == 5.0
+
+
+def test_next_expiry() -> None:
+    """Test the next time a strike leaves any window."""
+    index = LightningStrikeIndex(windows=(60, 600))
+    assert index.next_expiry(EPOCH) is None
+
+    index.add(EPOCH, 5.0, 100)
+    index.add(EPOCH + 30, 5.0, 100)
+    assert index.next_expiry(EPOCH + 30) == EPOCH + 60
+    assert index.next_expiry(EPOCH + 60) == EPOCH + 90
+    assert index.next_expiry(EPOCH + 90) == EPOCH + 600
+    assert index.next_expiry(EPOCH + 630) is None
+
+
+def test_no_strikes() -> None:
+    """Test an index without strikes."""
+    index = LightningStrikeIndex()
+    assert index.last_strike is None
+    assert index.windows[3600].count_at(EPOCH) == 0
+    assert index.windows[3600].closest_at(EPOCH) is None
+    assert index.windows[3600].closest is None
+
+
+def test_window_properties_at_current_time() -> None:
+    """Test the window properties end at the current time."""
+    index = LightningStrikeIndex(windows=(60,))
+    index.add(EPOCH, 5.0, 100)
+    window = index.windows[60]
+
+    with patch("lightning.time.time", return_value=EPOCH + 30):
+        assert window.count == 1
+        assert window.closest.m == 5.0
+        assert str(window.closest.units) == "km"
+    with patch("lightning.time.time", return_value=EPOCH + 60):
+        assert window.count == 0
+        assert window.closest is None
@@ -0,0 +1,189 @@
+"""Tests for the shared UDP listeners."""
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+pytest.importorskip("pytest_homeassistant_custom_component")
+
+# pylint: disable=wrong-import-position
+from custom_components.smartweatherudp.listener import (  # noqa: E402
+    MAX_REORDER,
+    STALE_PACKET_AGE,
+    SeenDevice,
+    SharedWeatherFlowListener,
+    WeatherFlowListenerService,
+)
+
+HOST = "192.168.1.2"
+
+SERIAL_NUMBER = "ST-00000512"
+
+
+def _rapid_wind(epoch: int) -> dict:
+    """Return a rapid wind message sent at epoch."""
+    return {
+        "serial_number": SERIAL_NUMBER,
+        "type": "rapid_wind",
+        "hub_sn": "HB-00000001",
+        "ob": [epoch, 2.3, 128],
+    }
+
+
+def _check_stale(listener: SharedWeatherFlowListener, epoch: int, received: float):
+    """Check if a rapid wind message sent at epoch was received late."""
+    with patch(
+        "custom_components.smartweatherudp.listener.time.monotonic",
+        return_value=received,
+    ):
+        # pylint: disable-next=protected-access
+        return listener._check_stale(SERIAL_NUMBER, _rapid_wind(epoch))
+
+
+def test_stale_packets_independent_of_host_clock() -> None:
+    """Test packets are only stale relative to the device clock.
+
+    The device clock here is a day behind the host clock.
+    """
+    listener = SharedWeatherFlowListener("127.0.0.1")
+    epoch = 1_600_000_000
+    with patch(
+        "custom_components.smartweatherudp.listener.time.time",
+        return_value=epoch + 86400,
+    ):
+        assert not _check_stale(listener, epoch, 100.0)
+        assert not _check_stale(listener, epoch + 3, 103.2)
+        assert not _check_stale(listener, epoch + 6, 106.0)
+
+
+def test_backlog_is_stale() -> None:
+    """Test the first packet of a backlog after a blocked event loop is stale."""
+    listener = SharedWeatherFlowListener("127.0.0.1")
+    epoch = 1_600_000_000
+    assert not _check_stale(listener, epoch, 100.0)
+    # The event loop was blocked for a minute; the queued packets arrive at once.
+    assert _check_stale(listener, epoch + 3, 160.0)
+    assert not _check_stale(listener, epoch + 6, 160.0)
+    assert not _check_stale(listener, epoch + 9, 160.0)
+    assert not _check_stale(listener, epoch + 60, 160.1)
+
+
+def test_device_clock_reset() -> None:
+    """Test the device clock is taken over after it was reset."""
+    listener = SharedWeatherFlowListener("127.0.0.1")
+    epoch = 1_600_000_000
+    assert not _check_stale(listener, epoch, 100.0)
+    reset = epoch - MAX_REORDER - 100
+    assert _check_stale(listener, reset, 103.0)
+    assert not _check_stale(listener, reset + 3, 106.0)
+    assert not _check_stale(listener, reset + 3 + STALE_PACKET_AGE, 106.0 + 5)
+
+
+@pytest.fixture
+async def service():
+    """Return a listener service whose listeners do not open sockets."""
+    loop = asyncio.get_running_loop()
+    hass = SimpleNamespace(loop=loop, async_create_task=loop.create_task)
+    with patch.object(
+        SharedWeatherFlowListener, "start_listening", AsyncMock()
+    ), patch.object(SharedWeatherFlowListener, "stop_listening", AsyncMock()), patch(
+        "custom_components.smartweatherudp.listener.LISTENER_LINGER", 0.01
+    ):
+        yield WeatherFlowListenerService(hass)
+
+
+async def test_acquire_shares_listener(service: WeatherFlowListenerService) -> None:
+    """Test the users of a host share one listener, started once."""
+    first, second = await asyncio.gather(
+        service.async_acquire(HOST), service.async_acquire(HOST)
+    )
+
+    assert first is second
+    assert service.get_listener(HOST) is first
+    first.start_listening.assert_awaited_once()
+    assert await service.async_acquire("0.0.0.0") is not first
+
+
+async def test_release_lingers(service: WeatherFlowListenerService) -> None:
+    """Test a listener stops shortly after its last user released it."""
+    listener = await service.async_acquire(HOST)
+    await service.async_acquire(HOST)
+
+    service.async_release(HOST)
+    await asyncio.sleep(0.05)
+    assert service.get_listener(HOST) is listener
+
+    service.async_release(HOST)
+    assert service.get_listener(HOST) is listener
+    await asyncio.sleep(0.05)
+    assert service.get_listener(HOST) is None
+    listener.stop_listening.assert_awaited_once()
+
+
+async def test_acquire_while_lingering(service: WeatherFlowListenerService) -> None:
+    """Test acquiring a lingering listener keeps it running."""
+    listener = await service.async_acquire(HOST)
+    service.async_release(HOST)
+
+    assert await service.async_acquire(HOST) is listener
+    await asyncio.sleep(0.05)
+    assert service.get_listener(HOST) is listener
+    listener.stop_listening.assert_not_awaited()
+
+
+async def test_listen_context(service: WeatherFlowListenerService) -> None:
+    """Test a listener acquired for a context is released after it."""
+    async with service.async_listen(HOST) as listener:
+        assert service.get_listener(HOST) is listener
+
+    await asyncio.sleep(0.05)
+    assert service.get_listener(HOST) is None
+
+
+async def test_shutdown_stops_used_listeners(
+    service: WeatherFlowListenerService,
+) -> None:
+    """Test shutting down stops listeners that are still in use."""
+    listener = await service.async_acquire(HOST)
+    await service.async_shutdown()
+
+    assert service.get_listener(HOST) is None
+    listener.stop_listening.assert_awaited_once()
+
+
+async def test_device_claims(service: WeatherFlowListenerService) -> None:
+    """Test a device is claimed by the first entry and released with it."""
+    assert service.async_claim_device(SERIAL_NUMBER, "entry_1")
+    assert service.async_claim_device(SERIAL_NUMBER, "entry_1")
+    assert not service.async_claim_device(SERIAL_NUMBER, "entry_2")
+
+    service.async_release_devices("entry_1")
+    assert service.async_claim_device(SERIAL_NUMBER, "entry_2")
+
+
+async def test_unclaimed_devices(service: WeatherFlowListenerService) -> None:
+    """Test only recent, unclaimed devices heard by running listeners count."""
+    listener = await service.async_acquire(HOST)
+    now = 1_700_000_000.0
+    # pylint: disable=protected-access
+    listener._seen_devices.update(
+        {
+            serial_number: SeenDevice(serial_number, "Tempest", None, host, seen)
+            for serial_number, host, seen in (
+                ("ST-00000001", HOST, now),
+                ("ST-00000002", HOST, now),
+                ("ST-00000003", "192.168.2.2", now),
+                ("ST-00000004", HOST, now - 3600),
+            )
+        }
+    )
+    service.async_claim_device("ST-00000002", "entry_1")
+
+    with patch(
+        "custom_components.smartweatherudp.listener.time.time", return_value=now
+    ):
+        assert [
+            device.serial_number for device in service.async_get_unclaimed_devices()
+        ] == ["ST-00000001"]
+        assert len(service.async_get_seen_devices(HOST)) == 2
@@ -0,0 +1,65 @@
+"""Tests for the hourly aggregation of long-term statistics."""
+import pytest
+
+pytest.importorskip("homeassistant")
+
+# pylint: disable=wrong-import-position
+from custom_components.smartweatherudp.longterm import (  # noqa: E402
+    HOUR,
+    HourlyAggregator,
+)
+
+START = 1_700_000_000 - 1_700_000_000 % HOUR
+
+
+def test_hour_completed_by_next_hour() -> None:
+    """Test an hour is completed by the first sample of a later hour."""
+    aggregator = HourlyAggregator()
+    aggregator.add(START + 10, 1.0)
+    aggregator.add(START + 20, 3.0)
+    assert aggregator.completed == []
+
+    aggregator.add(START + HOUR, 5.0)
+    assert aggregator.completed == [(START, 2.0, 1.0, 3.0, 4.0)]
+
+
+def test_hour_completed_by_close() -> None:
+    """Test close completes the hour only once it has passed."""
+    aggregator = HourlyAggregator()
+    aggregator.add(START + 10, 2.0)
+    aggregator.close(START + HOUR - 1)
+    assert aggregator.completed == []
+
+    aggregator.close(START + HOUR + 10)
+    assert aggregator.completed == [(START, 2.0, 2.0, 2.0, 2.0)]
+
+
+def test_out_of_order_samples_dropped() -> None:
+    """Test samples of an hour that was moved past are dropped.
+
+    Rapid wind and observation samples interleave, so a late sample of the
+    previous hour must neither merge into the new hour nor complete the
+    previous hour twice.
+    """
+    aggregator = HourlyAggregator()
+    aggregator.add(START + HOUR - 5, 1.0)
+    aggregator.add(START + HOUR + 1, 4.0)
+    aggregator.add(START + HOUR - 2, 100.0)
+    aggregator.add(START + HOUR + 2, 6.0)
+    aggregator.add(START + 2 * HOUR, 0.0)
+
+    assert aggregator.completed == [
+        (START, 1.0, 1.0, 1.0, 1.0),
+        (START + HOUR, 5.0, 4.0, 6.0, 10.0),
+    ]
+
+
+def test_samples_of_closed_hour_dropped() -> None:
+    """Test samples of an hour completed by close are dropped."""
+    aggregator = HourlyAggregator()
+    aggregator.add(START + 10, 1.0)
+    aggregator.close(START + HOUR + 10)
+    aggregator.add(START + HOUR - 1, 100.0)
+    aggregator.close(START + 2 * HOUR + 10)
+
+    assert aggregator.completed == [(START, 1.0, 1.0, 1.0, 1.0)]
@@ -0,0 +1,45 @@
+"""Tests for the per-device mailboxes."""
+from mailbox import OVERFLOW, QUEUE_SIZE, QUEUED, SUPERSEDED, DeviceMailbox
+
+
+def test_latest_only_superseded() -> None:
+    """Test only the newest message of a latest-only type is kept."""
+    mailbox = DeviceMailbox()
+    assert mailbox.put("rapid_wind", {"ob": [100]}) == QUEUED
+    assert mailbox.put("rapid_wind", {"ob": [103]}) == SUPERSEDED
+    assert mailbox.put("hub_status", {"timestamp": 104}) == QUEUED
+
+    assert mailbox.drain() == [{"ob": [103]}, {"timestamp": 104}]
+
+
+def test_other_types_queued() -> None:
+    """Test every message of other types is kept, in the order received."""
+    mailbox = DeviceMailbox()
+    assert mailbox.put("obs_st", {"obs": 1}) == QUEUED
+    assert mailbox.put("evt_strike", {"evt": 2}) == QUEUED
+    assert mailbox.put("obs_st", {"obs": 3}) == QUEUED
+
+    assert mailbox.drain() == [{"obs": 1}, {"evt": 2}, {"obs": 3}]
+
+
+def test_overflow_drops_oldest() -> None:
+    """Test the oldest queued message is dropped once the queue is full."""
+    mailbox = DeviceMailbox()
+    for index in range(QUEUE_SIZE):
+        assert mailbox.put("obs_st", {"obs": index}) == QUEUED
+    assert mailbox.put("obs_st", {"obs": QUEUE_SIZE}) == OVERFLOW
+
+    messages = mailbox.drain()
+    assert len(messages) == QUEUE_SIZE
+    assert messages[0] == {"obs": 1}
+    assert messages[-1] == {"obs": QUEUE_SIZE}
+
+
+def test_drain_empties_mailbox() -> None:
+    """Test draining empties the mailbox and frees the queues."""
+    mailbox = DeviceMailbox()
+    mailbox.put("rapid_wind", {"ob": [100]})
+    mailbox.drain()
+
+    assert mailbox.drain() == []
+    assert mailbox.put("rapid_wind", {"ob": [103]}) == QUEUED
@@ -0,0 +1,118 @@
+"""Tests for the incremental rain accumulation."""
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from rain import RAIN_EVENT_TIMEOUT, RainAccumulator
+
+TIME_ZONE = timezone(timedelta(hours=2))
+
+# 23:00 local time.
+EVENING = int(datetime(2023, 6, 1, 23, 0, tzinfo=TIME_ZONE).timestamp())
+
+
+def test_last_hour_rolls() -> None:
+    """Test the rain of the last hour drops the minutes older than an hour."""
+    rain = RainAccumulator(TIME_ZONE)
+    rain.add(EVENING, 1.0)
+    rain.add(EVENING + 60, 0.5)
+    rain.add(EVENING + 120, None)
+    assert rain.last_hour.m == pytest.approx(1.5)
+
+    rain.add(EVENING + 3600, 0.25)
+    assert rain.last_hour.m == pytest.approx(0.75)
+
+    # No observations for over an hour.
+    rain.add(EVENING + 3 * 3600, 0.0)
+    assert rain.last_hour.m == 0.0
+
+
+def test_day_rollover() -> None:
+    """Test today's rain moves to yesterday at local midnight."""
+    rain = RainAccumulator(TIME_ZONE)
+    rain.add(EVENING, 1.0)
+    rain.add(EVENING + 3540, 2.0)
+    assert rain.today.m == pytest.approx(3.0)
+    assert rain.yesterday.m == 0.0
+
+    rain.add(EVENING + 3600, 0.5)
+    assert rain.today.m == pytest.approx(0.5)
+    assert rain.yesterday.m == pytest.approx(3.0)
+
+
+def test_day_rollover_after_gap() -> None:
+    """Test yesterday is empty when no observation was received yesterday."""
+    rain = RainAccumulator(TIME_ZONE)
+    rain.add(EVENING, 1.0)
+    rain.add(EVENING + 2 * 86400, 0.5)
+
+    assert rain.today.m == pytest.approx(0.5)
+    assert rain.yesterday.m == 0.0
+
+
+def test_rain_event() -> None:
+    """Test a rain event ends after an hour without rain."""
+    rain = RainAccumulator(TIME_ZONE)
+    rain.add(EVENING, 1.0)
+    rain.add(EVENING + 60, 0.0)
+    rain.add(EVENING + 120, 1.0)
+    assert rain.event.m == pytest.approx(2.0)
+
+    rain.add(EVENING + 120 + RAIN_EVENT_TIMEOUT + 60, 0.5)
+    assert rain.event.m == pytest.approx(0.5)
+
+
+def test_old_observation_ignored() -> None:
+    """Test an observation not newer than the last one is ignored."""
+    rain = RainAccumulator(TIME_ZONE)
+    rain.add(EVENING + 60, 1.0)
+    rain.add(EVENING + 60, 1.0)
+    rain.add(EVENING, 1.0)
+
+    assert rain.today.m == pytest.approx(1.0)
+    assert rain.last_epoch == EVENING + 60
+
+
+def test_restore_replays_pending() -> None:
+    """Test restoring a snapshot replays the observations received since."""
+    previous = RainAccumulator(TIME_ZONE)
+    previous.add(EVENING, 1.0)
+    previous.add(EVENING + 60, 2.0)
+    snapshot = previous.as_dict()
+
+    rain = RainAccumulator(TIME_ZONE)
+    # Observations received before the sensor restored its last state.
+    rain.add(EVENING + 60, 2.0)
+    rain.add(EVENING + 120, 0.5)
+    rain.restore(snapshot)
+
+    assert rain.last_epoch == EVENING + 120
+    assert rain.today.m == pytest.approx(3.5)
+    assert rain.last_hour.m == pytest.approx(3.5)
+    assert rain.event.m == pytest.approx(3.5)
+
+
+def test_restore_guard() -> None:
+    """Test a snapshot is not restored over a newer or equal restored one."""
+    previous = RainAccumulator(TIME_ZONE)
+    previous.add(EVENING, 1.0)
+    older = previous.as_dict()
+    previous.add(EVENING + 60, 2.0)
+    newer = previous.as_dict()
+
+    rain = RainAccumulator(TIME_ZONE)
+    rain.restore(newer)
+    rain.restore(older)
+    rain.restore(newer)
+    rain.restore(None)
+
+    assert rain.today.m == pytest.approx(3.0)
+
+
+def test_restore_invalid_snapshot() -> None:
+    """Test an invalid snapshot is discarded and the observations kept."""
+    rain = RainAccumulator(TIME_ZONE)
+    rain.add(EVENING, 1.0)
+    rain.restore({"epoch": EVENING - 60, "day": "not a date", "today": 5.0})
+
+    assert rain.today.m == pytest.approx(1.0)
+    assert rain.yesterday.m == 0.0
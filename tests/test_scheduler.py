@@ -0,0 +1,146 @@
+"""Tests for the state write scheduler."""
+from types import SimpleNamespace
+from unittest.mock import Mock, patch
+
+import pytest
+
+pytest.importorskip("homeassistant")
+
+# pylint: disable=wrong-import-position
+from custom_components.smartweatherudp.scheduler import (  # noqa: E402
+    StateWriteScheduler,
+)
+
+
+class FakeEntity:
+    """Entity counting its state writes."""
+
+    def __init__(self, key: str) -> None:
+        """Initialize the entity."""
+        self.entity_description = SimpleNamespace(key=key)
+        self.async_write_ha_state = Mock()
+
+
+@pytest.fixture
+def clock():
+    """Patch the monotonic clock of the scheduler."""
+    with patch(
+        "custom_components.smartweatherudp.scheduler.time.monotonic",
+        return_value=1000.0,
+    ) as monotonic:
+        yield monotonic
+
+
+@pytest.fixture
+def loop() -> Mock:
+    """Return a mocked event loop."""
+    return Mock()
+
+
+@pytest.fixture
+def scheduler(loop: Mock) -> StateWriteScheduler:
+    """Return a scheduler on the mocked event loop."""
+    return StateWriteScheduler(SimpleNamespace(loop=loop), intervals={"wind_speed": 5})
+
+
+def test_write_without_interval(
+    scheduler: StateWriteScheduler, loop: Mock, clock
+) -> None:
+    """Test entities without an interval write every time."""
+    entity = FakeEntity("air_temperature")
+    scheduler.async_schedule(entity)
+    scheduler.async_schedule(entity)
+
+    assert entity.async_write_ha_state.call_count == 2
+    loop.call_later.assert_not_called()
+
+
+def test_leading_and_trailing_write(
+    scheduler: StateWriteScheduler, loop: Mock, clock
+) -> None:
+    """Test writes within the interval collapse into one trailing write."""
+    entity = FakeEntity("wind_speed")
+    call_later = loop.call_later
+
+    scheduler.async_schedule(entity)
+    assert entity.async_write_ha_state.call_count == 1
+
+    clock.return_value = 1002.0
+    scheduler.async_schedule(entity)
+    scheduler.async_schedule(entity)
+    assert entity.async_write_ha_state.call_count == 1
+    call_later.assert_called_once()
+    delay, flush, *args = call_later.call_args.args
+    assert delay == pytest.approx(3.0)
+
+    clock.return_value = 1005.0
+    flush(*args)
+    assert entity.async_write_ha_state.call_count == 2
+
+    # The trailing write starts a new interval.
+    clock.return_value = 1007.0
+    scheduler.async_schedule(entity)
+    assert entity.async_write_ha_state.call_count == 2
+    assert call_later.call_args.args[0] == pytest.approx(3.0)
+
+
+def test_write_after_interval(
+    scheduler: StateWriteScheduler, loop: Mock, clock
+) -> None:
+    """Test a write after the interval elapsed is issued right away."""
+    entity = FakeEntity("wind_speed")
+    scheduler.async_schedule(entity)
+    clock.return_value = 1005.0
+    scheduler.async_schedule(entity)
+
+    assert entity.async_write_ha_state.call_count == 2
+    loop.call_later.assert_not_called()
+
+
+def test_custom_write(scheduler: StateWriteScheduler, clock) -> None:
+    """Test a custom write callback replaces the state write."""
+    entity = FakeEntity("wind_speed")
+    write = Mock()
+    scheduler.async_schedule(entity, write)
+
+    write.assert_called_once()
+    entity.async_write_ha_state.assert_not_called()
+
+
+def test_cancel(scheduler: StateWriteScheduler, loop: Mock, clock) -> None:
+    """Test cancelling drops the pending write and the last write time."""
+    entity = FakeEntity("wind_speed")
+    scheduler.async_schedule(entity)
+    clock.return_value = 1001.0
+    scheduler.async_schedule(entity)
+    handle = loop.call_later.return_value
+
+    scheduler.async_cancel(entity)
+    handle.cancel.assert_called_once()
+
+    scheduler.async_schedule(entity)
+    assert entity.async_write_ha_state.call_count == 2
+
+
+def test_set_intervals(scheduler: StateWriteScheduler, clock) -> None:
+    """Test replacing the intervals applies to the next write."""
+    entity = FakeEntity("wind_speed")
+    scheduler.async_schedule(entity)
+    scheduler.async_set_intervals({})
+    scheduler.async_schedule(entity)
+
+    assert entity.async_write_ha_state.call_count == 2
+
+
+def test_shutdown(scheduler: StateWriteScheduler, loop: Mock, clock) -> None:
+    """Test shutting down cancels every pending write."""
+    entities = [FakeEntity("wind_speed"), FakeEntity("wind_speed")]
+    for entity in entities:
+        scheduler.async_schedule(entity)
+    clock.return_value = 1001.0
+    for entity in entities:
+        scheduler.async_schedule(entity)
+    handle = loop.call_later.return_value
+
+    scheduler.async_shutdown()
+    assert handle.cancel.call_count == 2
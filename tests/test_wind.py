@@ -0,0 +1,124 @@
+"""Tests for the rolling wind statistics."""
+import math
+from unittest.mock import patch
+
+import pytest
+from wind import WindStatistics
+
+
+def test_window_statistics() -> None:
+    """Test the average, gust, lull and direction of a window."""
+    wind = WindStatistics(windows=(60,))
+    wind.add(0, 2.0, 350)
+    wind.add(3, 4.0, 10)
+    wind.add(6, 3.0, 0)
+    window = wind.windows[60]
+
+    assert window.size == 3
+    assert window.average.m == pytest.approx(3.0)
+    assert window.gust.m == 4.0
+    assert window.lull.m == 2.0
+    east = 2 * math.sin(math.radians(350)) + 4 * math.sin(math.radians(10))
+    north = 2 * math.cos(math.radians(350)) + 4 * math.cos(math.radians(10)) + 3
+    assert window.direction.m == pytest.approx(math.degrees(math.atan2(east, north)))
+
+
+def test_direction_vector_average() -> None:
+    """Test directions are averaged as vectors across north."""
+    wind = WindStatistics(windows=(60,))
+    wind.add(0, 1.0, 350)
+    wind.add(3, 1.0, 10)
+
+    direction = wind.windows[60].direction.m
+    assert min(direction, 360 - direction) == pytest.approx(0.0, abs=1e-6)
+
+
+def test_calm_direction_unknown() -> None:
+    """Test the direction is unknown when there was no wind."""
+    wind = WindStatistics(windows=(60,))
+    wind.add(0, 0.0, 90)
+
+    assert wind.windows[60].average.m == 0.0
+    assert wind.windows[60].direction is None
+
+
+def test_samples_leave_window_on_add() -> None:
+    """Test samples older than a window are evicted when a sample is added."""
+    wind = WindStatistics(windows=(10, 60))
+    wind.add(0, 9.0, 0)
+    wind.add(5, 1.0, 0)
+    wind.add(12, 2.0, 0)
+
+    short, long = wind.windows[10], wind.windows[60]
+    assert short.size == 2
+    assert short.gust.m == 2.0
+    assert short.lull.m == 1.0
+    assert long.size == 3
+    assert long.gust.m == 9.0
+
+
+def test_sample_at_cutoff_evicted() -> None:
+    """Test a sample exactly a window length old is evicted."""
+    wind = WindStatistics(windows=(10,))
+    wind.add(0, 5.0, 0)
+    wind.add(10, 1.0, 0)
+
+    assert wind.windows[10].size == 1
+    assert wind.windows[10].gust.m == 1.0
+
+
+def test_older_sample_ignored() -> None:
+    """Test a sample older than the newest one is ignored."""
+    wind = WindStatistics(windows=(60,))
+    wind.add(10, 1.0, 0)
+    wind.add(5, 8.0, 0)
+
+    assert wind.windows[60].size == 1
+    assert wind.windows[60].gust.m == 1.0
+
+
+def test_capacity_eviction() -> None:
+    """Test the oldest samples leave the windows when the buffer is full."""
+    wind = WindStatistics(windows=(3600,), capacity=4)
+    for epoch, speed in enumerate((9.0, 1.0, 2.0, 3.0, 4.0)):
+        wind.add(epoch, speed, 0)
+
+    window = wind.windows[3600]
+    assert window.size == 4
+    assert window.gust.m == 4.0
+    assert window.lull.m == 1.0
+    assert window.average.m == pytest.approx(2.5)
+
+
+def test_expire_empties_windows() -> None:
+    """Test windows empty and report unknown once the samples stop."""
+    wind = WindStatistics(windows=(10, 60))
+    with patch("wind.time.monotonic", return_value=1000.0):
+        wind.add(100, 3.0, 90)
+        wind.add(103, 5.0, 90)
+
+    # The device clock is advanced by the monotonic time elapsed.
+    assert not wind.expire(1005.0)
+    assert wind.windows[10].size == 2
+
+    assert wind.expire(1008.0)
+    assert wind.windows[10].size == 1
+    assert wind.windows[10].gust.m == 5.0
+
+    assert wind.expire(1013.0)
+    short = wind.windows[10]
+    assert short.size == 0
+    assert short.average is None
+    assert short.direction is None
+    assert short.gust is None
+    assert short.lull is None
+    assert wind.windows[60].size == 2
+
+    assert wind.expire(1100.0)
+    assert wind.windows[60].gust is None
+    assert not wind.expire(1200.0)
+
+
+def test_expire_without_samples() -> None:
+    """Test expiring without samples changes nothing."""
+    assert not WindStatistics().expire()